@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Activity log benchmark.
+
+Records a stream of synthetic tool-call events spread over the last 30 days
+and reports the cost of logging one event (append plus rollup counting,
+including the periodic merge into the rollups file), then times the per-day
+activity, XP and most-visited-rooms summary read from the rollups against
+computing it by scanning the raw event segments. Also checks both agree and
+that the raw log stayed within its segment budget.
+
+    python benchmarks/bench_activity.py --sizes 10000,100000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from harness import SRC, run_metadata, write_report, log
+
+sys.path.insert(0, SRC)
+from activity import ActivityLog  # noqa: E402
+from ids import new_id  # noqa: E402
+
+TOOLS = ["store_memory", "search_memories", "memory_journey", "practice_recall", "get_palace_overview"]
+
+
+def synthetic_event(rng: random.Random, now: datetime):
+    return {
+        "id": new_id(),
+        "at": (now - timedelta(seconds=rng.uniform(0, 30 * 86400))).isoformat(),
+        "tool": rng.choice(TOOLS),
+        "rooms": [f"Room {rng.randrange(20):03d}"],
+        "memory_ids": [new_id() for _ in range(rng.randint(0, 5))],
+        "xp": rng.choice([0, 10, 15, 25]),
+        "latency_ms": round(rng.uniform(1, 50), 3),
+        "ok": True
+    }
+
+
+def summarise(daily):
+    """Per-day events and XP plus room visits, from daily buckets"""
+    visits = {}
+    for bucket in daily.values():
+        for room, count in bucket.get("rooms", {}).items():
+            visits[room] = visits.get(room, 0) + count
+    return (
+        {day: (bucket["events"], bucket["xp"]) for day, bucket in daily.items()},
+        sorted(visits.items(), key=lambda item: (-item[1], item[0]))[:5]
+    )
+
+
+def scan_segments(activity: ActivityLog):
+    """The alternative: rebuild the daily buckets from every raw event"""
+    daily = {}
+    for path in activity.segments():
+        with open(path) as f:
+            for line in f:
+                event = json.loads(line)
+                bucket = daily.setdefault(event["at"][:10], {"events": 0, "xp": 0, "rooms": {}})
+                bucket["events"] += 1
+                bucket["xp"] += event["xp"]
+                for room in event["rooms"]:
+                    bucket["rooms"][room] = bucket["rooms"].get(room, 0) + 1
+    return daily
+
+
+def per_call_ms(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return round((time.perf_counter() - started) / calls * 1000, 4)
+
+
+def run_size(size: int, args):
+    directory = tempfile.mkdtemp(prefix="palace-activity-")
+    segment_bytes = args.segment_kb * 1024
+    activity = ActivityLog(directory, segment_bytes, args.max_segments, 7, 365, args.flush_interval, 50)
+    rng = random.Random(args.seed)
+    now = datetime.now()
+    events = [synthetic_event(rng, now) for _ in range(size)]
+
+    record_ms = per_call_ms(lambda i: activity.record(events[i]), size)
+    activity.flush()
+    usage = activity.disk_usage()
+
+    rollup_ms = per_call_ms(lambda i: summarise(activity.rollups()["daily"]), 20)
+    scan_ms = per_call_ms(lambda i: summarise(scan_segments(activity)), 3)
+
+    # With unbounded segments the raw scan sees every event, so both summaries must match
+    unbounded = ActivityLog(tempfile.mkdtemp(prefix="palace-activity-"), segment_bytes, 10 ** 6, 7, 365, 3600, 50)
+    for event in events[:min(size, 20000)]:
+        unbounded.record(dict(event))
+    unbounded.flush()
+    matches = summarise(unbounded.rollups()["daily"]) == summarise(scan_segments(unbounded))
+    shutil.rmtree(unbounded.directory, ignore_errors=True)
+    shutil.rmtree(directory, ignore_errors=True)
+
+    result = {
+        "events": size,
+        "record_ms": record_ms,
+        "rollup_summary_ms": rollup_ms,
+        "raw_scan_summary_ms": scan_ms,
+        "speedup": round(scan_ms / max(rollup_ms, 1e-6), 1),
+        "segments": usage["segments"],
+        "log_bytes": usage["bytes"],
+        "within_budget": usage["bytes"] <= segment_bytes * args.max_segments + 4096,
+        "matches_scan": matches
+    }
+    log(f"[{size}] record {record_ms} ms/event; summary from rollups {rollup_ms} ms vs raw scan {scan_ms} ms "
+        f"({result['speedup']}x); log {usage['segments']} segments, {usage['bytes']} bytes")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Activity log and rollup benchmark")
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--segment-kb", type=int, default=1000)
+    parser.add_argument("--max-segments", type=int, default=20)
+    parser.add_argument("--flush-interval", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    write_report({
+        "benchmark": "activity",
+        "meta": run_metadata(sizes=sizes, segment_kb=args.segment_kb, max_segments=args.max_segments, seed=args.seed),
+        "sizes": {str(size): run_size(size, args) for size in sizes}
+    }, os.path.abspath(args.output) if args.output else None)
+
+
+if __name__ == "__main__":
+    main()
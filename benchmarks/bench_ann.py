@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Recall/latency benchmark for the semantic search ANN index.
+
+Embeds a seeded synthetic palace, then compares the IVF index at several
+``n_probe`` settings against exact brute-force search: recall@k and
+queries/second for each setting.
+
+    python benchmarks/bench_ann.py --sizes 10000,100000 --probes 1,2,4,8,16,32
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from harness import SRC, run_metadata, write_report, log
+from palace import ANCHORS, WORDS, synthetic_content
+
+sys.path.insert(0, SRC)
+from semantic import SemanticIndex  # noqa: E402
+
+
+def synthetic_locations(count: int, rooms: int, seed: int):
+    rng = random.Random(seed)
+    return [
+        SimpleNamespace(
+            id=f"m{i:08d}",
+            room=f"Room {i % rooms:03d}",
+            content=synthetic_content(rng, i),
+            keywords=rng.sample(WORDS, 3),
+            visual_anchor=rng.choice(ANCHORS).format(w=rng.choice(WORDS))
+        )
+        for i in range(count)
+    ]
+
+
+def run_size(size: int, args):
+    index = SemanticIndex(tempfile.mkdtemp(prefix="palace-ann-"), ann_min_size=0)
+    locations = synthetic_locations(size, args.rooms, args.seed)
+
+    started = time.perf_counter()
+    index.add_many(locations)
+    embed_seconds = time.perf_counter() - started
+
+    rng = random.Random(args.seed + 1)
+    queries = [" ".join(rng.sample(WORDS, 3)) for _ in range(args.queries)]
+
+    # One query at a time, like search_memories issues them
+    started = time.perf_counter()
+    exact = [index.search(q, args.k, exact=True) for q in queries]
+    exact_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index.train_ann()
+    train_seconds = time.perf_counter() - started
+    log(f"[{size}] exact: {len(queries) / exact_seconds:.1f} q/s")
+    log(f"[{size}] embedded in {embed_seconds:.1f}s, trained {len(index.ann.lists)} lists in {train_seconds:.2f}s")
+
+    probes = {}
+    for n_probe in args.probes:
+        index.n_probe = n_probe
+        started = time.perf_counter()
+        approximate = [index.search(q, args.k) for q in queries]
+        seconds = time.perf_counter() - started
+
+        hits = total = 0
+        for truth, found in zip(exact, approximate):
+            truth_ids = {location_id for location_id, _ in truth}
+            hits += len(truth_ids & {location_id for location_id, _ in found})
+            total += len(truth_ids)
+        probes[str(n_probe)] = {
+            f"recall_at_{args.k}": round(hits / total, 4) if total else None,
+            "queries_per_sec": round(len(queries) / seconds, 1),
+            "mean_query_ms": round(seconds / len(queries) * 1000, 3)
+        }
+        log(f"[{size}] n_probe={n_probe}: recall@{args.k} {probes[str(n_probe)][f'recall_at_{args.k}']}, "
+            f"{probes[str(n_probe)]['queries_per_sec']} q/s")
+
+    return {
+        "memories": size,
+        "lists": len(index.ann.lists),
+        "embed_seconds": round(embed_seconds, 3),
+        "train_seconds": round(train_seconds, 3),
+        "exact": {
+            "queries_per_sec": round(len(queries) / exact_seconds, 1),
+            "mean_query_ms": round(exact_seconds / len(queries) * 1000, 3)
+        },
+        "ann": probes
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Semantic ANN recall/latency benchmark")
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--probes", default="1,2,4,8,16,32")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    args.probes = [int(p) for p in args.probes.split(",")]
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    write_report({
+        "benchmark": "ann",
+        "meta": run_metadata(sizes=sizes, probes=args.probes, queries=args.queries, k=args.k, seed=args.seed),
+        "sizes": {str(size): run_size(size, args) for size in sizes}
+    }, os.path.abspath(args.output) if args.output else None)
+
+
+if __name__ == "__main__":
+    main()
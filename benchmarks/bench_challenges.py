@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Challenge expiry sweep benchmark.
+
+Fills the challenge store with active challenges spread over many users and
+start times, then times a sweep that expires the few that just fell due
+against scanning every challenge for overdue ones. The heap sweep's cost
+should follow the number expired, not the number stored. Also checks both
+find the same challenges.
+
+    python benchmarks/bench_challenges.py --sizes 1000,10000,100000 --due 10
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from harness import SRC, run_metadata, write_report, log
+
+sys.path.insert(0, SRC)
+from challenges import ChallengeStore  # noqa: E402
+
+HISTORY_SECONDS = 7 * 86400
+
+
+def synthetic_challenges(count: int, users: int, now: datetime, seed: int):
+    rng = random.Random(seed)
+    records = {}
+    for i in range(count):
+        started = now - timedelta(seconds=rng.uniform(0, 86400))
+        records[f"challenge_{i:08d}"] = {
+            "id": f"challenge_{i:08d}",
+            "user_id": f"user_{rng.randrange(users):06d}",
+            "target_memories": [],
+            "xp_reward": 50,
+            "status": "active",
+            "started_at": started.isoformat(),
+            "expires_at": (started + timedelta(hours=24)).isoformat(),
+            "finished_at": None
+        }
+    return records
+
+
+def scan_overdue(store: ChallengeStore, now: datetime):
+    """The alternative: look at every active challenge of every user"""
+    return sorted(
+        challenge_id
+        for ids in store.active_by_user.values()
+        for challenge_id in ids
+        if datetime.fromisoformat(store.records[challenge_id]["expires_at"]) <= now
+    )
+
+
+def run_size(size: int, args):
+    now = datetime.now()
+    store = ChallengeStore(HISTORY_SECONDS, synthetic_challenges(size, max(1, size // 5), now, args.seed))
+    expiries = sorted(datetime.fromisoformat(r["expires_at"]) for r in store.records.values())
+
+    rounds = min(args.rounds, size // max(1, args.due))
+    sweep_seconds = scan_seconds = 0.0
+    expired_total = 0
+    agree = True
+    for i in range(rounds):
+        # Just late enough for the next `due` challenges to expire
+        at = expiries[min(len(expiries) - 1, (i + 1) * args.due - 1)]
+        started = time.perf_counter()
+        expected = scan_overdue(store, at)
+        scan_seconds += time.perf_counter() - started
+        started = time.perf_counter()
+        expired, _ = store.sweep(at)
+        sweep_seconds += time.perf_counter() - started
+        expired_total += len(expired)
+        agree = agree and sorted(expired) == expected
+
+    result = {
+        "challenges": size,
+        "sweeps": rounds,
+        "expired_per_sweep": round(expired_total / max(1, rounds), 1),
+        "heap_sweep_ms": round(sweep_seconds / max(1, rounds) * 1000, 4),
+        "full_scan_ms": round(scan_seconds / max(1, rounds) * 1000, 4),
+        "matches_scan": agree
+    }
+    result["speedup"] = round(result["full_scan_ms"] / max(result["heap_sweep_ms"], 1e-6), 1)
+    log(f"[{size}] sweep {result['heap_sweep_ms']} ms vs scan {result['full_scan_ms']} ms "
+        f"({result['speedup']}x), {result['expired_per_sweep']} expired per sweep")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Challenge expiry sweep benchmark")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--due", type=int, default=10, help="Challenges falling due between sweeps")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    write_report({
+        "benchmark": "challenges",
+        "meta": run_metadata(sizes=sizes, due=args.due, rounds=args.rounds, seed=args.seed),
+        "sizes": {str(size): run_size(size, args) for size in sizes}
+    }, os.path.abspath(args.output) if args.output else None)
+
+
+if __name__ == "__main__":
+    main()
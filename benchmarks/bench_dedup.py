@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Duplicate detection benchmark for store_memory.
+
+Indexes a seeded synthetic palace, then looks up exact copies, lightly
+reworded copies (one word added or dropped) and fresh content. Reports
+lookup latency per palace size (it should grow far slower than the palace;
+the synthetic facts share a template, so buckets are fuller than real
+content would make them), how many bucket entries each lookup touched, and
+how often reworded copies were caught or fresh content was wrongly flagged.
+
+    python benchmarks/bench_dedup.py --sizes 1000,10000,100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+from harness import SRC, run_metadata, write_report, log
+from bench_ann import synthetic_locations
+from palace import WORDS, synthetic_content
+
+sys.path.insert(0, SRC)
+from dedup import DuplicateIndex, shingles  # noqa: E402
+from const import DEDUPE_MIN_SIMILARITY  # noqa: E402
+
+
+def reword(content: str, rng: random.Random) -> str:
+    words = content.split()
+    if rng.random() < 0.5 and len(words) > 6:
+        del words[rng.randrange(len(words))]
+    else:
+        words.insert(rng.randrange(len(words) + 1), rng.choice(WORDS))
+    return " ".join(words)
+
+
+def timed_lookups(index, queries):
+    found = []
+    candidates = 0
+    started = time.perf_counter()
+    for room, content in queries:
+        found.append(index.find(room, content))
+    seconds = time.perf_counter() - started
+    # Candidate counts are measured separately so they don't skew the timing
+    for room, content in queries:
+        for key in index._band_keys(room, shingles(content)):
+            candidates += len(index.buckets.get(key, ()))
+    return found, {
+        "mean_lookup_ms": round(seconds / len(queries) * 1000, 3),
+        "mean_bucket_entries": round(candidates / len(queries), 1)
+    }
+
+
+def run_size(size: int, args):
+    locations = synthetic_locations(size, args.rooms, args.seed)
+    index = DuplicateIndex(DEDUPE_MIN_SIMILARITY)
+    started = time.perf_counter()
+    index.add_many(locations)
+    build_seconds = time.perf_counter() - started
+
+    rng = random.Random(args.seed + 1)
+    sample = rng.sample(locations, min(args.queries, size))
+    exact = [(loc.room, loc.content) for loc in sample]
+    reworded = [(loc.room, reword(loc.content, rng)) for loc in sample]
+    fresh = [(loc.room, synthetic_content(rng, 50_000_000 + i)) for i, loc in enumerate(sample)]
+
+    result = {"memories": size, "build_seconds": round(build_seconds, 3)}
+    for name, queries in (("exact", exact), ("reworded", reworded), ("fresh", fresh)):
+        found, stats = timed_lookups(index, queries)
+        stats["flagged"] = round(sum(f is not None for f in found) / len(found), 4)
+        result[name] = stats
+
+    log(f"[{size}] lookup exact {result['exact']['mean_lookup_ms']} ms, "
+        f"reworded {result['reworded']['mean_lookup_ms']} ms (caught {result['reworded']['flagged']:.0%}), "
+        f"fresh {result['fresh']['mean_lookup_ms']} ms (false positives {result['fresh']['flagged']:.1%})")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Duplicate detection latency/accuracy benchmark")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    write_report({
+        "benchmark": "dedup",
+        "meta": run_metadata(sizes=sizes, queries=args.queries, seed=args.seed, min_similarity=DEDUPE_MIN_SIMILARITY),
+        "sizes": {str(size): run_size(size, args) for size in sizes}
+    }, os.path.abspath(args.output) if args.output else None)
+
+
+if __name__ == "__main__":
+    main()
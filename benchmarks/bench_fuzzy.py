@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Latency/recall benchmark for fuzzy (typo-tolerant) search.
+
+Indexes a seeded synthetic palace and issues queries whose words carry one
+random typo. Compares the trigram index against the exact substring scan
+search_memories runs by default, and against a brute-force fuzzy scan that
+edit-distances every token of every memory.
+
+    python benchmarks/bench_fuzzy.py --sizes 1000,10000,50000
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+from harness import SRC, run_metadata, write_report, log
+from bench_ann import synthetic_locations
+from palace import WORDS
+
+sys.path.insert(0, SRC)
+from fuzzy import FuzzyIndex, bounded_edit_distance, default_max_distance, tokenize  # noqa: E402
+
+
+def add_typo(word: str, rng: random.Random) -> str:
+    """One random substitution, insertion, deletion or transposition"""
+    i = rng.randrange(len(word))
+    edit = rng.choice(("substitute", "insert", "delete", "transpose"))
+    if edit == "substitute":
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+    if edit == "insert":
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+    if edit == "delete" and len(word) > 4:
+        return word[:i] + word[i + 1:]
+    i = min(i, len(word) - 2)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def exact_scan(locations, query: str):
+    query_lower = query.lower()
+    return [
+        loc.id for loc in locations
+        if query_lower in loc.content.lower()
+        or query_lower in loc.visual_anchor.lower()
+        or any(query_lower in k.lower() for k in loc.keywords)
+    ]
+
+
+def brute_fuzzy_scan(tokenized, query: str):
+    query_tokens = tokenize(query)
+    return [
+        location_id for location_id, tokens in tokenized
+        if all(
+            any(bounded_edit_distance(q, t, default_max_distance(q)) <= default_max_distance(q) for t in tokens)
+            for q in query_tokens
+        )
+    ]
+
+
+def timed(fn, queries):
+    started = time.perf_counter()
+    results = [fn(q) for q in queries]
+    seconds = time.perf_counter() - started
+    return results, {
+        "queries_per_sec": round(len(queries) / seconds, 1),
+        "mean_query_ms": round(seconds / len(queries) * 1000, 3)
+    }
+
+
+def run_size(size: int, args):
+    locations = synthetic_locations(size, args.rooms, args.seed)
+    index = FuzzyIndex()
+    started = time.perf_counter()
+    index.add_many(locations)
+    build_seconds = time.perf_counter() - started
+
+    rng = random.Random(args.seed + 1)
+    words = [w for w in WORDS if len(w) >= 4]
+    originals = [rng.choice(words) for _ in range(args.queries)]
+    queries = [add_typo(word, rng) for word in originals]
+
+    _, exact_stats = timed(lambda q: exact_scan(locations, q), originals)
+    fuzzy_results, fuzzy_stats = timed(lambda q: index.search(q), queries)
+
+    # A typo query should still find the memories containing the intended word
+    hits = 0
+    for original, found in zip(originals, fuzzy_results):
+        found_ids = {location_id for location_id, _ in found}
+        hits += bool(index.token_locations.get(original, set()) & found_ids)
+    fuzzy_stats["typo_recall"] = round(hits / len(queries), 4)
+
+    result = {
+        "memories": size,
+        "vocabulary": len(index.token_trigrams),
+        "build_seconds": round(build_seconds, 3),
+        "exact_scan": exact_stats,
+        "fuzzy_index": fuzzy_stats
+    }
+    if size <= args.brute_max:
+        tokenized = [(loc_id, sorted(tokens)) for loc_id, tokens in index.location_tokens.items()]
+        brute_queries = queries[:args.brute_queries]
+        brute_results, result["fuzzy_scan"] = timed(lambda q: brute_fuzzy_scan(tokenized, q), brute_queries)
+        agree = sum(
+            set(expected) == {location_id for location_id, _ in index.search(q)}
+            for q, expected in zip(brute_queries, brute_results)
+        )
+        result["fuzzy_scan"]["index_agreement"] = round(agree / len(brute_queries), 4)
+
+    log(f"[{size}] exact scan {exact_stats['mean_query_ms']} ms, fuzzy index {fuzzy_stats['mean_query_ms']} ms "
+        f"(typo recall {fuzzy_stats['typo_recall']})"
+        + (f", fuzzy scan {result['fuzzy_scan']['mean_query_ms']} ms" if "fuzzy_scan" in result else ""))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzzy search latency/recall benchmark")
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--brute-max", type=int, default=10000,
+                        help="Largest palace to also run the brute-force fuzzy scan on")
+    parser.add_argument("--brute-queries", type=int, default=20)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    write_report({
+        "benchmark": "fuzzy",
+        "meta": run_metadata(sizes=sizes, queries=args.queries, seed=args.seed),
+        "sizes": {str(size): run_size(size, args) for size in sizes}
+    }, os.path.abspath(args.output) if args.output else None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Leaderboard benchmark.
+
+For each user count, times the incrementally maintained skip-list
+leaderboard (moving one user after an XP gain, their rank, the top N)
+against what a leaderboard without it would do per request: sort every
+user by XP. Also checks both agree on the top N and on every sampled rank.
+
+    python benchmarks/bench_leaderboard.py --sizes 1000,10000,100000 --top 10
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+from harness import SRC, run_metadata, write_report, log
+
+sys.path.insert(0, SRC)
+from leaderboard import Leaderboard  # noqa: E402
+
+
+def per_call_ms(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return round((time.perf_counter() - started) / calls * 1000, 4)
+
+
+def sorted_rank_and_top(xp, user_id: str, top: int):
+    """The per-request alternative: sort everyone, then look the user up"""
+    order = sorted(xp.items(), key=lambda item: (-item[1], item[0]))
+    rank = 1 + sum(1 for _, total in order if total > xp[user_id])
+    return rank, order[:top]
+
+
+def run_size(size: int, args):
+    rng = random.Random(args.seed)
+    user_ids = [f"user_{i:07d}" for i in range(size)]
+    xp = {user_id: rng.randint(0, 50_000) for user_id in user_ids}
+    leaderboard = Leaderboard(random.Random(args.seed))
+    started = time.perf_counter()
+    for user_id, total in xp.items():
+        leaderboard.set(user_id, total, user_id, 1)
+    build_seconds = time.perf_counter() - started
+
+    def gain(i):
+        user_id = user_ids[i % size]
+        xp[user_id] += rng.randint(5, 50)
+        leaderboard.set(user_id, xp[user_id], user_id, 1)
+
+    calls = max(10, min(2000, 2_000_000 // size))
+    result = {
+        "users": size,
+        "build_seconds": round(build_seconds, 3),
+        "xp_update_ms": per_call_ms(gain, calls * 10),
+        "rank_ms": per_call_ms(lambda i: leaderboard.rank(user_ids[i % size]), calls * 10),
+        "top_ms": per_call_ms(lambda i: leaderboard.top(args.top), calls * 10),
+        "sort_per_request_ms": per_call_ms(
+            lambda i: sorted_rank_and_top(xp, user_ids[i % size], args.top), max(5, calls // 10)
+        )
+    }
+    result["speedup"] = round(result["sort_per_request_ms"] / (result["rank_ms"] + result["top_ms"]), 1)
+
+    sample = rng.sample(user_ids, min(200, size))
+    expected_top = sorted_rank_and_top(xp, sample[0], args.top)[1]
+    result["matches_sort"] = (
+        [(e["user_id"], e["total_xp"]) for e in leaderboard.top(args.top)] == expected_top
+        and all(leaderboard.rank(u) == sorted_rank_and_top(xp, u, 0)[0] for u in sample[:20])
+    )
+
+    log(f"[{size}] update {result['xp_update_ms']} ms, rank {result['rank_ms']} ms, top {args.top} "
+        f"{result['top_ms']} ms vs sort {result['sort_per_request_ms']} ms ({result['speedup']}x)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Leaderboard ranking benchmark")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    write_report({
+        "benchmark": "leaderboard",
+        "meta": run_metadata(sizes=sizes, top=args.top, seed=args.seed),
+        "sizes": {str(size): run_size(size, args) for size in sizes}
+    }, os.path.abspath(args.output) if args.output else None)
+
+
+if __name__ == "__main__":
+    main()
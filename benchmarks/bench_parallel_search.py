@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Parallel partition search benchmark.
+
+Builds a seeded palace at each size, then times an unfiltered exact search
+three ways: the single-threaded scan search_memories used before (load every
+memory, then match), the room partitions scanned one after another in this
+process (the fallback for small palaces), and the partitions spread over a
+process pool of ``--workers`` workers with the results heap-merged, each
+keeping the best ``--limit``. Also checks all three return the same results
+in the same order, and reports
+whether search_memories would use the pool at this size with the default
+settings.
+
+The pool only pays off with as many free CPU cores as workers; on a
+single-core machine expect it to be slower than the serial scan.
+
+    python benchmarks/bench_parallel_search.py --sizes 20000,100000 --workers 4
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from harness import import_server, use_storage, run_metadata, write_report, log
+from palace import PalaceSpec, WORDS, generate_palace
+
+
+def per_call_ms(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return round((time.perf_counter() - started) / calls * 1000, 4)
+
+
+def run_size(server, size: int, args):
+    from partition_search import PartitionSearch
+
+    storage = use_storage(server, tempfile.mkdtemp(prefix="palace-parallel-"))
+    generate_palace(storage, PalaceSpec(memories=size, rooms=args.rooms, seed=args.seed))
+    default = storage.partition_search
+    serial = PartitionSearch(1, 0, 2)
+    pool = PartitionSearch(args.workers, 0, 2)
+    pool.executor().submit(abs, 0).result()  # start the workers outside the timings
+
+    def single_scan(i):
+        return server.rank_memories(
+            storage.load_locations(), WORDS[i % len(WORDS)], None, "exact", args.limit, None
+        )
+
+    def partitions_with(search):
+        def run(i):
+            storage.partition_search = search
+            return storage.search_partitions(WORDS[i % len(WORDS)], args.limit)
+        return run
+
+    calls = max(3, min(20, 200_000 // size))
+    result = {
+        "memories": size,
+        "rooms": args.rooms,
+        "workers": args.workers,
+        "limit": args.limit,
+        "single_scan_ms": per_call_ms(single_scan, calls),
+        "serial_partitions_ms": per_call_ms(partitions_with(serial), calls),
+        "parallel_partitions_ms": per_call_ms(partitions_with(pool), calls)
+    }
+    result["parallel_speedup"] = round(result["single_scan_ms"] / max(result["parallel_partitions_ms"], 1e-6), 2)
+    result["serial_speedup"] = round(result["single_scan_ms"] / max(result["serial_partitions_ms"], 1e-6), 2)
+    result["default_uses_pool"] = default.parallel(size, args.rooms)
+    result["matches_single_scan"] = all(
+        single_scan(i) == partitions_with(serial)(i) == partitions_with(pool)(i) for i in range(len(WORDS))
+    )
+    pool.close()
+    storage.partition_search = default
+    log(f"[{size}] single scan {result['single_scan_ms']} ms, partitions serial {result['serial_partitions_ms']} ms, "
+        f"{args.workers} workers {result['parallel_partitions_ms']} ms ({result['parallel_speedup']}x)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel partition search benchmark")
+    parser.add_argument("--sizes", default="20000,100000")
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=max(2, os.cpu_count() or 1))
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+    output = os.path.abspath(args.output) if args.output else None
+
+    server = import_server()
+    write_report({
+        "benchmark": "parallel_search",
+        "meta": run_metadata(sizes=sizes, rooms=args.rooms, workers=args.workers, limit=args.limit,
+                             seed=args.seed),
+        "sizes": {str(size): run_size(server, size, args) for size in sizes}
+    }, output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Room partition benchmark.
+
+Builds a seeded palace at each size, then times reading one room's memories
+(what memory_journey, practice_recall and room-filtered search_memories
+load) and saving one room's memories (what store_memory writes) from the
+room partitions, against the single locations.json every location used to
+live in: parse the whole file, or serialize and rewrite it all. Also checks
+the partition holds exactly the memories the whole-palace file has for that
+room.
+
+    python benchmarks/bench_partitions.py --sizes 1000,10000,100000 --rooms 20
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict
+
+from harness import import_server, use_storage, run_metadata, write_report, log
+from palace import PalaceSpec, generate_palace
+
+
+def per_call_ms(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return round((time.perf_counter() - started) / calls * 1000, 4)
+
+
+def run_size(server, size: int, args):
+    storage = use_storage(server, tempfile.mkdtemp(prefix="palace-partitions-"))
+    rooms = generate_palace(storage, PalaceSpec(memories=size, rooms=args.rooms, seed=args.seed))
+
+    # The whole-palace file the locations used to be kept in
+    locations = storage.load_locations()
+    whole_file = os.path.join(storage.storage_dir, "whole-locations.json")
+
+    def write_whole(i):
+        data = {loc_id: asdict(location) for loc_id, location in locations.items()}
+        with open(whole_file, "wb") as f:
+            f.write(json.dumps(data, indent=2).encode())
+
+    def read_whole_room(i):
+        with open(whole_file) as f:
+            data = json.load(f)
+        return {loc_id: server.MemoryLocation(**d) for loc_id, d in data.items() if d["room"] == rooms[i % len(rooms)]}
+
+    write_whole(0)
+    by_room = [storage.load_locations([name]) for name in rooms]
+    calls = max(3, min(200, 200_000 // size))
+    result = {
+        "memories": size,
+        "rooms": len(rooms),
+        "partition_read_ms": per_call_ms(lambda i: storage.load_locations([rooms[i % len(rooms)]]), calls),
+        "whole_file_read_ms": per_call_ms(read_whole_room, calls),
+        "partition_write_ms": per_call_ms(
+            lambda i: storage.save_room_locations(rooms[i % len(rooms)], by_room[i % len(rooms)]), calls
+        ),
+        "whole_file_write_ms": per_call_ms(write_whole, calls)
+    }
+    result["read_speedup"] = round(result["whole_file_read_ms"] / max(result["partition_read_ms"], 1e-6), 1)
+    result["write_speedup"] = round(result["whole_file_write_ms"] / max(result["partition_write_ms"], 1e-6), 1)
+    result["matches_whole_file"] = all(
+        set(storage.load_locations([name])) == set(read_whole_room(i)) for i, name in enumerate(rooms)
+    )
+    log(f"[{size}] read one room {result['partition_read_ms']} ms vs whole file {result['whole_file_read_ms']} ms "
+        f"({result['read_speedup']}x); save one room {result['partition_write_ms']} ms vs whole file "
+        f"{result['whole_file_write_ms']} ms ({result['write_speedup']}x)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Room partition read/write benchmark")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+    output = os.path.abspath(args.output) if args.output else None
+
+    server = import_server()
+    write_report({
+        "benchmark": "partitions",
+        "meta": run_metadata(sizes=sizes, rooms=args.rooms, seed=args.seed),
+        "sizes": {str(size): run_size(server, size, args) for size in sizes}
+    }, output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Response size benchmark for the verbosity modes.
+
+Builds a seeded synthetic palace and calls store_memory, search_memories,
+memory_journey and get_palace_overview in each verbosity mode, reporting
+the JSON bytes per response and the time to serialise it.
+
+    python benchmarks/bench_payload.py --memories 1000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from harness import import_server, use_storage, run_metadata, write_report, log
+from palace import PalaceSpec, WORDS, generate_palace, synthetic_content
+
+
+def tool_calls(server, rooms):
+    """name -> callable(i, verbosity) returning the tool's response"""
+    def store(i, verbosity):
+        rng = random.Random(i)
+        return server.store_memory.fn(
+            room=rooms[i % len(rooms)],
+            content=synthetic_content(rng, 20_000_000 + i),
+            visual_anchor="A benchmark balloon tied to the lamp",
+            keywords=rng.sample(WORDS, 3),
+            verbosity=verbosity
+        )
+
+    return {
+        "store_memory": store,
+        "search_memories": lambda i, v: server.search_memories.fn(
+            query=WORDS[i % len(WORDS)], room=rooms[i % len(rooms)], verbosity=v
+        ),
+        "memory_journey": lambda i, v: server.memory_journey.fn(room=rooms[i % len(rooms)], verbosity=v),
+        "get_palace_overview": lambda i, v: server.get_palace_overview.fn(verbosity=v)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes per response in each verbosity mode")
+    parser.add_argument("--memories", type=int, default=1000)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--calls", type=int, default=20, help="Calls per tool and mode")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output) if args.output else None
+
+    server = import_server()
+    verbosity_levels = server.VERBOSITY_LEVELS
+    storage = use_storage(server, tempfile.mkdtemp(prefix="palace-payload-"))
+    rooms = generate_palace(storage, PalaceSpec(memories=args.memories, rooms=args.rooms, seed=args.seed))
+
+    report = {}
+    for tool, call in tool_calls(server, rooms).items():
+        report[tool] = {}
+        for verbosity in verbosity_levels:
+            sizes, serialise_seconds = [], 0.0
+            for i in range(args.calls):
+                random.seed(args.seed + i)
+                response = call(i, verbosity)
+                started = time.perf_counter()
+                encoded = json.dumps(response)
+                serialise_seconds += time.perf_counter() - started
+                sizes.append(len(encoded.encode()))
+            report[tool][verbosity] = {
+                "mean_bytes": round(sum(sizes) / len(sizes), 1),
+                "max_bytes": max(sizes),
+                "mean_serialise_ms": round(serialise_seconds / args.calls * 1000, 4)
+            }
+        full = report[tool]["full"]["mean_bytes"]
+        log(f"{tool}: " + ", ".join(
+            f"{v} {report[tool][v]['mean_bytes']:.0f} B ({report[tool][v]['mean_bytes'] / full:.0%})"
+            for v in verbosity_levels
+        ))
+
+    write_report({
+        "benchmark": "payload",
+        "meta": run_metadata(memories=args.memories, rooms=args.rooms, calls=args.calls, seed=args.seed),
+        "tools": report
+    }, output)
+
+
+if __name__ == "__main__":
+    main()
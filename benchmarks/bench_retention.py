@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Forgetting-curve retention benchmark.
+
+For one room of each size, compares evaluating every memory's retention from
+the cached per-room arrays (what get_palace_overview does between accesses)
+with rebuilding the arrays after an access, and with a plain per-memory
+Python loop over the same formula. Also checks the vectorised and the
+per-memory results agree.
+
+    python benchmarks/bench_retention.py --sizes 1000,10000,100000
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from harness import SRC, run_metadata, write_report, log
+
+sys.path.insert(0, SRC)
+from retention import RetentionModel, accessed_at, DAY_SECONDS  # noqa: E402
+from const import RETENTION_BASE_DAYS, RETENTION_GROWTH  # noqa: E402
+
+ROOM = "Room 000"
+
+
+def synthetic_memories(count: int, seed: int):
+    rng = random.Random(seed)
+    now = datetime.now()
+    return [
+        SimpleNamespace(
+            id=f"m{i:08d}",
+            room=ROOM,
+            recall_count=rng.randint(0, 20),
+            recall_success_rate=round(rng.uniform(20, 100), 1),
+            difficulty_rating=rng.randint(1, 10),
+            last_accessed=(now - timedelta(hours=rng.randint(0, 24 * 60))).isoformat()
+        )
+        for i in range(count)
+    ]
+
+
+def per_memory_retention(memories, now: float):
+    """The loop alternative: the same formula one memory at a time"""
+    result = []
+    for m in memories:
+        stability = (RETENTION_BASE_DAYS * (1 + m.recall_count * m.recall_success_rate / 100) ** RETENTION_GROWTH
+                     * (1 - (m.difficulty_rating - 1) / 18))
+        days = max(0.0, (now - accessed_at(m.last_accessed)) / DAY_SECONDS)
+        result.append(math.exp(-days / stability))
+    return result
+
+
+def per_call_ms(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return round((time.perf_counter() - started) / calls * 1000, 4)
+
+
+def run_size(size: int, args):
+    memories = synthetic_memories(size, args.seed)
+    model = RetentionModel(RETENTION_BASE_DAYS, RETENTION_GROWTH)
+    model.add_many(memories)
+    now = time.time()
+    calls = max(5, min(200, 2_000_000 // size))
+
+    def after_access(i):
+        model.update(memories[i % size].id, recall_count=memories[i % size].recall_count + 1)
+        model.room_retention(ROOM, now)
+
+    result = {
+        "memories": size,
+        "cached_ms": per_call_ms(lambda i: model.room_retention(ROOM, now), calls * 10),
+        "after_access_ms": per_call_ms(after_access, calls),
+        "per_memory_loop_ms": per_call_ms(lambda i: per_memory_retention(memories, now), max(3, calls // 10))
+    }
+    result["speedup_cached"] = round(result["per_memory_loop_ms"] / result["cached_ms"], 1)
+
+    # Undo the timing's recall_count bumps before comparing the two evaluations
+    model = RetentionModel(RETENTION_BASE_DAYS, RETENTION_GROWTH)
+    model.add_many(memories)
+    _, vectorised = model.room_retention(ROOM, now)
+    result["max_abs_difference"] = float(max(
+        abs(a - b) for a, b in zip(vectorised.tolist(), per_memory_retention(memories, now))
+    ))
+
+    log(f"[{size}] cached {result['cached_ms']} ms, after access {result['after_access_ms']} ms, "
+        f"per-memory loop {result['per_memory_loop_ms']} ms ({result['speedup_cached']}x)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Forgetting-curve retention benchmark")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    write_report({
+        "benchmark": "retention",
+        "meta": run_metadata(sizes=sizes, seed=args.seed),
+        "sizes": {str(size): run_size(size, args) for size in sizes}
+    }, os.path.abspath(args.output) if args.output else None)
+
+
+if __name__ == "__main__":
+    main()
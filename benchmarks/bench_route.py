@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Route computation benchmark for memory_journey's "shortest" order.
+
+Places memories at seeded random positions in one room and times the
+nearest-neighbour and 2-opt phases, comparing the walking distance with the
+default (x, y, z) sort. Also times a cached route lookup, which is what a
+repeated journey through an unchanged room costs.
+
+    python benchmarks/bench_route.py --sizes 100,1000,5000,10000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from harness import SRC, import_server, run_metadata, write_report, log
+
+sys.path.insert(0, SRC)
+from route import nearest_neighbour_tour, path_length, two_opt  # noqa: E402
+
+
+def run_size(size: int, args, server):
+    rng = np.random.default_rng(args.seed)
+    points = rng.uniform(0, args.room_size, (size, 3))
+    positions = [tuple(p) for p in points.tolist()]
+    lexicographic = sorted(range(size), key=lambda i: positions[i])
+
+    started = time.perf_counter()
+    greedy = nearest_neighbour_tour(points, lexicographic[0])
+    nn_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    improved = two_opt(points, greedy)
+    two_opt_seconds = time.perf_counter() - started
+
+    # Cached lookup through storage, as a repeated journey would do it
+    locations = [
+        server.MemoryLocation(
+            id=f"m{i:06d}", room="Bench", position={"x": x, "y": y, "z": z}, visual_anchor="",
+            content="", keywords=[], created_at="", last_accessed="", recall_count=0,
+            recall_success_rate=100.0, difficulty_rating=1
+        )
+        for i, (x, y, z) in enumerate(positions)
+    ]
+    server.storage.walk_route("Bench", locations)
+    started = time.perf_counter()
+    for _ in range(args.lookups):
+        server.storage.walk_route("Bench", locations)
+    cached_ms = (time.perf_counter() - started) / args.lookups * 1000
+
+    lengths = {
+        "position_sort": path_length(points, lexicographic),
+        "nearest_neighbour": path_length(points, greedy),
+        "two_opt": path_length(points, improved)
+    }
+    result = {
+        "memories": size,
+        "nearest_neighbour_ms": round(nn_seconds * 1000, 3),
+        "two_opt_ms": round(two_opt_seconds * 1000, 3),
+        "route_ms": round((nn_seconds + two_opt_seconds) * 1000, 3),
+        "cached_lookup_ms": round(cached_ms, 3),
+        "walk_length": {name: round(length, 1) for name, length in lengths.items()},
+        "shorter_than_position_sort": round(1 - lengths["two_opt"] / lengths["position_sort"], 4)
+    }
+    log(f"[{size}] route {result['route_ms']} ms (cached {result['cached_lookup_ms']} ms), "
+        f"{result['shorter_than_position_sort']:.1%} shorter than the (x, y, z) sort")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shortest-walk route benchmark")
+    parser.add_argument("--sizes", default="100,1000,5000,10000")
+    parser.add_argument("--room-size", type=float, default=100.0, help="Edge of the cube positions are drawn from")
+    parser.add_argument("--lookups", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    output = os.path.abspath(args.output) if args.output else None
+    server = import_server()
+
+    write_report({
+        "benchmark": "route",
+        "meta": run_metadata(sizes=sizes, room_size=args.room_size, seed=args.seed),
+        "sizes": {str(size): run_size(size, args, server) for size in sizes}
+    }, output)
+
+
+if __name__ == "__main__":
+    main()
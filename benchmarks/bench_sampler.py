@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+practice_recall sampling benchmark.
+
+For one room of each size, compares drawing k weighted questions from the
+incrementally maintained Fenwick sampler against recomputing every memory's
+weight on each call, and measures the cost of the update that follows a
+practised memory. Also checks the sampler draws in proportion to the
+weights: the total variation distance between observed single-draw
+frequencies and the weights should shrink towards 0 as draws grow.
+
+    python benchmarks/bench_sampler.py --sizes 1000,10000,100000 --k 5
+"""
+import argparse
+import functools
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from harness import SRC, run_metadata, write_report, log
+
+sys.path.insert(0, SRC)
+from sampler import RecallSampler, days_since  # noqa: E402
+from recall import practice_weight  # noqa: E402
+
+ROOM = "Room 000"
+
+
+def synthetic_memories(count: int, seed: int):
+    rng = random.Random(seed)
+    now = datetime.now()
+    return [
+        SimpleNamespace(
+            id=f"m{i:08d}",
+            room=ROOM,
+            recall_success_rate=round(rng.uniform(20, 100), 1),
+            difficulty_rating=rng.randint(1, 10),
+            last_accessed=(now - timedelta(days=rng.randint(0, 60))).isoformat()
+        )
+        for i in range(count)
+    ]
+
+
+def rebuild_and_draw(memories, k: int, rng: random.Random, weight):
+    """The per-call alternative: weigh every memory, then draw k distinct ones"""
+    today = datetime.now().date()
+    weights = [
+        weight(m.recall_success_rate, m.difficulty_rating, days_since(m.last_accessed, today)) for m in memories
+    ]
+    picked = set()
+    while len(picked) < min(k, len(memories)):
+        picked.add(rng.choices(range(len(memories)), weights)[0])
+    return [memories[i].id for i in picked]
+
+
+def per_call_ms(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return round((time.perf_counter() - started) / calls * 1000, 4)
+
+
+def run_size(size: int, args):
+    weight = functools.partial(practice_weight, stale_days_cap=30)
+    memories = synthetic_memories(size, args.seed)
+    sampler = RecallSampler(weight)
+    started = time.perf_counter()
+    sampler.add_many(memories)
+    build_seconds = time.perf_counter() - started
+
+    rng = random.Random(args.seed)
+    calls = max(20, min(2000, 2_000_000 // size))
+    result = {
+        "memories": size,
+        "build_seconds": round(build_seconds, 3),
+        "fenwick_draw_ms": per_call_ms(lambda i: sampler.sample(ROOM, args.k, rng), calls * 10),
+        "fenwick_update_ms": per_call_ms(
+            lambda i: sampler.update(memories[i % size].id, recall_success_rate=rng.uniform(0, 100)), calls * 10
+        ),
+        "rebuild_draw_ms": per_call_ms(lambda i: rebuild_and_draw(memories, args.k, rng, weight), calls)
+    }
+    result["speedup"] = round(result["rebuild_draw_ms"] / result["fenwick_draw_ms"], 1)
+
+    if size <= args.check_max_size:
+        # The update timing above changed weights, so expect the sampler's current ones
+        today = datetime.now().date()
+        expected = {
+            memory_id: weight(r["recall_success_rate"], r["difficulty_rating"], days_since(r["last_accessed"], today))
+            for memory_id, r in sampler.records.items()
+        }
+        total = sum(expected.values())
+        counts = dict.fromkeys(expected, 0)
+        for _ in range(args.check_draws):
+            counts[sampler.sample(ROOM, 1, rng)[0]] += 1
+        result["total_variation_distance"] = round(0.5 * sum(
+            abs(counts[i] / args.check_draws - expected[i] / total) for i in expected
+        ), 4)
+
+    log(f"[{size}] draw {args.k}: fenwick {result['fenwick_draw_ms']} ms vs rebuild {result['rebuild_draw_ms']} ms "
+        f"({result['speedup']}x); update {result['fenwick_update_ms']} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Weighted recall sampling benchmark")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--k", type=int, default=5, help="Questions drawn per call")
+    parser.add_argument("--check-draws", type=int, default=200000)
+    parser.add_argument("--check-max-size", type=int, default=1000, help="Largest room the distribution is checked on")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    write_report({
+        "benchmark": "sampler",
+        "meta": run_metadata(sizes=sizes, k=args.k, seed=args.seed, check_draws=args.check_draws),
+        "sizes": {str(size): run_size(size, args) for size in sizes}
+    }, os.path.abspath(args.output) if args.output else None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: import time and time-to-first-response of the server.
+
+Every run starts a fresh interpreter in an empty scratch directory, so the
+numbers match what a freshly booted deployment sees.
+
+    python benchmarks/bench_startup.py --runs 10 --http
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+from harness import SRC, summarize, run_metadata, write_report, log
+
+CHILD = r"""
+import json, os, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {src!r})
+import server
+imported = time.perf_counter()
+files_after_import = sorted(os.listdir("."))
+server.get_palace_overview.fn()
+responded = time.perf_counter()
+print(json.dumps({{
+    "import_s": imported - started,
+    "first_response_s": responded - started,
+    "files_after_import": files_after_import
+}}))
+"""
+
+
+def run_in_process(workdir: str) -> Dict[str, Any]:
+    """Import the server in a new interpreter and call one tool"""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", CHILD.format(src=SRC)],
+        cwd=workdir, capture_output=True, text=True, check=True
+    )
+    total = time.perf_counter() - started
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["process_s"] = total
+    return result
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_http(workdir: str, timeout: float = 60.0) -> float:
+    """Boot src/server.py and return seconds until the first tool call succeeds"""
+    from fastmcp import Client
+
+    port = free_port()
+    env = dict(os.environ, PORT=str(port))
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(SRC, "server.py")],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    async def first_call():
+        async with Client(f"http://127.0.0.1:{port}/mcp") as client:
+            await client.call_tool("get_palace_overview", {})
+
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                asyncio.run(first_call())
+                return time.perf_counter() - started
+            except Exception:
+                time.sleep(0.05)
+        raise TimeoutError(f"server did not answer within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def measure_startup(runs: int = 5, http: bool = False) -> Dict[str, Any]:
+    """Startup metrics in the same summary format as the tool benchmarks"""
+    imports, first_responses, processes, http_responses = [], [], [], []
+    side_effect_free = True
+
+    for _ in range(runs):
+        result = run_in_process(tempfile.mkdtemp(prefix="palace-startup-"))
+        imports.append(result["import_s"])
+        first_responses.append(result["first_response_s"])
+        processes.append(result["process_s"])
+        side_effect_free = side_effect_free and not result["files_after_import"]
+        if http:
+            http_responses.append(run_http(tempfile.mkdtemp(prefix="palace-startup-")))
+
+    report = {
+        "import": summarize(imports),
+        "first_response": summarize(first_responses),
+        "process": summarize(processes),
+        "import_side_effect_free": side_effect_free
+    }
+    if http:
+        report["http_first_response"] = summarize(http_responses)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--http", action="store_true", help="Also boot the HTTP server and time the first MCP call")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    log(f"Measuring startup over {args.runs} runs")
+    write_report({
+        "benchmark": "startup",
+        "meta": run_metadata(runs=args.runs, http=args.http),
+        "startup": measure_startup(args.runs, args.http)
+    }, os.path.abspath(args.output) if args.output else None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Latency and throughput benchmark for every Memory Palace MCP tool.
+
+Builds a seeded synthetic palace at each requested scale, then calls the
+tool functions (``tool.fn``) directly and reports per-tool latency
+percentiles and ops/sec as JSON. Compare two reports with ``compare.py``.
+
+    python benchmarks/bench_tools.py --scales 1000,10000 --output base.json
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from bench_startup import measure_startup
+from harness import import_server, use_storage, measure, run_metadata, write_report, log
+from palace import PalaceSpec, WORDS, generate_palace, synthetic_content
+
+DEFAULT_SCALES = "1000,10000,100000"
+
+
+def tool_cases(server, rooms):
+    """Benchmark cases: name -> callable taking the iteration index"""
+    def pick_room(i):
+        return rooms[i % len(rooms)]
+
+    def store(i):
+        rng = random.Random(i)
+        server.store_memory.fn(
+            room=pick_room(i),
+            content=synthetic_content(rng, 10_000_000 + i),
+            visual_anchor="A benchmark balloon tied to the lamp",
+            x=rng.uniform(0, 10), y=rng.uniform(0, 10), z=rng.uniform(0, 3),
+            keywords=rng.sample(WORDS, 3)
+        )
+
+    location_ids = sorted(server.storage.load_locations())
+
+    def submit_recall(i):
+        rng = random.Random(i)
+        server.submit_recall_results.fn(results=[
+            {"location_id": location_id, "correct": rng.random() < 0.7, "response_time": rng.uniform(1, 25)}
+            for location_id in rng.sample(location_ids, min(10, len(location_ids)))
+        ])
+
+    return {
+        "store_memory": store,
+        "search_memories": lambda i: server.search_memories.fn(query=WORDS[i % len(WORDS)]),
+        "search_memories[room]": lambda i: server.search_memories.fn(query=WORDS[i % len(WORDS)], room=pick_room(i)),
+        "memory_journey": lambda i: server.memory_journey.fn(room=pick_room(i)),
+        "get_palace_overview": lambda i: server.get_palace_overview.fn(),
+        "practice_recall": lambda i: server.practice_recall.fn(room=pick_room(i), count=5),
+        "submit_recall_results": submit_recall,
+        "ask": lambda i: server.ask.fn(prompt=f"find {WORDS[i % len(WORDS)]} in '{pick_room(i)}'"),
+        "generate_challenge": lambda i: server.storage.generate_challenge("default"),
+        "get_leaderboard": lambda i: server.get_leaderboard.fn(top=10)
+    }
+
+
+def run_scale(server, spec: PalaceSpec, args, only):
+    storage_dir = tempfile.mkdtemp(prefix=f"palace-{spec.memories}-")
+    storage = use_storage(server, storage_dir)
+
+    started = time.perf_counter()
+    rooms = generate_palace(storage, spec)
+    generate_seconds = time.perf_counter() - started
+    log(f"[{spec.memories}] generated palace in {generate_seconds:.2f}s")
+
+    results = {}
+    for name, fn in tool_cases(server, rooms).items():
+        if only and name.split("[")[0] not in only:
+            continue
+        random.seed(spec.seed)
+        results[name] = measure(fn, iterations=args.iterations, time_budget=args.time_budget)
+        log(f"[{spec.memories}] {name}: p50 {results[name]['p50_ms']} ms")
+
+    return {
+        "spec": {
+            "memories": spec.memories,
+            "rooms": spec.rooms,
+            "keywords_per_memory": spec.keywords_per_memory,
+            "users": spec.users,
+            "seed": spec.seed
+        },
+        "generate_seconds": round(generate_seconds, 3),
+        "tools": results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help="Comma separated memory counts")
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--keywords", type=int, default=3, help="Keywords per memory")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--iterations", type=int, default=20, help="Max calls per tool")
+    parser.add_argument("--time-budget", type=float, default=10.0, help="Max seconds per tool")
+    parser.add_argument("--tools", default="", help="Comma separated subset of tools to run")
+    parser.add_argument("--startup-runs", type=int, default=5, help="Cold-start runs to include (0 to skip)")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    only = {t.strip() for t in args.tools.split(",") if t.strip()}
+
+    server = import_server()
+    report = {
+        "benchmark": "tools",
+        "meta": run_metadata(
+            scales=scales, rooms=args.rooms, keywords=args.keywords, users=args.users,
+            seed=args.seed, iterations=args.iterations, time_budget=args.time_budget
+        ),
+        "scales": {}
+    }
+
+    if args.startup_runs:
+        report["startup"] = measure_startup(args.startup_runs)
+        log(f"startup: import p50 {report['startup']['import']['p50_ms']} ms, "
+            f"first response p50 {report['startup']['first_response']['p50_ms']} ms")
+
+    for memories in scales:
+        spec = PalaceSpec(
+            memories=memories, rooms=args.rooms, keywords_per_memory=args.keywords,
+            users=args.users, seed=args.seed
+        )
+        report["scales"][str(memories)] = run_scale(server, spec, args, only)
+
+    write_report(report, output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark reports and flag regressions.
+
+    python benchmarks/compare.py base.json head.json --threshold 1.2
+
+Every numeric latency (``*_ms``) found in both reports is compared; a result
+whose head/base ratio exceeds the threshold is reported as a regression and
+the script exits with status 1.
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Iterator, Tuple
+
+
+def flatten(node, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    """Yield (dotted.path, value) for every latency metric in a report"""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "meta":
+                continue
+            yield from flatten(value, f"{prefix}.{key}" if prefix else key)
+    elif isinstance(node, (int, float)) and prefix.endswith("_ms"):
+        yield prefix, float(node)
+
+
+def compare(base: Dict, head: Dict, metric: str, threshold: float):
+    base_metrics = dict(flatten(base))
+    rows = []
+    for path, head_value in flatten(head):
+        if not path.endswith(metric) or path not in base_metrics:
+            continue
+        base_value = base_metrics[path]
+        ratio = head_value / base_value if base_value else float("inf")
+        rows.append((path, base_value, head_value, ratio, ratio > threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--metric", default="p50_ms", help="Latency field to compare (default p50_ms)")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Max allowed head/base ratio")
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+
+    rows = compare(base, head, args.metric, args.threshold)
+    regressions = 0
+    for path, base_value, head_value, ratio, regressed in rows:
+        flag = "REGRESSION" if regressed else ""
+        regressions += regressed
+        print(f"{path:<70} {base_value:>10.3f} {head_value:>10.3f} {ratio:>6.2f}x {flag}")
+
+    print(f"\n{len(rows)} metrics compared, {regressions} regression(s) above {args.threshold}x")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the Memory Palace benchmark scripts
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+
+
+def import_server(workdir: Optional[str] = None):
+    """Import src/server.py with its working directory inside ``workdir``.
+
+    The server keeps its data directory relative to the current directory, so
+    benchmarks switch into a scratch directory first to never touch a real palace.
+    """
+    workdir = workdir or tempfile.mkdtemp(prefix="palace-bench-")
+    os.chdir(workdir)
+    if SRC not in sys.path:
+        sys.path.insert(0, SRC)
+    import server
+    return server
+
+
+def use_storage(server, storage_dir: str):
+    """Point the server's global storage at a fresh directory"""
+    server.storage = server.MemoryPalaceStorage(storage_dir)
+    return server.storage
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """Latency/throughput summary for a list of per-call durations (seconds)"""
+    ordered = sorted(samples)
+    total = sum(ordered)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return {
+        "iterations": len(ordered),
+        "mean_ms": round(total / len(ordered) * 1000, 3),
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[p95_index] * 1000, 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "ops_per_sec": round(len(ordered) / total, 2) if total else None
+    }
+
+
+def measure(
+    fn: Callable[[int], Any],
+    iterations: int = 20,
+    time_budget: float = 10.0,
+    min_iterations: int = 3,
+    warmup: int = 1
+) -> Dict[str, Any]:
+    """Call ``fn(i)`` repeatedly and summarize the latencies.
+
+    Stops after ``iterations`` calls or once ``time_budget`` seconds have been
+    spent (but never before ``min_iterations`` calls).
+    """
+    for i in range(warmup):
+        fn(-1 - i)
+
+    samples = []
+    spent = 0.0
+    for i in range(iterations):
+        started = time.perf_counter()
+        fn(i)
+        elapsed = time.perf_counter() - started
+        samples.append(elapsed)
+        spent += elapsed
+        if spent >= time_budget and len(samples) >= min_iterations:
+            break
+    return summarize(samples)
+
+
+def run_metadata(**config) -> Dict[str, Any]:
+    """Environment details stored with every report so runs can be compared"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": config
+    }
+
+
+def write_report(report: Dict[str, Any], output: Optional[str]):
+    """Write the JSON report to ``output`` or stdout"""
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + "\n")
+        log(f"Report written to {output}")
+    else:
+        print(text)
+
+
+def log(message: str):
+    print(message, file=sys.stderr, flush=True)
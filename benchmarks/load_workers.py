@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Multi-worker load test for the HTTP server.
+
+Seeds a synthetic palace, then for each worker count boots src/server.py with
+MEMORY_PALACE_WORKERS set and drives it from several client processes with a
+read-heavy tool mix for a fixed time. Reports calls/sec per worker count and
+the speedup over one worker. A closing write phase has every client store
+memories at once and checks that none were lost, i.e. that concurrent
+workers never overwrote each other's saves, and a journey phase has every
+client walk the same room at once and checks every visit was counted in the
+memories' recall counts. Exits with status 1 if anything was lost.
+
+Throughput can only scale up to the number of cores, which the report
+records; run it on a machine with at least as many cores as workers.
+
+    python benchmarks/load_workers.py --workers 1,2,4 --clients 8 --duration 15
+"""
+import argparse
+import asyncio
+import glob
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from harness import SRC, import_server, use_storage, run_metadata, write_report, log
+from palace import PalaceSpec, generate_palace, room_name
+from bench_startup import free_port
+
+READ_MIX = [
+    ("get_palace_overview", {"verbosity": "compact"}),
+    ("search_memories", {"query": "memory", "verbosity": "ids-only"}),
+    ("get_user_profile", {}),
+    ("get_learning_paths", {})
+]
+
+
+def start_server(workdir: str, workers: int, timeout: float = 60.0):
+    """Boot the server and wait until it answers a tool call"""
+    from fastmcp import Client
+
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), MEMORY_PALACE_WORKERS=str(workers))
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(SRC, "server.py")],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}/mcp"
+
+    async def ping():
+        async with Client(url) as client:
+            await client.call_tool("get_server_info", {})
+
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            asyncio.run(ping())
+            return process, url
+        except Exception:
+            time.sleep(0.1)
+    process.terminate()
+    raise TimeoutError(f"server with {workers} workers did not answer within {timeout}s")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def warm_client():
+    """Pay the client import once per pool process, outside the timed window"""
+    import fastmcp  # noqa: F401
+
+
+def read_client(args):
+    """Call the read mix round-robin until the deadline; returns (calls, errors)"""
+    url, deadline, offset = args
+    from fastmcp import Client
+
+    async def run():
+        calls = errors = 0
+        async with Client(url) as client:
+            while time.time() < deadline:
+                tool, arguments = READ_MIX[(offset + calls + errors) % len(READ_MIX)]
+                try:
+                    await client.call_tool(tool, arguments)
+                    calls += 1
+                except Exception:
+                    errors += 1
+        return calls, errors
+
+    return asyncio.run(run())
+
+
+def write_client(args):
+    """Store ``count`` distinct memories; returns how many the server acknowledged"""
+    url, client_index, count = args
+    from fastmcp import Client
+
+    async def run():
+        stored = 0
+        async with Client(url) as client:
+            for i in range(count):
+                result = await client.call_tool("store_memory", {
+                    "room": room_name(0),
+                    "content": f"Load test fact {client_index}-{i}",
+                    "visual_anchor": f"Marker {client_index}-{i}",
+                    "dedupe": "off"
+                })
+                stored += bool(result.data.get("success"))
+        return stored
+
+    return asyncio.run(run())
+
+
+def journey_client(args):
+    """Walk ``room`` ``count`` times; returns how many journeys the server acknowledged"""
+    url, room, count = args
+    from fastmcp import Client
+
+    async def run():
+        walked = 0
+        async with Client(url) as client:
+            for _ in range(count):
+                result = await client.call_tool("memory_journey", {"room": room, "verbosity": "ids-only"})
+                walked += "error" not in result.data
+        return walked
+
+    return asyncio.run(run())
+
+
+def saved_locations(workdir: str):
+    """Every saved location record, from the room partition files"""
+    records = {}
+    for name in glob.glob(os.path.join(workdir, "memory_palace_data", "locations", "room-*.json")):
+        with open(name) as f:
+            records.update(json.load(f))
+    return records
+
+
+def recall_total(workdir: str, room: str) -> int:
+    return sum(record["recall_count"] for record in saved_locations(workdir).values() if record["room"] == room)
+
+
+def seed(spec: PalaceSpec) -> str:
+    workdir = tempfile.mkdtemp(prefix="palace-load-")
+    server = import_server(workdir)
+    generate_palace(use_storage(server, os.path.join(workdir, "memory_palace_data")), spec)
+    return workdir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-worker throughput and consistency load test")
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent client processes")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds of read load per worker count")
+    parser.add_argument("--memories", type=int, default=500)
+    parser.add_argument("--writes", type=int, default=25, help="Memories each client stores in the write phase")
+    parser.add_argument("--journeys", type=int, default=10, help="Journeys each client walks in the journey phase")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output) if args.output else None
+    worker_counts = [int(w) for w in args.workers.split(",")]
+    spec = PalaceSpec(memories=args.memories)
+
+    results = {}
+    lost = False
+    with multiprocessing.Pool(args.clients, initializer=warm_client) as pool:
+        pool.map(abs, range(args.clients))  # wait for every client process to finish warming up
+        for workers in worker_counts:
+            workdir = seed(spec)
+            walked_room = room_name(1)
+            recalls_before = recall_total(workdir, walked_room)
+            process, url = start_server(workdir, workers)
+            try:
+                deadline = time.time() + args.duration
+                outcomes = pool.map(read_client, [(url, deadline, i) for i in range(args.clients)])
+                calls = sum(c for c, _ in outcomes)
+                errors = sum(e for _, e in outcomes)
+
+                acknowledged = sum(pool.map(write_client, [(url, i, args.writes) for i in range(args.clients)]))
+                walked = sum(pool.map(journey_client, [(url, walked_room, args.journeys)] * args.clients))
+            finally:
+                # Queued recall counts are flushed as the workers shut down
+                stop_server(process)
+
+            kept = len(saved_locations(workdir)) - spec.memories
+            recalls_counted = recall_total(workdir, walked_room) - recalls_before
+            with open(os.path.join(workdir, "memory_palace_data", "rooms.json")) as f:
+                linked = len(json.load(f)[room_name(0)]["locations"]) - spec.memories_per_room
+            shutil.rmtree(workdir, ignore_errors=True)
+
+            results[str(workers)] = {
+                "read_calls_per_sec": round(calls / args.duration, 1),
+                "read_errors": errors,
+                "memories_acknowledged": acknowledged,
+                "memories_kept": kept,
+                "memories_linked_to_room": linked,
+                "journeys_acknowledged": walked,
+                "recalls_expected": walked * spec.memories_per_room,
+                "recalls_counted": recalls_counted
+            }
+            lost = (lost or kept != acknowledged or linked != acknowledged
+                    or recalls_counted != walked * spec.memories_per_room)
+            log(f"[{workers} workers] {calls / args.duration:.1f} read calls/s ({errors} errors); "
+                f"write phase kept {kept}/{acknowledged} memories; journey phase counted "
+                f"{recalls_counted}/{walked * spec.memories_per_room} recalls")
+
+    baseline = results[str(worker_counts[0])]["read_calls_per_sec"]
+    for workers in worker_counts:
+        results[str(workers)]["speedup"] = round(results[str(workers)]["read_calls_per_sec"] / baseline, 2)
+
+    write_report({
+        "benchmark": "load_workers",
+        "meta": run_metadata(
+            workers=worker_counts, clients=args.clients, duration=args.duration,
+            memories=args.memories, writes=args.writes, journeys=args.journeys, cpu_count=os.cpu_count()
+        ),
+        "results": results,
+        "passed": not lost
+    }, output)
+    sys.exit(1 if lost else 0)
+
+
+if __name__ == "__main__":
+    main()
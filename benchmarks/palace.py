@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Synthetic, seeded memory palaces for benchmarking
+"""
+import hashlib
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List
+
+WORDS = [
+    "atom", "biology", "cell", "chemistry", "dna", "energy", "enzyme", "force",
+    "galaxy", "gravity", "history", "ion", "kinetic", "light", "magnet", "molecule",
+    "neuron", "orbit", "oxygen", "photosynthesis", "planet", "plant", "protein", "quantum",
+    "river", "senate", "spanish", "star", "sugar", "temple", "theorem", "vector",
+    "verb", "volcano", "water", "wave", "empire", "equation", "fraction", "grammar"
+]
+
+ANCHORS = [
+    "A giant glowing {w} balanced on the bookshelf",
+    "A dancing {w} wearing a tiny top hat next to the window",
+    "A bright red {w} painted on the ceiling",
+    "A talking {w} sitting on the armchair",
+    "A {w} made of ice melting on the table"
+]
+
+BASE_TIME = datetime(2025, 1, 1)
+
+
+@dataclass
+class PalaceSpec:
+    """Shape of a synthetic palace"""
+    memories: int = 1000
+    rooms: int = 20
+    keywords_per_memory: int = 3
+    users: int = 10
+    seed: int = 1234
+
+    @property
+    def memories_per_room(self) -> int:
+        return max(1, self.memories // max(1, self.rooms))
+
+
+def room_name(index: int) -> str:
+    return f"Room {index:03d}"
+
+
+def synthetic_content(rng: random.Random, index: int) -> str:
+    words = rng.sample(WORDS, 4)
+    return f"Fact {index}: the {words[0]} of {words[1]} explains {words[2]} and {words[3]}"
+
+
+def generate_palace(storage, spec: PalaceSpec) -> List[str]:
+    """Fill ``storage`` with a reproducible palace and return the room names"""
+    # Imported lazily so this module can be loaded before the server is configured
+    from server import MemoryLocation, MemoryRoom, UserProfile
+
+    rng = random.Random(spec.seed)
+    rooms = {}
+    locations = {}
+    room_names = [room_name(i) for i in range(spec.rooms)]
+
+    for i, name in enumerate(room_names):
+        connections = [room_names[(i + 1) % spec.rooms]] if spec.rooms > 1 else []
+        created = (BASE_TIME + timedelta(minutes=i)).isoformat()
+        rooms[name] = MemoryRoom(
+            name=name,
+            description=f"Synthetic room {i}",
+            locations=[],
+            connections=connections,
+            created_at=created,
+            last_visited=created
+        )
+
+    for i in range(spec.memories):
+        name = room_names[i % spec.rooms]
+        location_id = hashlib.md5(f"{spec.seed}:{i}".encode()).hexdigest()[:12]
+        anchor_word = rng.choice(WORDS)
+        stamp = (BASE_TIME + timedelta(seconds=rng.randint(0, 90 * 24 * 3600))).isoformat()
+        locations[location_id] = MemoryLocation(
+            id=location_id,
+            room=name,
+            position={
+                "x": round(rng.uniform(0, 10), 2),
+                "y": round(rng.uniform(0, 10), 2),
+                "z": round(rng.uniform(0, 3), 2)
+            },
+            visual_anchor=rng.choice(ANCHORS).format(w=anchor_word),
+            content=synthetic_content(rng, i),
+            keywords=rng.sample(WORDS, spec.keywords_per_memory),
+            created_at=stamp,
+            last_accessed=stamp,
+            recall_count=rng.randint(0, 12),
+            recall_success_rate=round(rng.uniform(40, 100), 1),
+            difficulty_rating=rng.randint(1, 10)
+        )
+        rooms[name].locations.append(location_id)
+
+    storage.save_rooms(rooms)
+    storage.save_locations(locations)
+
+    for u in range(spec.users):
+        user_id = "default" if u == 0 else f"user_{u:04d}"
+        storage.save_user_profile(UserProfile(
+            id=user_id,
+            username=f"Bench {u}",
+            personality="sage",
+            level=rng.randint(1, 12),
+            xp=rng.randint(0, 90),
+            streak_days=rng.randint(0, 10),
+            total_memories=spec.memories,
+            total_rooms=spec.rooms
+        ))
+
+    return room_names
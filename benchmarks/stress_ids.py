@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Uniqueness and ordering stress test for location IDs.
+
+Hammers the ID generator from many threads and several processes at once,
+then checks that no ID repeats, that each thread's IDs strictly increase, and
+that a bulk insert through store_memory keeps every memory (the md5 scheme it
+replaced could overwrite one stored twice in the same microsecond). Exits
+with status 1 on any failure.
+
+    python benchmarks/stress_ids.py --threads 16 --per-thread 20000 --processes 4
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from harness import SRC, import_server, use_storage, run_metadata, write_report, log
+
+sys.path.insert(0, SRC)
+from ids import ID_LENGTH, new_id  # noqa: E402
+
+
+def generate_in_threads(threads: int, per_thread: int):
+    """IDs per thread, generated concurrently"""
+    results = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads)
+
+    def worker(index):
+        barrier.wait()
+        ids = results[index]
+        for _ in range(per_thread):
+            ids.append(new_id())
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return results
+
+
+def process_worker(args):
+    threads, per_thread = args
+    return [i for ids in generate_in_threads(threads, per_thread) for i in ids]
+
+
+def check(name: str, ids_by_source, failures):
+    all_ids = [i for ids in ids_by_source for i in ids]
+    duplicates = len(all_ids) - len(set(all_ids))
+    unordered = sum(
+        1 for ids in ids_by_source for a, b in zip(ids, ids[1:]) if not a < b
+    )
+    malformed = sum(1 for i in all_ids if len(i) != ID_LENGTH)
+    if duplicates or unordered or malformed:
+        failures.append(name)
+    log(f"{name}: {len(all_ids)} ids, {duplicates} duplicates, {unordered} out of order, {malformed} malformed")
+    return {"ids": len(all_ids), "duplicates": duplicates, "out_of_order": unordered, "malformed": malformed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Location ID uniqueness stress test")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--per-thread", type=int, default=20000)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--bulk", type=int, default=2000, help="Identical memories stored back to back")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output) if args.output else None
+    failures = []
+    report = {}
+
+    started = time.perf_counter()
+    report["threads"] = check("threads", generate_in_threads(args.threads, args.per_thread), failures)
+    total = args.threads * args.per_thread
+    report["threads"]["ids_per_sec"] = round(total / (time.perf_counter() - started))
+
+    with multiprocessing.Pool(args.processes) as pool:
+        per_process = pool.map(process_worker, [(args.threads, args.per_thread // 4)] * args.processes)
+    # Ordering only holds within a process; uniqueness must hold across them
+    report["processes"] = check("processes", [sorted(ids) for ids in per_process], failures)
+
+    server = import_server()
+    use_storage(server, tempfile.mkdtemp(prefix="palace-ids-"))
+    server.create_room.fn(name="Bulk", description="Stress test room")
+    stored = [
+        server.store_memory.fn(room="Bulk", content="Same fact", visual_anchor="Same anchor", dedupe="off")["location_id"]
+        for _ in range(args.bulk)
+    ]
+    kept = len(server.storage.load_locations())
+    report["bulk_store"] = check("bulk_store", [stored], failures)
+    report["bulk_store"]["memories_kept"] = kept
+    if kept != args.bulk:
+        failures.append("bulk_store")
+        log(f"bulk_store: stored {args.bulk} memories but only {kept} were kept")
+
+    report["passed"] = not failures
+    write_report({
+        "benchmark": "stress_ids",
+        "meta": run_metadata(threads=args.threads, per_thread=args.per_thread, processes=args.processes, bulk=args.bulk),
+        "results": report
+    }, output)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
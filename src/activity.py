@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Activity log and analytics rollups
+
+Every top-level tool call becomes one event (tool, rooms, memory ids, XP
+gained, latency) appended as a JSON line to the current segment file. Event
+ids are time-ordered, and so are segment names, which are the id current
+when the segment was opened. A segment that grows past ``segment_bytes`` is
+closed and a new one started; only the newest ``max_segments`` are kept, so
+the raw log never uses much more than ``segment_bytes * max_segments`` on
+disk.
+
+Hourly and daily rollups (event, error and XP totals, latency, calls per tool
+and visits per room) are counted in memory as events arrive and added to the
+shared rollups file every ``flush_interval`` seconds and at exit, so several
+worker processes can count into one file and analytics never read raw
+events. Hourly buckets are kept for ``hourly_days`` days, daily ones for
+``daily_days``.
+
+Tools report what they touched with ``note_activity`` while they run; it
+adds to the event of the outermost tool call on the current thread, so a
+tool calling another tool (``ask``) is still one event.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional
+
+try:
+    from ids import new_id
+except ImportError:
+    from src.ids import new_id
+
+SEGMENT_PREFIX = "events-"
+ROLLUPS_FILE = "rollups.json"
+
+_current = threading.local()
+
+
+def note_activity(rooms: Iterable[str] = (), memory_ids: Iterable[str] = (), xp: int = 0):
+    """Add rooms, memories and XP to the event of the tool call running on this thread, if any"""
+    event = getattr(_current, "event", None)
+    if event is None:
+        return
+    for room in rooms:
+        if room and room not in event["rooms"]:
+            event["rooms"].append(room)
+    event["memory_ids"].extend(memory_ids)
+    event["xp"] += xp
+
+
+def _add_event(bucket: Dict[str, Any], event: Dict[str, Any]):
+    bucket["events"] = bucket.get("events", 0) + 1
+    bucket["errors"] = bucket.get("errors", 0) + (not event["ok"])
+    bucket["xp"] = bucket.get("xp", 0) + event["xp"]
+    bucket["latency_ms"] = round(bucket.get("latency_ms", 0.0) + event["latency_ms"], 3)
+    bucket["memories"] = bucket.get("memories", 0) + len(event["memory_ids"])
+    tools = bucket.setdefault("tools", {})
+    tools[event["tool"]] = tools.get(event["tool"], 0) + 1
+    rooms = bucket.setdefault("rooms", {})
+    for room in event["rooms"]:
+        rooms[room] = rooms.get(room, 0) + 1
+
+
+def _merge(bucket: Dict[str, Any], delta: Dict[str, Any]):
+    for name, value in delta.items():
+        if isinstance(value, dict):
+            counts = bucket.setdefault(name, {})
+            for key, count in value.items():
+                counts[key] = counts.get(key, 0) + count
+        else:
+            bucket[name] = round(bucket.get(name, 0) + value, 3)
+
+
+class ActivityLog:
+    """Append-only event segments plus incrementally maintained hourly/daily rollups"""
+
+    def __init__(self, directory: str, segment_bytes: int, max_segments: int, hourly_days: int,
+                 daily_days: int, flush_interval: float, max_memory_ids: int,
+                 lock: Optional[Callable[[], ContextManager]] = None):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.hourly_days = hourly_days
+        self.daily_days = daily_days
+        self.flush_interval = flush_interval
+        self.max_memory_ids = max_memory_ids
+        self.lock = lock or nullcontext  # cross-process lock around rotation and rollup merges
+        self.rollups_file = os.path.join(directory, ROLLUPS_FILE)
+        self._segment: Optional[str] = None
+        self._pending: Dict[str, Dict[str, Dict[str, Any]]] = {"hourly": {}, "daily": {}}
+        self._thread_lock = threading.Lock()
+        self._next_flush = time.time() + flush_interval
+        self._registered = False
+
+    @contextmanager
+    def event(self, tool: str) -> Iterator[Dict[str, Any]]:
+        """Time a tool call and record it; calls nested in another tool call add to the outer event"""
+        if getattr(_current, "event", None) is not None:
+            yield _current.event
+            return
+        event = {"id": new_id(), "at": datetime.now().isoformat(), "tool": tool, "rooms": [],
+                 "memory_ids": [], "xp": 0, "latency_ms": 0.0, "ok": True}
+        _current.event = event
+        started = time.perf_counter()
+        try:
+            yield event
+        except Exception:
+            event["ok"] = False
+            raise
+        finally:
+            _current.event = None
+            event["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            self.record(event)
+
+    def record(self, event: Dict[str, Any]):
+        """Append an event to the log and count it in the rollups"""
+        event["memory_ids"] = event["memory_ids"][:self.max_memory_ids]
+        line = json.dumps(event, separators=(",", ":")) + "\n"
+        hour = event["at"][:13]
+        with self._thread_lock:
+            _add_event(self._pending["hourly"].setdefault(hour, {}), event)
+            _add_event(self._pending["daily"].setdefault(hour[:10], {}), event)
+            if not self._registered:
+                self._registered = True
+                atexit.register(self.flush)
+        self._append(line)
+        if time.time() >= self._next_flush:
+            try:
+                self.flush()
+            except OSError:
+                pass  # still pending; the next flush retries
+
+    def segments(self) -> List[str]:
+        """Segment file paths, oldest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        return [
+            os.path.join(self.directory, name) for name in sorted(os.listdir(self.directory))
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(".jsonl")
+        ]
+
+    def _append(self, line: str):
+        if self._segment is None:
+            self._rotate()
+        # One O_APPEND write per event, so lines from several threads or processes don't interleave.
+        # Opened without O_CREAT: a segment another worker dropped is never brought back.
+        while True:
+            try:
+                fd = os.open(self._segment, os.O_WRONLY | os.O_APPEND)
+                break
+            except FileNotFoundError:
+                self._rotate()
+        with os.fdopen(fd, "a") as f:
+            f.write(line)
+            full = f.tell() >= self.segment_bytes
+        if full:
+            self._rotate()
+
+    def _rotate(self):
+        """Move to the newest segment, starting a new one if it is full, and drop the oldest beyond the limit"""
+        with self.lock():
+            os.makedirs(self.directory, exist_ok=True)
+            segments = self.segments()
+            if not segments or os.path.getsize(segments[-1]) >= self.segment_bytes:
+                segments.append(os.path.join(self.directory, f"{SEGMENT_PREFIX}{new_id()}.jsonl"))
+                open(segments[-1], "a").close()
+            self._segment = segments[-1]
+            for old in segments[:-self.max_segments]:
+                try:
+                    os.remove(old)
+                except FileNotFoundError:
+                    pass  # another worker removed it first
+
+    def _read_rollups(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        try:
+            with open(self.rollups_file) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {"hourly": {}, "daily": {}}
+
+    def flush(self):
+        """Add the rollup counts gathered since the last flush to the rollups file"""
+        with self._thread_lock:
+            pending, self._pending = self._pending, {"hourly": {}, "daily": {}}
+            self._next_flush = time.time() + self.flush_interval
+        if not pending["hourly"] and not pending["daily"]:
+            return
+        try:
+            self._write_rollups(pending)
+        except Exception:
+            # Keep the counts for the next flush
+            with self._thread_lock:
+                for period, buckets in pending.items():
+                    for key, delta in buckets.items():
+                        _merge(self._pending[period].setdefault(key, {}), delta)
+            raise
+
+    def _write_rollups(self, pending: Dict[str, Dict[str, Dict[str, Any]]]):
+        with self.lock():
+            rollups = self._read_rollups()
+            for period, buckets in pending.items():
+                stored = rollups.setdefault(period, {})
+                for key, delta in buckets.items():
+                    _merge(stored.setdefault(key, {}), delta)
+            now = datetime.now()
+            hourly_cutoff = (now - timedelta(days=self.hourly_days)).isoformat()[:13]
+            daily_cutoff = (now - timedelta(days=self.daily_days)).isoformat()[:10]
+            rollups["hourly"] = {k: v for k, v in rollups["hourly"].items() if k >= hourly_cutoff}
+            rollups["daily"] = {k: v for k, v in rollups["daily"].items() if k >= daily_cutoff}
+            os.makedirs(self.directory, exist_ok=True)
+            temporary = f"{self.rollups_file}.{os.getpid()}.tmp"
+            with open(temporary, "w") as f:
+                json.dump(rollups, f, separators=(",", ":"))
+            os.replace(temporary, self.rollups_file)
+
+    def rollups(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Saved rollups plus this process's counts not yet flushed"""
+        rollups = self._read_rollups()
+        with self._thread_lock:
+            for period, buckets in self._pending.items():
+                stored = rollups.setdefault(period, {})
+                for key, delta in buckets.items():
+                    _merge(stored.setdefault(key, {}), delta)
+        return rollups
+
+    def disk_usage(self) -> Dict[str, int]:
+        segments = self.segments()
+        return {"segments": len(segments), "bytes": sum(os.path.getsize(path) for path in segments)}
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Approximate nearest-neighbour search for memory vectors
+
+An IVF (inverted file) index: spherical k-means splits the unit vectors into
+``n_lists`` clusters and each query only scores the rows of the ``n_probe``
+clusters whose centroids are closest. ``n_probe`` trades recall for latency.
+"""
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class IVFIndex:
+    """Inverted-file index over the rows of a caller-owned vector matrix"""
+
+    def __init__(self, n_lists: Optional[int] = None, n_probe: int = 8,
+                 train_iterations: int = 8, max_train_rows: int = 20000, seed: int = 0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_iterations = train_iterations
+        self.max_train_rows = max_train_rows
+        self.seed = seed
+
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[List[int]] = []
+        self._list_arrays: List[Optional[np.ndarray]] = []
+        self.trained_size = 0
+        self.size = 0
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def needs_retrain(self) -> bool:
+        """Clusters drift as inserts accumulate; retrain once the index has doubled"""
+        return not self.trained or self.size > 2 * self.trained_size
+
+    def train(self, matrix: np.ndarray, rows: np.ndarray):
+        """Cluster ``matrix[rows]`` with spherical k-means and assign every row to a list"""
+        rng = np.random.default_rng(self.seed)
+        n_lists = self.n_lists or max(1, int(math.sqrt(len(rows))))
+        n_lists = min(n_lists, len(rows))
+
+        sample = rows if len(rows) <= self.max_train_rows else rng.choice(rows, self.max_train_rows, replace=False)
+        vectors = matrix[sample]
+        centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+
+        for _ in range(self.train_iterations):
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, vectors)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            # Reseed empty clusters with random sample vectors
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+            norms[empty] = 1.0
+            centroids = sums / norms
+
+        self.centroids = centroids.astype(np.float32)
+        self.lists = [[] for _ in range(n_lists)]
+        self._list_arrays = [None] * n_lists
+        self.size = 0
+        self.add_many(rows, matrix[rows])
+        self.trained_size = len(rows)
+
+    def add_many(self, rows: np.ndarray, vectors: np.ndarray):
+        """Assign new rows to their nearest centroid"""
+        if not self.trained or len(rows) == 0:
+            return
+        assignment = np.argmax(vectors @ self.centroids.T, axis=1)
+        for row, cluster in zip(rows.tolist(), assignment.tolist()):
+            self.lists[cluster].append(row)
+            self._list_arrays[cluster] = None
+        self.size += len(rows)
+
+    def _list_array(self, cluster: int) -> np.ndarray:
+        array = self._list_arrays[cluster]
+        if array is None:
+            array = np.fromiter(self.lists[cluster], dtype=np.int64, count=len(self.lists[cluster]))
+            self._list_arrays[cluster] = array
+        return array
+
+    def candidates(self, query: np.ndarray, n_probe: Optional[int] = None) -> np.ndarray:
+        """Rows in the ``n_probe`` clusters closest to ``query``"""
+        n_probe = min(n_probe or self.n_probe, len(self.lists))
+        centroid_scores = self.centroids @ query
+        probe = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        arrays = [self._list_array(c) for c in probe.tolist() if self.lists[c]]
+        return np.concatenate(arrays) if arrays else np.zeros(0, dtype=np.int64)
+
+    def search(self, matrix: np.ndarray, query: np.ndarray, active: np.ndarray,
+               top_k: int, n_probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate top-k (rows, scores) for one unit query vector"""
+        rows = self.candidates(query, n_probe)
+        rows = rows[active[rows]]
+        if len(rows) == 0:
+            return rows, np.zeros(0, dtype=np.float32)
+
+        scores = matrix[rows] @ query
+        k = min(top_k, len(rows))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return rows[best], scores[best]
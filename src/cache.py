@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Result cache for read-heavy Memory Palace tools
+
+A bounded LRU keyed on (user, tool, normalised arguments). Every entry
+remembers the palace generation it was computed at; a lookup with a newer
+generation is a miss and drops the entry, so a cached result is never served
+after the data it was built from has changed.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class ResultCache:
+    """Thread-safe LRU of tool results tagged with the generation they were computed at"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, generation: int) -> Optional[Any]:
+        """Cached value for ``key`` if it was computed at ``generation``, else None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generation:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+                self.stale += 1
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, generation: int, value: Any):
+        with self._lock:
+            self._entries[key] = (generation, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Read-only catalogue structures for the Memory Palace MCP Server
+
+Achievements, challenge templates, learning paths and personality messages
+never change while the server runs, so they are frozen once into immutable
+mappings/tuples with their derived lookups (stage thresholds, pre-split
+message templates) computed up front.
+"""
+from bisect import bisect_right
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+try:
+    from const import (
+        PERSONALITIES,
+        DEFAULT_ACHIEVEMENTS,
+        DEFAULT_CHALLENGES,
+        DEFAULT_LEARNING_PATHS
+    )
+except ImportError:
+    from src.const import (
+        PERSONALITIES,
+        DEFAULT_ACHIEVEMENTS,
+        DEFAULT_CHALLENGES,
+        DEFAULT_LEARNING_PATHS
+    )
+
+# Each learning-path stage covers this many percent of progress
+STAGE_PROGRESS_SPAN = 20
+
+STREAK_PLACEHOLDER = "{streak}"
+
+
+def freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Inverse of freeze(), used when an override has to be written back to JSON"""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+class Catalog:
+    """Frozen achievements, challenge templates and learning paths with precomputed lookups"""
+
+    def __init__(self, achievements: Dict, challenges: Dict, learning_paths: Dict):
+        self.achievements: Mapping[str, Mapping] = freeze(achievements)
+        self.challenges: Mapping[str, Mapping] = freeze(challenges)
+        self.learning_paths: Mapping[str, Mapping] = freeze(learning_paths)
+
+        self.achievement_ids: Tuple[str, ...] = tuple(self.achievements)
+        self.challenge_types: Tuple[str, ...] = tuple(self.challenges)
+
+        # Progress percentage at which each stage after the first begins
+        self.stage_thresholds: Mapping[str, Tuple[float, ...]] = MappingProxyType({
+            path_id: tuple(STAGE_PROGRESS_SPAN * (i + 1) for i in range(len(path["stages"]) - 1))
+            for path_id, path in self.learning_paths.items()
+        })
+
+    def stage_index(self, path_id: str, progress: float) -> int:
+        """0-based index of the stage a user with ``progress`` percent is on"""
+        return bisect_right(self.stage_thresholds[path_id], progress)
+
+    def replace(
+        self,
+        achievements: Optional[Dict] = None,
+        challenges: Optional[Dict] = None,
+        learning_paths: Optional[Dict] = None
+    ) -> "Catalog":
+        """Copy-on-write: a new catalogue with some sections overridden"""
+        return Catalog(
+            achievements if achievements is not None else self.achievements,
+            challenges if challenges is not None else self.challenges,
+            learning_paths if learning_paths is not None else self.learning_paths
+        )
+
+
+def _personality_templates() -> Mapping[str, Mapping[str, Tuple[str, ...]]]:
+    """Messages split around {streak}, with the personality emoji already prefixed"""
+    templates = {}
+    for personality_id, personality in PERSONALITIES.items():
+        messages = {}
+        for message_type, message in personality["messages"].items():
+            parts = message.split(STREAK_PLACEHOLDER)
+            parts[0] = f"{personality['emoji']} {parts[0]}"
+            messages[message_type] = tuple(parts)
+        messages[None] = (f"{personality['emoji']} ",)  # Unknown message types
+        templates[personality_id] = MappingProxyType(messages)
+    return MappingProxyType(templates)
+
+
+DEFAULT_CATALOG = Catalog(DEFAULT_ACHIEVEMENTS, DEFAULT_CHALLENGES, DEFAULT_LEARNING_PATHS)
+
+PERSONALITY_TEMPLATES = _personality_templates()
+
+
+def render_personality_message(personality: str, message_type: str, streak: int = 0) -> str:
+    """Personality message with the emoji prefix and {streak} filled in"""
+    messages = PERSONALITY_TEMPLATES.get(personality) or PERSONALITY_TEMPLATES["sage"]
+    parts = messages.get(message_type) or messages[None]
+    if len(parts) == 1:
+        return parts[0]
+    return str(streak).join(parts)
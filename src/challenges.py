@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Started challenges for the Memory Palace MCP Server
+
+Every challenge a user starts is kept, with its target memories and reward,
+until it is completed or expires. Besides the records by id, the store keeps
+each user's active challenge ids and a min-heap of the time each record is
+next due: its expiry while active, its purge time once finished. A sweep
+only pops the entries that are due, so expiring stale challenges never scans
+every user or every challenge. Heap entries left behind when a challenge
+finishes early are recognised as stale by their time and skipped.
+
+Answers are scored by how many of a target memory's words they recall; each
+answer counts towards at most one target.
+"""
+import heapq
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+
+try:
+    from dedup import TOKEN_PATTERN
+except ImportError:
+    from src.dedup import TOKEN_PATTERN
+
+
+def _timestamp(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+class ChallengeStore:
+    """Started challenges by id, active ids per user and a due-time heap for expiry and purging"""
+
+    def __init__(self, history_seconds: float, records: Mapping[str, Mapping[str, Any]] = ()):
+        self.history_seconds = history_seconds
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.active_by_user: Dict[str, Set[str]] = {}
+        self._due: List[Tuple[float, str]] = []
+        for record in dict(records).values():
+            self.add(dict(record))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _due_at(self, record: Mapping[str, Any]) -> float:
+        if record["status"] == "active":
+            return _timestamp(record["expires_at"])
+        return _timestamp(record["finished_at"]) + self.history_seconds
+
+    def add(self, record: Dict[str, Any]):
+        self.records[record["id"]] = record
+        if record["status"] == "active":
+            self.active_by_user.setdefault(record["user_id"], set()).add(record["id"])
+        heapq.heappush(self._due, (self._due_at(record), record["id"]))
+
+    def get(self, challenge_id: str) -> Optional[Dict[str, Any]]:
+        return self.records.get(challenge_id)
+
+    def active_ids(self, user_id: str) -> List[str]:
+        return sorted(self.active_by_user.get(user_id, ()))
+
+    def due(self, now: datetime) -> bool:
+        """Whether a sweep at ``now`` would pop anything (possibly only stale entries)"""
+        return bool(self._due) and self._due[0][0] <= now.timestamp()
+
+    def finish(self, challenge_id: str, status: str, finished_at: str, **fields):
+        """Mark an active challenge completed or expired; it is purged ``history_seconds`` later"""
+        record = self.records[challenge_id]
+        record.update(fields, status=status, finished_at=finished_at)
+        self.active_by_user.get(record["user_id"], set()).discard(challenge_id)
+        heapq.heappush(self._due, (self._due_at(record), challenge_id))
+
+    def sweep(self, now: datetime) -> Tuple[List[str], List[str]]:
+        """Expire active challenges and purge finished ones that are due; returns (expired, purged) ids"""
+        expired, purged = [], []
+        cutoff = now.timestamp()
+        while self._due and self._due[0][0] <= cutoff:
+            due, challenge_id = heapq.heappop(self._due)
+            record = self.records.get(challenge_id)
+            if record is None or self._due_at(record) != due:
+                continue  # finished or purged since this entry was pushed
+            if record["status"] == "active":
+                self.finish(challenge_id, "expired", now.isoformat())
+                expired.append(challenge_id)
+            else:
+                del self.records[challenge_id]
+                purged.append(challenge_id)
+        return expired, purged
+
+    def to_json(self) -> Dict[str, Dict[str, Any]]:
+        return self.records
+
+
+def recall_score(content: str, answer: str) -> float:
+    """Fraction (0-1) of the memory's distinct words that the answer contains"""
+    words = set(TOKEN_PATTERN.findall(content.lower()))
+    if not words:
+        return 0.0
+    return len(words & set(TOKEN_PATTERN.findall(answer.lower()))) / len(words)
+
+
+def score_answers(targets: Mapping[str, str], answers: List[str]) -> Dict[str, Tuple[float, Optional[int]]]:
+    """Best one-to-one matching of answers to target memories (id -> content), greedily by score
+
+    Returns target id -> (score, index of the matched answer or None).
+    """
+    pairs = sorted(
+        (
+            (recall_score(content, answer), target_id, index)
+            for target_id, content in targets.items()
+            for index, answer in enumerate(answers)
+        ),
+        key=lambda pair: -pair[0]
+    )
+    matched: Dict[str, Tuple[float, Optional[int]]] = {}
+    used = set()
+    for score, target_id, index in pairs:
+        if score <= 0:
+            break
+        if target_id in matched or index in used:
+            continue
+        matched[target_id] = (score, index)
+        used.add(index)
+    return {target_id: matched.get(target_id, (0.0, None)) for target_id in targets}
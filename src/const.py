@@ -297,6 +297,79 @@ DEFAULT_LEARNING_PATHS = {
 # Spaced repetition intervals (in days) based on the Ebbinghaus forgetting curve
 SPACED_REPETITION_INTERVALS = [1, 3, 7, 14, 30, 90, 180]
 
+# Search modes accepted by search_memories
+SEARCH_MODES = ["exact", "semantic", "fuzzy"]
+
+# Semantic search: size of the hashed embedding and minimum cosine similarity
+SEMANTIC_DIMENSIONS = 512
+SEMANTIC_MIN_SCORE = 0.1
+
+# Approximate nearest-neighbour (IVF) index for semantic search on large palaces
+SEMANTIC_ANN_MIN_SIZE = 20000  # Below this many memories brute force is fast enough
+SEMANTIC_ANN_N_PROBE = 8  # Clusters scanned per query: higher = better recall, slower
+
+# Fuzzy search: upper bound on edits per query word (callers may ask for fewer)
+FUZZY_MAX_DISTANCE = 2
+
+# Unfiltered exact search_memories: room partitions can be scanned on a process pool on large palaces.
+# The pool is off until it has been measured on a multi-core machine (see benchmarks/README.md)
+PARALLEL_SEARCH_MIN_MEMORIES = 20000  # Estimate, not yet measured: below this many memories scan serially
+PARALLEL_SEARCH_MIN_PARTITIONS = 2  # A single room can't be split
+PARALLEL_SEARCH_WORKERS = 1  # Pool size; 1 = serial scan (pool off), None = CPUs per server worker process
+
+# Entries kept in the LRU cache of search/overview results
+RESULT_CACHE_SIZE = 256
+
+# Orders memory_journey can visit a room's memories in
+JOURNEY_ORDERS = ["position", "shortest"]
+
+# Response detail levels for store_memory, search_memories, memory_journey and get_palace_overview
+VERBOSITY_LEVELS = ["full", "compact", "ids-only"]
+
+# Duplicate detection on store_memory: "exact" (default) catches identical content,
+# "near" (opt-in) also lightly reworded content that mentions the same numbers
+DEDUPE_MODES = ["exact", "near", "off"]
+DEDUPE_MIN_SIMILARITY = 0.75  # Jaccard similarity of words and word pairs
+
+# Write-behind flushing of soft updates (access times, recall counts, room mastery)
+WRITE_BEHIND_INTERVAL = 2.0  # Seconds between background flushes
+WRITE_BEHIND_MAX_PENDING = 5000  # Queued records that trigger an early flush
+
+# Recall outcomes (submit_recall_results): moving-average weight of each new result
+RECALL_EMA_ALPHA = 0.3
+RECALL_FAST_SECONDS = 3.0  # Correct answers this fast rate as difficulty 1
+RECALL_SLOW_SECONDS = 20.0  # Correct answers this slow (or slower) rate as difficulty 7; misses rate 10
+RECALL_MAX_BATCH = 500
+RECALL_STALE_DAYS_CAP = 30  # practice_recall's preference for unpractised memories stops growing after this
+
+# Forgetting curve (get_palace_overview retention): retention = exp(-days since access / stability)
+RETENTION_BASE_DAYS = 1.0  # Stability of a never-recalled memory
+RETENTION_GROWTH = 1.5  # Stability grows as (1 + successful recalls) ** this; 10 perfect recalls ~ 36 days
+
+# Most users get_leaderboard returns in one call
+LEADERBOARD_MAX_TOP = 100
+
+# Started challenges (start_challenge / complete_challenge)
+CHALLENGE_EXPIRY_HOURS = 24  # Active challenges expire this long after starting
+CHALLENGE_HISTORY_DAYS = 7  # Completed and expired challenges are kept this long
+CHALLENGE_SWEEP_INTERVAL = 60  # Seconds between sweeps for expired challenges
+CHALLENGE_RECALL_THRESHOLD = 0.6  # Share of a memory's words an answer needs to count as recalling it
+CHALLENGE_PASS_RATIO = 0.6  # Share of target memories recalled to win
+CHALLENGE_MAX_ANSWERS = 100
+
+# Activity log (get_activity_analytics): raw events in rotated segments, plus hourly/daily rollups
+ACTIVITY_SEGMENT_BYTES = 1_000_000  # A segment this large is closed and a new one started
+ACTIVITY_MAX_SEGMENTS = 20  # Older segments are deleted, bounding the raw log at ~20 MB
+ACTIVITY_HOURLY_DAYS = 7  # Hourly rollups kept
+ACTIVITY_DAILY_DAYS = 365  # Daily rollups kept
+ACTIVITY_FLUSH_INTERVAL = 10.0  # Seconds between merges of each worker's counts into the rollups file
+ACTIVITY_MAX_MEMORY_IDS = 50  # Memory ids kept per event
+
+# Profiling mode defaults (enabled with MEMORY_PALACE_PROFILE=1)
+PROFILE_SAMPLE_RATE = 1.0  # Fraction of tool calls that are profiled
+PROFILE_WINDOW_SECONDS = 300  # Only samples from the last N seconds are reported
+PROFILE_TOP_N = 20  # Default number of functions in the report
+
 # Server information
 SERVER_INFO = {
     "server_name": "Memory Palace MCP Server",
@@ -306,6 +379,7 @@ SERVER_INFO = {
         "Create virtual rooms for organizing knowledge",
         "Store memories with spatial coordinates and visual anchors",
         "Take guided journeys through your knowledge",
+        "Walk routes through connected rooms",
         "Search memories across the entire palace",
         "Earn XP and unlock achievements as you build your palace",
         "Take memory challenges to test your recall",
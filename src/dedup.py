@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Duplicate detection for store_memory
+
+Exact duplicates are found through a hash of the normalised content. Near
+duplicates are memories whose word and word-pair sets have a Jaccard
+similarity of at least ``min_similarity``. Candidates come from a MinHash
+LSH index: each memory's MinHash signature is split into bands and bucketed
+per band, so only memories sharing a whole band with the new content are
+compared, and their exact Jaccard similarity decides. The band shape is
+chosen so pairs at the threshold are almost always candidates. Contents that
+mention different numbers (dates, times, amounts) are never near duplicates,
+however similar the rest of the wording.
+"""
+import hashlib
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, FrozenSet, Optional, Set, Tuple
+
+import numpy as np
+
+try:
+    from const import DEDUPE_MIN_SIMILARITY
+except ImportError:
+    from src.const import DEDUPE_MIN_SIMILARITY
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+MERSENNE_PRIME = (1 << 61) - 1
+NUM_PERMUTATIONS = 128
+BANDS = 32  # 32 bands x 4 rows: a pair at the 0.75 threshold shares a band with probability > 0.99999
+
+
+def normalise(text: str) -> str:
+    return " ".join(TOKEN_PATTERN.findall(text.lower()))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.blake2b(normalise(text).encode(), digest_size=16).hexdigest()
+
+
+def shingles(text: str) -> FrozenSet[str]:
+    """Words and adjacent word pairs; the pairs keep word order significant"""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    return frozenset(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+
+
+def numbers(features: FrozenSet[str]) -> FrozenSet[str]:
+    """The words of a shingle set that contain a digit"""
+    return frozenset(f for f in features if " " not in f and any(c.isdigit() for c in f))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """MinHash signatures from seeded universal hash permutations (stable across processes)"""
+
+    def __init__(self, num_permutations: int = NUM_PERMUTATIONS, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 1 << 32, num_permutations, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 32, num_permutations, dtype=np.uint64)
+
+    def signature(self, features: FrozenSet[str]) -> np.ndarray:
+        if not features:
+            return np.full(len(self.a), MERSENNE_PRIME, dtype=np.uint64)
+        # crc32 keeps base hashes below 2**32 so a * x + b stays within uint64
+        base = np.fromiter((zlib.crc32(f.encode()) for f in features), dtype=np.uint64, count=len(features))
+        return ((np.outer(self.a, base) + self.b[:, None]) % MERSENNE_PRIME).min(axis=1)
+
+
+class DuplicateIndex:
+    """Exact-hash and MinHash LSH indexes over memory contents, scoped per room"""
+
+    def __init__(self, min_similarity: float = DEDUPE_MIN_SIMILARITY, bands: int = BANDS):
+        self.min_similarity = min_similarity
+        self.hasher = MinHasher()
+        self.bands = bands
+        self.rows = NUM_PERMUTATIONS // bands
+        self.exact: Dict[Tuple[str, str], str] = {}
+        self.features: Dict[str, FrozenSet[str]] = {}
+        self.buckets: Dict[Tuple[str, int, bytes], Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def _band_keys(self, room: str, features: FrozenSet[str]):
+        signature = self.hasher.signature(features)
+        for band in range(self.bands):
+            yield room, band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, location):
+        features = shingles(location.content)
+        self.exact.setdefault((location.room, content_hash(location.content)), location.id)
+        self.features[location.id] = features
+        for key in self._band_keys(location.room, features):
+            self.buckets[key].add(location.id)
+
+    def add_many(self, locations):
+        for location in locations:
+            self.add(location)
+
+    def find(self, room: str, content: str, near: bool = True) -> Optional[Tuple[str, str, float]]:
+        """(location_id, "exact" | "near", similarity) of a stored duplicate in ``room``, if any"""
+        exact = self.exact.get((room, content_hash(content)))
+        if exact is not None:
+            return exact, "exact", 1.0
+        if not near:
+            return None
+
+        features = shingles(content)
+        candidates: Set[str] = set()
+        for key in self._band_keys(room, features):
+            candidates |= self.buckets.get(key, set())
+
+        digits = numbers(features)
+        best = max(
+            ((jaccard(features, self.features[location_id]), location_id) for location_id in candidates
+             if numbers(self.features[location_id]) == digits),
+            default=None
+        )
+        if best is not None and best[0] >= self.min_similarity:
+            return best[1], "near", best[0]
+        return None
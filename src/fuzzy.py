@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Typo-tolerant search for the Memory Palace MCP Server
+
+Every token of a memory's content, keywords and visual anchor goes into a
+trigram index (trigram -> tokens, token -> memories). A query token only
+computes edit distances against vocabulary tokens that share enough
+trigrams with it, so lookups never scan every memory.
+"""
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+MIN_TOKEN_LENGTH = 2
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if len(t) >= MIN_TOKEN_LENGTH]
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"#{token}#"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def default_max_distance(token: str) -> int:
+    """Edits tolerated for a query token: none for short words, up to two for long ones"""
+    if len(token) <= 3:
+        return 0
+    if len(token) <= 6:
+        return 1
+    return 2
+
+
+def bounded_edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Optimal string alignment distance (Levenshtein plus adjacent transpositions,
+    the commonest typo) between a and b, or max_distance + 1 once it is known to exceed it"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, char_b in enumerate(b, 1):
+            cost = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            )
+            if before is not None and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+            row_min = min(row_min, cost)
+        if row_min > max_distance:
+            return max_distance + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+class FuzzyIndex:
+    """Trigram index from vocabulary tokens to the memories that contain them"""
+
+    def __init__(self):
+        self.token_trigrams: Dict[str, Set[str]] = {}
+        self.trigram_tokens: Dict[str, Set[str]] = defaultdict(set)
+        self.token_locations: Dict[str, Set[str]] = defaultdict(set)
+        self.location_tokens: Dict[str, Set[str]] = {}
+        self.location_rooms: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.location_tokens)
+
+    def add(self, location):
+        """Index (or re-index) a MemoryLocation"""
+        self.remove(location.id)
+        tokens = set(tokenize(" ".join([location.content, location.visual_anchor, *location.keywords])))
+        self.location_tokens[location.id] = tokens
+        self.location_rooms[location.id] = location.room
+        for token in tokens:
+            if token not in self.token_trigrams:
+                grams = trigrams(token)
+                self.token_trigrams[token] = grams
+                for gram in grams:
+                    self.trigram_tokens[gram].add(token)
+            self.token_locations[token].add(location.id)
+
+    def add_many(self, locations: Iterable[object]):
+        for location in locations:
+            self.add(location)
+
+    def remove(self, location_id: str):
+        for token in self.location_tokens.pop(location_id, ()):
+            holders = self.token_locations[token]
+            holders.discard(location_id)
+            if not holders:
+                del self.token_locations[token]
+                for gram in self.token_trigrams.pop(token):
+                    self.trigram_tokens[gram].discard(token)
+        self.location_rooms.pop(location_id, None)
+
+    def similar_tokens(self, token: str, max_distance: Optional[int] = None) -> Dict[str, int]:
+        """Vocabulary tokens within the edit-distance threshold of ``token``"""
+        if max_distance is None:
+            max_distance = default_max_distance(token)
+        if token in self.token_trigrams and max_distance == 0:
+            return {token: 0}
+
+        grams = trigrams(token)
+        # q-gram lemma: an edit touches at most three padded trigrams (four for a transposition)
+        needed = max(1, len(grams) - 4 * max_distance)
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for candidate in self.trigram_tokens.get(gram, ()):
+                shared[candidate] += 1
+
+        matches = {}
+        for candidate, count in shared.items():
+            if count < needed:
+                continue
+            distance = bounded_edit_distance(token, candidate, max_distance)
+            if distance <= max_distance:
+                matches[candidate] = distance
+        return matches
+
+    def search(self, query: str, max_distance: Optional[int] = None,
+               room: Optional[str] = None) -> List[Tuple[str, float]]:
+        """(location_id, score) for memories matching every query token within the threshold.
+
+        The score is the mean similarity (1 - distance / token length) of the
+        best match for each query token, so exact matches score 1.0.
+        """
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+
+        scores: Optional[Dict[str, float]] = None
+        for token in query_tokens:
+            token_scores: Dict[str, float] = {}
+            for candidate, distance in self.similar_tokens(token, max_distance).items():
+                similarity = 1 - distance / max(len(token), len(candidate))
+                for location_id in self.token_locations[candidate]:
+                    if similarity > token_scores.get(location_id, -1.0):
+                        token_scores[location_id] = similarity
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    location_id: score + token_scores[location_id]
+                    for location_id, score in scores.items()
+                    if location_id in token_scores
+                }
+            if not scores:
+                return []
+
+        results = [
+            (location_id, score / len(query_tokens))
+            for location_id, score in scores.items()
+            if room is None or self.location_rooms.get(location_id) == room
+        ]
+        results.sort(key=lambda item: item[1], reverse=True)
+        return results
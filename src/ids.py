@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Time-ordered unique IDs for the Memory Palace MCP Server
+
+ULID-style: 26 Crockford base32 characters encoding a 48-bit millisecond
+timestamp followed by 80 random bits. IDs sort lexicographically in creation
+order. Within one millisecond the generator increments the random part
+instead of drawing a new one, so IDs from one process are strictly
+increasing even under bulk inserts; the random bits keep separate processes
+from colliding.
+"""
+import os
+import threading
+import time
+
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"  # Crockford base32
+ID_LENGTH = 26
+TIME_CHARS = 10
+RANDOM_BITS = 80
+RANDOM_MAX = (1 << RANDOM_BITS) - 1
+
+
+def _encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+class MonotonicIdGenerator:
+    """Thread-safe generator of strictly increasing ULID-style IDs"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def new_id(self) -> str:
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms <= self._last_ms:
+                # Same millisecond (or the clock stepped back): keep the timestamp, bump the counter
+                now_ms = self._last_ms
+                self._last_random += 1
+                if self._last_random > RANDOM_MAX:
+                    now_ms += 1
+                    self._last_random = int.from_bytes(os.urandom(10), "big") >> 1
+            else:
+                # Top bit clear leaves room to increment within the millisecond
+                self._last_random = int.from_bytes(os.urandom(10), "big") >> 1
+            self._last_ms = now_ms
+            random_part = self._last_random
+        return _encode(now_ms, TIME_CHARS) + _encode(random_part, ID_LENGTH - TIME_CHARS)
+
+
+_generator = MonotonicIdGenerator()
+
+
+def new_id() -> str:
+    """Next ID from the process-wide generator"""
+    return _generator.new_id()
+
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Cross-user XP leaderboard
+
+Users are kept in an indexable skip list ordered by total XP (highest
+first, ties by user id). Every forward link also records how many entries it
+skips, so inserting, removing and finding a user's rank are all O(log n),
+and the top N are the first N entries. An XP change moves one user: remove
+the old key, insert the new one.
+
+Ranks are competition ranks: users with equal XP share a rank and the next
+rank skips accordingly (1, 2, 2, 4).
+"""
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+Key = Tuple[int, str]  # (-total_xp, user_id)
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: Optional[Key], levels: int):
+        self.key = key
+        self.next: List[Optional["_Node"]] = [None] * levels
+        self.width: List[int] = [1] * levels  # positions skipped by next[i]
+
+
+class IndexableSkipList:
+    """Sorted unique keys with O(log n) insert, remove and position lookup"""
+
+    MAX_LEVELS = 32
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.rng = rng or random.Random()
+        self.head = _Node(None, self.MAX_LEVELS)
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _random_levels(self) -> int:
+        levels = 1
+        while levels < self.MAX_LEVELS and self.rng.random() < 0.5:
+            levels += 1
+        return levels
+
+    def insert(self, key: Key):
+        update = [self.head] * self.MAX_LEVELS
+        positions = [0] * self.MAX_LEVELS
+        node, position = self.head, 0
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+            update[level], positions[level] = node, position
+        levels = self._random_levels()
+        new = _Node(key, levels)
+        for level in range(self.MAX_LEVELS):
+            before = update[level]
+            if level < levels:
+                # The new entry takes position + 1 and splits the link it lands in
+                new.next[level] = before.next[level]
+                before.next[level] = new
+                new.width[level] = before.width[level] - (position - positions[level])
+                before.width[level] = position + 1 - positions[level]
+            else:
+                before.width[level] += 1
+        self.size += 1
+
+    def remove(self, key: Key):
+        update = [self.head] * self.MAX_LEVELS
+        node = self.head
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                node = node.next[level]
+            update[level] = node
+        target = node.next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        for level in range(self.MAX_LEVELS):
+            before = update[level]
+            if before.next[level] is target:
+                before.width[level] += target.width[level] - 1
+                before.next[level] = target.next[level]
+            else:
+                before.width[level] -= 1
+        self.size -= 1
+
+    def count_below(self, key: Key) -> int:
+        """Number of keys strictly smaller than ``key``"""
+        node, position = self.head, 0
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        return position
+
+    def first(self, count: int) -> List[Key]:
+        keys = []
+        node = self.head.next[0]
+        while node is not None and len(keys) < count:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+class Leaderboard:
+    """Users ranked by total XP, moved one at a time as their XP changes"""
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.ranking = IndexableSkipList(rng)
+        self.entries: Dict[str, Dict[str, Any]] = {}  # user id -> total_xp, username, level
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def set(self, user_id: str, total_xp: int, username: str, level: int):
+        """Add a user or record their new XP, name and level"""
+        entry = self.entries.get(user_id)
+        if entry is not None and entry["total_xp"] != total_xp:
+            self.ranking.remove((-entry["total_xp"], user_id))
+        if entry is None or entry["total_xp"] != total_xp:
+            self.ranking.insert((-total_xp, user_id))
+        self.entries[user_id] = {"total_xp": total_xp, "username": username, "level": level}
+
+    def rank(self, user_id: str) -> Optional[int]:
+        """1-based competition rank, or None for unknown users"""
+        entry = self.entries.get(user_id)
+        if entry is None:
+            return None
+        # Everyone with more XP sorts before the lowest possible key at this XP
+        return self.ranking.count_below((-entry["total_xp"], "")) + 1
+
+    def top(self, count: int) -> List[Dict[str, Any]]:
+        result = []
+        for position, (negative_xp, user_id) in enumerate(self.ranking.first(count)):
+            if result and result[-1]["total_xp"] == -negative_xp:
+                rank = result[-1]["rank"]
+            else:
+                rank = position + 1
+            result.append({"rank": rank, "user_id": user_id, **self.entries[user_id]})
+        return result
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Parallel exact search across room partitions
+
+An unfiltered exact search has to look at every memory, and most of its time
+goes into reading and parsing the room partition files. Each partition is
+read and scanned on its own, so on a large palace the partitions can be
+spread over a process pool (with ``workers=None``, one process per CPU,
+shared out between the server's worker processes) and every worker sends
+back only its room's best
+``limit`` matches. The per-room lists are combined with a k-way heap merge,
+cut off after ``limit`` results, which keeps the order a single scan gives:
+by relevance, ties in partition order. Palaces with fewer than
+``min_memories`` memories or fewer than ``min_partitions`` rooms, or
+servers with one CPU per worker process, are scanned serially in this
+process, where handing work to the pool would cost more than it saves.
+"""
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+
+def by_relevance(match: Mapping[str, Any]) -> int:
+    """Sort key putting the most relevant match first; ties keep their order"""
+    return -match["relevance_score"]
+
+
+def exact_relevance(query_lower: str, record: Mapping[str, Any]) -> int:
+    """How many of content, visual anchor and keywords contain the query (0 if none do)"""
+    return (
+        (query_lower in record["content"].lower())
+        + (query_lower in record["visual_anchor"].lower())
+        + any(query_lower in keyword.lower() for keyword in record["keywords"])
+    )
+
+
+def rank_exact(records: Iterable[Mapping[str, Any]], query_lower: str,
+               limit: Optional[int] = None) -> Tuple[int, List[Dict[str, Any]]]:
+    """How many records contain the query, and search results for them, most relevant first;
+    `limit` keeps only the top ones"""
+    results = []
+    for record in records:
+        score = exact_relevance(query_lower, record)
+        if score:
+            results.append({
+                "location_id": record["id"],
+                "room": record["room"],
+                "position": record["position"],
+                "visual_anchor": record["visual_anchor"],
+                "content": record["content"],
+                "keywords": record["keywords"],
+                "relevance_score": score
+            })
+    if limit is None:
+        return len(results), sorted(results, key=by_relevance)
+    return len(results), heapq.nsmallest(limit, results, key=by_relevance)
+
+
+def scan_partition(path: str, query_lower: str, limit: Optional[int] = None) -> Tuple[int, List[Dict[str, Any]]]:
+    """The number of exact matches in one partition file, and the top ones (runs in a pool worker)"""
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return 0, []  # removed by a full save since the manifest was read
+    return rank_exact(data.values(), query_lower, limit)
+
+
+class PartitionSearch:
+    """Exact search over room partition files, on a process pool once the palace is large enough"""
+
+    def __init__(self, workers: Optional[int], min_memories: int, min_partitions: int, server_workers: int = 1):
+        # Every server worker process has its own pool, so together they use one process per CPU
+        self.workers = workers or max(1, (os.cpu_count() or 1) // max(1, server_workers))
+        self.min_memories = min_memories
+        self.min_partitions = min_partitions
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def parallel(self, memories: int, partitions: int) -> bool:
+        """Whether a search over this many memories and partitions goes to the pool"""
+        return self.workers > 1 and partitions >= self.min_partitions and memories >= self.min_memories
+
+    def executor(self) -> ProcessPoolExecutor:
+        """The worker pool, started on first use"""
+        if self._executor is None:
+            # Spawned, not forked: a fork would copy this process's threads, held locks and caches
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def search(self, paths: Sequence[str], query_lower: str, memories: int,
+               limit: Optional[int] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """The number of matches across the partition files, and the matches most relevant first;
+        `limit` keeps only the top ones"""
+        if self.parallel(memories, len(paths)):
+            ranked = list(self.executor().map(
+                scan_partition, paths, itertools.repeat(query_lower), itertools.repeat(limit)
+            ))
+        else:
+            ranked = [scan_partition(path, query_lower, limit) for path in paths]
+        merged = heapq.merge(*(matches for _, matches in ranked), key=by_relevance)
+        return sum(total for total, _ in ranked), list(itertools.islice(merged, limit))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
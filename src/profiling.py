@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Sampling profiler for live Memory Palace tool calls
+"""
+import cProfile
+import os
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext, CallNext
+
+# (filename, line, function) -> (ncalls, tottime, cumtime)
+FunctionStats = Dict[Tuple[str, int, str], Tuple[int, float, float]]
+
+SORT_KEYS = {"cumulative": 2, "tottime": 1, "calls": 0}
+
+
+class ToolProfiler:
+    """Profiles a sample of tool calls with cProfile and aggregates them over a sliding window"""
+
+    def __init__(self, sample_rate: float = 1.0, window_seconds: float = 300.0, max_samples: int = 1000):
+        self.sample_rate = sample_rate
+        self.window_seconds = window_seconds
+        self.samples: Deque[Tuple[float, str, FunctionStats]] = deque(maxlen=max_samples)
+        self.calls_seen = 0
+        self._lock = threading.Lock()
+        self._active = False
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """Begin profiling a call if it is sampled and no other call is being profiled"""
+        with self._lock:
+            self.calls_seen += 1
+            if self._active or random.random() >= self.sample_rate:
+                return None
+            self._active = True
+
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def finish(self, tool_name: str, profile: cProfile.Profile):
+        """Stop profiling and keep a condensed copy of the stats"""
+        profile.disable()
+        condensed = {
+            func: (nc, tt, ct)
+            for func, (cc, nc, tt, ct, callers) in pstats.Stats(profile).stats.items()
+        }
+        with self._lock:
+            self.samples.append((time.time(), tool_name, condensed))
+            self._active = False
+
+    def report(self, top_n: int = 20, sort_by: str = "cumulative", tool: Optional[str] = None) -> Dict[str, Any]:
+        """Aggregate the samples inside the window and return the hottest functions"""
+        sort_index = SORT_KEYS.get(sort_by, SORT_KEYS["cumulative"])
+        cutoff = time.time() - self.window_seconds
+
+        with self._lock:
+            samples = [s for s in self.samples if s[0] >= cutoff and (tool is None or s[1] == tool)]
+
+        totals: Dict[Tuple[str, int, str], list] = {}
+        tool_counts: Dict[str, int] = {}
+        for _, tool_name, stats in samples:
+            tool_counts[tool_name] = tool_counts.get(tool_name, 0) + 1
+            for func, values in stats.items():
+                entry = totals.setdefault(func, [0, 0.0, 0.0])
+                entry[0] += values[0]
+                entry[1] += values[1]
+                entry[2] += values[2]
+
+        hottest = sorted(totals.items(), key=lambda item: item[1][sort_index], reverse=True)[:top_n]
+
+        return {
+            "window_seconds": self.window_seconds,
+            "sample_rate": self.sample_rate,
+            "calls_seen": self.calls_seen,
+            "samples": len(samples),
+            "tools": tool_counts,
+            "sort_by": sort_by if sort_by in SORT_KEYS else "cumulative",
+            "functions": [
+                {
+                    "function": f"{os.path.basename(filename)}:{line}({name})",
+                    "ncalls": ncalls,
+                    "tottime_ms": round(tottime * 1000, 3),
+                    "cumtime_ms": round(cumtime * 1000, 3),
+                    "cumtime_per_sample_ms": round(cumtime * 1000 / len(samples), 3)
+                }
+                for (filename, line, name), (ncalls, tottime, cumtime) in hottest
+            ]
+        }
+
+
+class ProfilingMiddleware(Middleware):
+    """FastMCP middleware that hands each tool call to a ToolProfiler"""
+
+    def __init__(self, profiler: ToolProfiler):
+        self.profiler = profiler
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext) -> Any:
+        profile = self.profiler.start()
+        if profile is None:
+            return await call_next(context)
+
+        try:
+            return await call_next(context)
+        finally:
+            self.profiler.finish(getattr(context.message, "name", "unknown"), profile)
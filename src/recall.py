@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Recall outcome scoring for the Memory Palace MCP Server
+
+Each recall result moves a memory's success rate and difficulty rating
+towards what the result suggests with an exponential moving average, so
+recent practice counts most without keeping a history. Room mastery combines
+how often the room's memories were recalled with how reliably, and practice
+weights decide which memories practice_recall asks about.
+"""
+from typing import Iterable, Optional
+
+
+def ema(previous: float, observed: float, alpha: float) -> float:
+    return previous + alpha * (observed - previous)
+
+
+def observed_difficulty(correct: bool, response_time: Optional[float],
+                        fast_seconds: float, slow_seconds: float) -> float:
+    """Difficulty (1-10) one result suggests: misses are 10, correct answers 1-7 by speed"""
+    if not correct:
+        return 10.0
+    if response_time is None:
+        return 4.0
+    slowness = (response_time - fast_seconds) / (slow_seconds - fast_seconds)
+    return 1.0 + 6.0 * min(1.0, max(0.0, slowness))
+
+
+def record_recall(location, correct: bool, response_time: Optional[float], alpha: float,
+                  fast_seconds: float, slow_seconds: float):
+    """Fold one recall result into a memory's statistics, in place"""
+    location.recall_count += 1
+    location.recall_success_rate = round(ema(location.recall_success_rate, 100.0 if correct else 0.0, alpha), 1)
+    difficulty = ema(location.difficulty_rating, observed_difficulty(correct, response_time, fast_seconds, slow_seconds), alpha)
+    location.difficulty_rating = min(10, max(1, round(difficulty)))
+
+
+def room_mastery(room_locations: Iterable) -> int:
+    """0-100: 10 recalls per memory on average is full mastery, scaled by the average success rate"""
+    room_locations = list(room_locations)
+    if not room_locations:
+        return 0
+    avg_recall = sum(loc.recall_count for loc in room_locations) / len(room_locations)
+    avg_success = sum(loc.recall_success_rate for loc in room_locations) / len(room_locations)
+    return int(min(100, avg_recall * 10) * avg_success / 100)
+
+
+def practice_weight(success_rate: float, difficulty: int, days_since_practice: int, stale_days_cap: int = 30) -> float:
+    """How strongly practice_recall favours a memory: weak, hard and long-unpractised ones first"""
+    weakness = 1 + (100 - success_rate) / 20  # 1 when always recalled, 6 when never
+    hardness = 1 + difficulty / 5
+    staleness = 1 + min(days_since_practice, stale_days_cap) / 7  # +1 per week unpractised
+    return weakness * hardness * staleness
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Response verbosity for the Memory Palace MCP Server
+
+Tools build their full, friendly response; ``shape_response`` then trims it
+for machine clients. "compact" keeps only the data fields (no next_steps,
+personality messages or duplicated records) and "ids-only" reduces the
+response to the identifiers a client needs to follow up.
+"""
+from typing import Any, Callable, Dict
+
+# Data fields kept in compact mode, per tool
+COMPACT_FIELDS: Dict[str, tuple] = {
+    "store_memory": ("success", "duplicate", "duplicate_of", "match", "similarity", "location_id", "xp_gained"),
+    "search_memories": ("query", "room_filter", "results_count", "total_matches", "results", "xp_gained"),
+    "memory_journey": (
+        "version", "since", "room", "mastery_level", "order", "journey_order",
+        "journey_path", "total_memories", "xp_gained", "connected_rooms"
+    ),
+    "get_palace_overview": (
+        "version", "since", "total_rooms", "total_memories", "overall_mastery",
+        "overall_retention", "room_stats", "recent_activity", "user", "unlocked_achievements"
+    )
+}
+
+IDS_ONLY: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "store_memory": lambda result: (
+        {"duplicate_of": result["duplicate_of"]} if result.get("duplicate") else {"location_id": result["location_id"]}
+    ),
+    "search_memories": lambda result: {
+        "location_ids": [match["location_id"] for match in result["results"]]
+    },
+    "memory_journey": lambda result: {
+        "version": result["version"],
+        "room": result["room"],
+        "location_ids": [stop["location_id"] for stop in result["journey_path"]]
+    },
+    "get_palace_overview": lambda result: {
+        "version": result["version"],
+        "rooms": list(result["room_stats"]),
+        "recent_location_ids": [activity["location_id"] for activity in result["recent_activity"]]
+    }
+}
+
+
+def shape_response(tool: str, result: Dict[str, Any], verbosity: str) -> Dict[str, Any]:
+    """Trim a tool result to the requested verbosity; errors are always returned whole"""
+    if verbosity == "full" or "error" in result:
+        return result
+    if verbosity == "ids-only":
+        return IDS_ONLY[tool](result)
+    return {key: result[key] for key in COMPACT_FIELDS[tool] if key in result}
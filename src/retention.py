@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Forgetting-curve retention for get_palace_overview
+
+A memory's retention decays exponentially with the time since it was last
+accessed, R = exp(-t / S). Its stability S (days for retention to fall to
+1/e) starts at ``base_days`` and grows with successful recalls, so
+well-practised memories fade slowly and new or hard ones quickly.
+
+Stability and last access only change when a memory is accessed, so each
+room keeps them as NumPy arrays, rebuilt in one vectorised pass the first
+time the room is asked about after one of its memories changed. Retention
+itself depends on the current time and is evaluated from those arrays on
+every call.
+"""
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+DAY_SECONDS = 86400.0
+
+
+def stability_days(recall_count: np.ndarray, success_rate: np.ndarray, difficulty: np.ndarray,
+                   base_days: float, growth: float) -> np.ndarray:
+    """Days for retention to fall to 1/e: successful recalls raise it, difficulty (1-10) halves it at most"""
+    successful = recall_count * success_rate / 100.0
+    hardness = 1.0 - (np.clip(difficulty, 1, 10) - 1.0) / 18.0
+    return base_days * (1.0 + successful) ** growth * hardness
+
+
+def accessed_at(timestamp: str) -> float:
+    """Unix time of an ISO timestamp; unparseable ones count as just accessed"""
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except ValueError:
+        return time.time()
+
+
+class RetentionModel:
+    """Per-room forgetting-curve inputs, rebuilt for a room only after its memories change"""
+
+    FIELDS = ("recall_count", "recall_success_rate", "difficulty_rating", "last_accessed")
+
+    def __init__(self, base_days: float, growth: float):
+        self.base_days = base_days
+        self.growth = growth
+        self.records: Dict[str, Dict] = {}  # location id -> room, the fields retention depends on, parsed access time
+        self.rooms: Dict[str, List[str]] = {}  # room -> location ids
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}  # room -> (accessed_at, stability)
+
+    def add(self, location):
+        """Add a memory, or refresh all of its fields if it is already known"""
+        if location.id in self.records:
+            self.update(location.id, **{name: getattr(location, name) for name in self.FIELDS})
+            return
+        record = {name: getattr(location, name) for name in self.FIELDS}
+        record["room"] = location.room
+        record["accessed_at"] = accessed_at(record["last_accessed"])
+        self.records[location.id] = record
+        self.rooms.setdefault(location.room, []).append(location.id)
+        self._arrays.pop(location.room, None)
+
+    def add_many(self, locations):
+        for location in locations:
+            self.add(location)
+
+    def update(self, location_id: str, **fields):
+        """Apply changed fields of a known memory and mark its room for recomputation"""
+        record = self.records.get(location_id)
+        changed = {name: value for name, value in fields.items() if name in self.FIELDS}
+        if record is None or not changed:
+            return
+        record.update(changed)
+        if "last_accessed" in changed:
+            record["accessed_at"] = accessed_at(record["last_accessed"])
+        self._arrays.pop(record["room"], None)
+
+    def _room_arrays(self, room: str) -> Tuple[np.ndarray, np.ndarray]:
+        arrays = self._arrays.get(room)
+        if arrays is None:
+            records = [self.records[i] for i in self.rooms[room]]
+            count = len(records)
+            stability = stability_days(
+                np.fromiter((r["recall_count"] for r in records), dtype=np.float64, count=count),
+                np.fromiter((r["recall_success_rate"] for r in records), dtype=np.float64, count=count),
+                np.fromiter((r["difficulty_rating"] for r in records), dtype=np.float64, count=count),
+                self.base_days, self.growth
+            )
+            last = np.fromiter((r["accessed_at"] for r in records), dtype=np.float64, count=count)
+            arrays = self._arrays[room] = (last, stability)
+        return arrays
+
+    def room_retention(self, room: str, now: Optional[float] = None) -> Tuple[List[str], np.ndarray]:
+        """A room's memory ids and their retention (0-1) at ``now`` (default: the current time)"""
+        if room not in self.rooms:
+            return [], np.zeros(0)
+        last, stability = self._room_arrays(room)
+        elapsed = np.maximum(0.0, ((now or time.time()) - last) / DAY_SECONDS)
+        return self.rooms[room], np.exp(-elapsed / stability)
+
+    def summary(self, rooms: Optional[List[str]] = None, now: Optional[float] = None,
+                per_memory: bool = False) -> Dict[str, Dict]:
+        """Per room (default: every room): mean retention as a percentage, and with
+        ``per_memory`` each memory's retention too"""
+        now = now or time.time()
+        result = {}
+        for room in self.rooms if rooms is None else rooms:
+            ids, retention = self.room_retention(room, now)
+            result[room] = {"retention": round(float(retention.mean()) * 100, 1) if len(ids) else None}
+            if per_memory:
+                result[room]["memory_retention"] = dict(zip(ids, np.round(retention * 100, 1).tolist()))
+        return result
+
+    def overall(self, now: Optional[float] = None) -> Optional[float]:
+        """Mean retention over every memory in the palace as a percentage, None if there are none"""
+        now = now or time.time()
+        total = count = 0
+        for room in self.rooms:
+            ids, retention = self.room_retention(room, now)
+            total += float(retention.sum())
+            count += len(ids)
+        return round(total / count * 100, 1) if count else None
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Room connection graph for the Memory Palace MCP Server
+
+MemoryRoom.connections are free-form names. The graph turns them into an
+undirected adjacency index: a connection only becomes an edge once both
+rooms exist, and a connection naming a room that has not been created yet
+waits until that room appears. Rooms are added one at a time as they are
+created, so the index never has to be rebuilt.
+"""
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class RoomGraph:
+    """Bidirectional adjacency index over palace rooms"""
+
+    def __init__(self):
+        self.adjacency: Dict[str, Set[str]] = {}
+        # Missing room name -> existing rooms whose connections name it
+        self.pending: Dict[str, Set[str]] = defaultdict(set)
+
+    def __contains__(self, room: str) -> bool:
+        return room in self.adjacency
+
+    def __len__(self) -> int:
+        return len(self.adjacency)
+
+    def add_room(self, name: str, connections: Iterable[str] = ()) -> List[str]:
+        """Add a room and its declared connections; returns connections that don't exist yet"""
+        self.adjacency.setdefault(name, set())
+        for waiting in self.pending.pop(name, ()):
+            self._link(name, waiting)
+
+        unresolved = []
+        for other in connections:
+            if other == name:
+                continue
+            if other in self.adjacency:
+                self._link(name, other)
+            else:
+                self.pending[other].add(name)
+                unresolved.append(other)
+        return unresolved
+
+    def add_rooms(self, rooms: Dict[str, object]):
+        """Index MemoryRooms in bulk (order doesn't matter)"""
+        for room in rooms.values():
+            self.add_room(room.name, room.connections)
+
+    def _link(self, a: str, b: str):
+        self.adjacency[a].add(b)
+        self.adjacency[b].add(a)
+
+    def neighbours(self, room: str) -> List[str]:
+        return sorted(self.adjacency.get(room, ()))
+
+    def unresolved(self, room: str) -> List[str]:
+        """Connections declared by ``room`` that name rooms which don't exist"""
+        return sorted(name for name, waiting in self.pending.items() if room in waiting)
+
+    def shortest_path(self, start: str, end: str) -> Optional[List[str]]:
+        """Fewest-hops route from start to end (inclusive), or None if they aren't connected"""
+        if start not in self.adjacency or end not in self.adjacency:
+            return None
+        parents: Dict[str, Optional[str]] = {start: None}
+        queue = deque([start])
+        while queue:
+            room = queue.popleft()
+            if room == end:
+                path = []
+                while room is not None:
+                    path.append(room)
+                    room = parents[room]
+                return path[::-1]
+            for neighbour in self.neighbours(room):
+                if neighbour not in parents:
+                    parents[neighbour] = room
+                    queue.append(neighbour)
+        return None
+
+    def walk(self, start: str, max_rooms: int) -> List[str]:
+        """Breadth-first tour of up to ``max_rooms`` rooms reachable from start, nearest first"""
+        if start not in self.adjacency:
+            return []
+        seen = {start}
+        order = [start]
+        queue = deque([start])
+        while queue and len(order) < max_rooms:
+            for neighbour in self.neighbours(queue.popleft()):
+                if neighbour not in seen and len(order) < max_rooms:
+                    seen.add(neighbour)
+                    order.append(neighbour)
+                    queue.append(neighbour)
+        return order
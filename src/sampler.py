@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Weighted recall sampling for practice_recall
+
+Each room keeps its memories' practice weights in a Fenwick (binary indexed)
+tree, so changing one weight and drawing one memory in proportion to its
+weight are both O(log n). Drawing k distinct memories zeroes each pick's
+weight while the rest are drawn and restores it afterwards: O(k log n), with
+no per-call pass over the room.
+
+Weights depend on the day a memory was last practised relative to today, so
+a room's tree is rebuilt from the kept fields the first time it is sampled on
+a new day.
+"""
+import random
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional
+
+
+class FenwickTree:
+    """Prefix sums over a growable list of non-negative weights"""
+
+    def __init__(self, weights=()):
+        self.weights: List[float] = []
+        self.tree: List[float] = [0.0]
+        for weight in weights:
+            self.append(weight)
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def append(self, weight: float):
+        self.weights.append(weight)
+        index = len(self.weights)
+        # The new node covers (index - lowbit, index]: its own weight plus the nodes below it
+        node = weight
+        child = index - 1
+        stop = index - (index & -index)
+        while child > stop:
+            node += self.tree[child]
+            child -= child & -child
+        self.tree.append(node)
+
+    def set(self, position: int, weight: float):
+        delta = weight - self.weights[position]
+        self.weights[position] = weight
+        index = position + 1
+        while index < len(self.tree):
+            self.tree[index] += delta
+            index += index & -index
+
+    def total(self) -> float:
+        index, result = len(self.weights), 0.0
+        while index > 0:
+            result += self.tree[index]
+            index -= index & -index
+        return result
+
+    def find(self, target: float) -> int:
+        """Position whose cumulative weight range contains ``target`` (0 <= target < total)"""
+        position = 0
+        step = 1 << (len(self.weights).bit_length())
+        while step:
+            following = position + step
+            if following < len(self.tree) and self.tree[following] <= target:
+                position = following
+                target -= self.tree[following]
+            step >>= 1
+        return min(position, len(self.weights) - 1)
+
+
+def days_since(timestamp: str, today: date) -> int:
+    try:
+        return max(0, (today - datetime.fromisoformat(timestamp).date()).days)
+    except ValueError:
+        return 0
+
+
+class RecallSampler:
+    """Per-room Fenwick trees over memory practice weights, updated as memories change"""
+
+    FIELDS = ("recall_success_rate", "difficulty_rating", "last_accessed")
+
+    def __init__(self, weight: Callable[[float, int, int], float]):
+        self.weight = weight
+        self.records: Dict[str, Dict] = {}  # location id -> room and the fields weights depend on
+        self.rooms: Dict[str, Dict] = {}  # room -> {"ids", "positions", "tree", "day"}
+
+    def _weight(self, record: Dict, today: date) -> float:
+        return self.weight(
+            record["recall_success_rate"], record["difficulty_rating"], days_since(record["last_accessed"], today)
+        )
+
+    def add(self, location):
+        """Add a memory, or refresh all of its fields if it is already known"""
+        if location.id in self.records:
+            self.update(location.id, **{name: getattr(location, name) for name in self.FIELDS})
+            return
+        record = {name: getattr(location, name) for name in self.FIELDS}
+        record["room"] = location.room
+        self.records[location.id] = record
+        room = self.rooms.get(location.room)
+        if room is None:
+            room = self.rooms[location.room] = {"ids": [], "positions": {}, "tree": FenwickTree(), "day": date.today()}
+        room["positions"][location.id] = len(room["ids"])
+        room["ids"].append(location.id)
+        room["tree"].append(self._weight(record, room["day"]))
+
+    def add_many(self, locations):
+        for location in locations:
+            self.add(location)
+
+    def update(self, location_id: str, **fields):
+        """Apply changed fields of a known memory; fields weights don't depend on are ignored"""
+        record = self.records.get(location_id)
+        changed = {name: value for name, value in fields.items() if name in self.FIELDS}
+        if record is None or not changed:
+            return
+        record.update(changed)
+        room = self.rooms[record["room"]]
+        room["tree"].set(room["positions"][location_id], self._weight(record, room["day"]))
+
+    def _rebase(self, room: Dict, today: date):
+        room["day"] = today
+        room["tree"] = FenwickTree(self._weight(self.records[i], today) for i in room["ids"])
+
+    def sample(self, room_name: str, count: int, rng: Optional[random.Random] = None) -> List[str]:
+        """Up to ``count`` distinct memory ids from a room, each drawn in proportion to its weight"""
+        room = self.rooms.get(room_name)
+        if room is None:
+            return []
+        today = date.today()
+        if room["day"] != today:
+            self._rebase(room, today)
+        rng = rng or random
+        tree = room["tree"]
+        picked: List[int] = []
+        removed: List[float] = []
+        for _ in range(min(count, len(tree))):
+            total = tree.total()
+            if total <= 0:
+                break
+            position = tree.find(rng.random() * total)
+            if tree.weights[position] <= 0:
+                # Rounding in the running sums landed on an exhausted slot
+                position = max(range(len(tree)), key=tree.weights.__getitem__)
+            picked.append(position)
+            removed.append(tree.weights[position])
+            tree.set(position, 0.0)
+        for position, weight in zip(picked, removed):
+            tree.set(position, weight)
+        return [room["ids"][position] for position in picked]
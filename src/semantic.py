@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Local semantic search for the Memory Palace MCP Server
+
+Memories are embedded on the CPU with a signed feature-hashing vectoriser
+(word unigrams plus character trigrams, so "light" still overlaps with
+"sunlight"), which is a random projection of the bag-of-words space and
+needs no model download. Vectors live in one dense float32 matrix and are
+scored against queries with a single matrix product, or through an IVF
+approximate nearest-neighbour index once the palace is large.
+"""
+import math
+import os
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from ann import IVFIndex
+except ImportError:
+    from src.ann import IVFIndex
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the
+this to was were will with my your me i you we they he she them our their
+""".split())
+
+# Relative weight of each memory field in its embedding
+FIELD_WEIGHTS = (("content", 1.0), ("keywords", 1.5), ("visual_anchor", 0.5))
+TRIGRAM_WEIGHT = 0.35
+
+
+class HashingVectorizer:
+    """Stateless text -> unit vector embedding using the signed hashing trick"""
+
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+
+    @staticmethod
+    def tokens(text: str) -> List[str]:
+        return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+    def _accumulate(self, vector: np.ndarray, text: str, weight: float):
+        for token in self.tokens(text):
+            self._add_feature(vector, "w:" + token, weight)
+            padded = f"#{token}#"
+            for i in range(len(padded) - 2):
+                self._add_feature(vector, "c:" + padded[i:i + 3], weight * TRIGRAM_WEIGHT)
+
+    def _add_feature(self, vector: np.ndarray, feature: str, weight: float):
+        # crc32 is stable across processes (unlike hash()), so persisted vectors stay valid
+        h = zlib.crc32(feature.encode())
+        vector[h % self.dimensions] += weight if h & 0x80000000 else -weight
+
+    def embed(self, fields: Iterable[Tuple[str, float]]) -> np.ndarray:
+        """Unit vector for (text, weight) pairs; all zeros if there are no tokens"""
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for text, weight in fields:
+            self._accumulate(vector, text, weight)
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def embed_text(self, text: str) -> np.ndarray:
+        return self.embed([(text, 1.0)])
+
+    def embed_location(self, location) -> np.ndarray:
+        """Embedding of a MemoryLocation from its content, keywords and visual anchor"""
+        fields = []
+        for name, weight in FIELD_WEIGHTS:
+            value = getattr(location, name)
+            fields.append((" ".join(value) if isinstance(value, list) else value, weight))
+        return self.embed(fields)
+
+
+class SemanticIndex:
+    """Dense matrix of memory vectors, persisted next to the palace and appended incrementally.
+
+    On disk the index is two append-only files: ``memory_vectors.f32`` (raw
+    float32 rows) and ``memory_vectors.ids`` (one ``location_id<TAB>room``
+    line per row). Re-adding an id appends a new row that supersedes the old one.
+
+    Unfiltered queries switch from brute force to the IVF index once the
+    index holds ``ann_min_size`` memories; ``n_probe`` tunes its recall.
+    """
+
+    def __init__(self, storage_dir: str, dimensions: int = 512,
+                 ann_min_size: int = 20000, n_probe: int = 8):
+        self.storage_dir = storage_dir
+        self.vectorizer = HashingVectorizer(dimensions)
+        self.dimensions = dimensions
+        self.ann_min_size = ann_min_size
+        self.n_probe = n_probe
+        self.vectors_file = os.path.join(storage_dir, "memory_vectors.f32")
+        self.ids_file = os.path.join(storage_dir, "memory_vectors.ids")
+
+        self._reset()
+
+    def _reset(self):
+        self._matrix = np.zeros((0, self.dimensions), dtype=np.float32)
+        self._active = np.zeros(0, dtype=bool)
+        self._room_codes = np.zeros(0, dtype=np.int32)
+        self.size = 0
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.room_codes: Dict[str, int] = {}
+        self.ann = IVFIndex(n_probe=self.n_probe)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._matrix[:self.size]
+
+    def _room_code(self, room: str) -> int:
+        if room not in self.room_codes:
+            self.room_codes[room] = len(self.room_codes)
+        return self.room_codes[room]
+
+    def _ensure_capacity(self, extra: int):
+        needed = self.size + extra
+        if needed <= len(self._matrix):
+            return
+        capacity = max(needed, 2 * len(self._matrix), 64)
+        for name, dtype, shape in (
+            ("_matrix", np.float32, (capacity, self.dimensions)),
+            ("_active", bool, (capacity,)),
+            ("_room_codes", np.int32, (capacity,))
+        ):
+            grown = np.zeros(shape, dtype=dtype)
+            grown[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, grown)
+
+    def _append_rows(self, entries: Sequence[Tuple[str, str]], vectors: np.ndarray):
+        """Add rows to the in-memory matrix (callers persist them separately)"""
+        self._ensure_capacity(len(entries))
+        start = self.size
+        self._matrix[start:start + len(entries)] = vectors
+        for offset, (location_id, room) in enumerate(entries):
+            row = start + offset
+            previous = self.rows.get(location_id)
+            if previous is not None:
+                self._active[previous] = False
+            self._active[row] = True
+            self._room_codes[row] = self._room_code(room)
+            self.rows[location_id] = row
+            self.ids.append(location_id)
+        self.size += len(entries)
+        self.ann.add_many(np.arange(start, self.size), vectors)
+
+    def _persist_rows(self, entries: Sequence[Tuple[str, str]], vectors: np.ndarray):
+        os.makedirs(self.storage_dir, exist_ok=True)
+        with open(self.vectors_file, 'ab') as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(self.ids_file, 'a') as f:
+            f.write("".join(f"{location_id}\t{room}\n" for location_id, room in entries))
+
+    def load(self) -> bool:
+        """Load persisted vectors; returns False (and stays empty) if they are missing or inconsistent"""
+        if not (os.path.exists(self.vectors_file) and os.path.exists(self.ids_file)):
+            return False
+
+        with open(self.ids_file, 'r') as f:
+            entries = [tuple(line.rstrip("\n").split("\t", 1)) for line in f if line.strip()]
+        vectors = np.fromfile(self.vectors_file, dtype=np.float32)
+        if len(vectors) != len(entries) * self.dimensions or any(len(e) != 2 for e in entries):
+            return False
+
+        self._append_rows(entries, vectors.reshape(len(entries), self.dimensions))
+        return True
+
+    def rebuild(self, locations: Dict[str, object]):
+        """Re-embed every location and rewrite the persisted files"""
+        self._reset()
+        for path in (self.vectors_file, self.ids_file):
+            if os.path.exists(path):
+                os.remove(path)
+        self.add_many(list(locations.values()))
+
+    def sync(self, locations: Dict[str, object]):
+        """Load from disk, then embed locations the persisted index is missing
+        and hide rows whose location no longer exists"""
+        if not self.load() and os.path.exists(self.vectors_file):
+            self.rebuild(locations)
+            return
+        for location_id in [i for i in self.rows if i not in locations]:
+            self._active[self.rows.pop(location_id)] = False
+        missing = [loc for loc_id, loc in locations.items() if loc_id not in self.rows]
+        if missing:
+            self.add_many(missing)
+
+    def add(self, location):
+        """Embed one location and append it (in memory and on disk)"""
+        self.add_many([location])
+
+    def add_many(self, locations: Sequence[object]):
+        if not locations:
+            return
+        entries = [(loc.id, loc.room) for loc in locations]
+        vectors = np.vstack([self.vectorizer.embed_location(loc) for loc in locations])
+        self._append_rows(entries, vectors)
+        self._persist_rows(entries, vectors)
+
+    def train_ann(self):
+        """(Re)cluster the IVF index over all live rows"""
+        self.ann.train(self.matrix, np.flatnonzero(self._active[:self.size]))
+
+    def _mask(self, room: Optional[str]) -> np.ndarray:
+        mask = self._active[:self.size]
+        if room is not None:
+            code = self.room_codes.get(room)
+            if code is None:
+                return np.zeros(self.size, dtype=bool)
+            mask = mask & (self._room_codes[:self.size] == code)
+        return mask
+
+    def search(self, query: str, top_k: int = 10, room: Optional[str] = None,
+               min_score: float = 0.0, exact: bool = False) -> List[Tuple[str, float]]:
+        """Cosine top-k for one query"""
+        return self.search_many([query], top_k, room, min_score, exact)[0]
+
+    def search_many(self, queries: Sequence[str], top_k: int = 10, room: Optional[str] = None,
+                    min_score: float = 0.0, exact: bool = False) -> List[List[Tuple[str, float]]]:
+        """Cosine top-k for a batch of queries.
+
+        Room-filtered queries score only that room's rows; unfiltered queries
+        use the IVF index on large palaces unless ``exact`` is set, and
+        otherwise score every row with one matrix multiply.
+        """
+        if self.size == 0 or not queries:
+            return [[] for _ in queries]
+
+        query_matrix = np.vstack([self.vectorizer.embed_text(q) for q in queries])
+        mask = self._mask(room)
+
+        if room is not None:
+            rows = np.flatnonzero(mask)
+            scores = query_matrix @ self.matrix[rows].T
+            return [self._top_k(row_scores, top_k, min_score, rows) for row_scores in scores]
+
+        if not exact and len(self) >= self.ann_min_size:
+            if self.ann.needs_retrain():
+                self.train_ann()
+            results = []
+            for query in query_matrix:
+                rows, scores = self.ann.search(self.matrix, query, mask, top_k, self.n_probe)
+                results.append([
+                    (self.ids[row], float(score))
+                    for row, score in zip(rows.tolist(), scores.tolist())
+                    if score > min_score
+                ])
+            return results
+
+        scores = query_matrix @ self.matrix.T  # (queries, memories); rows are unit vectors
+        scores[:, ~mask] = -math.inf
+        return [self._top_k(row_scores, top_k, min_score) for row_scores in scores]
+
+    def _top_k(self, scores: np.ndarray, top_k: int, min_score: float,
+               rows: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
+        k = min(top_k, len(scores))
+        if k <= 0:
+            return []
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        candidates = candidates[np.argsort(-scores[candidates])]
+        return [
+            (self.ids[row if rows is None else rows[row]], float(scores[row]))
+            for row in candidates
+            if scores[row] > min_score
+        ]
@@ -5,11 +5,20 @@ import hashlib
 import random
 import time
 import re
+import functools
+import threading
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Any
 from dataclasses import dataclass, asdict, field
 from fastmcp import FastMCP
 
+try:
+    import fcntl
+except ImportError:
+    # No cross-process locking on Windows: a single worker process is the only supported mode there
+    fcntl = None
+
 # Import constants
 # Use relative import when running from src directory
 try:
@@ -24,8 +33,66 @@ try:
         DEFAULT_ROOM_DESCRIPTION,
         DEFAULT_VISUAL_ANCHOR,
         PERSONALITY_TYPES,
-        DEFAULT_IDEA_SUGGESTIONS
+        DEFAULT_IDEA_SUGGESTIONS,
+        PROFILE_SAMPLE_RATE,
+        PROFILE_WINDOW_SECONDS,
+        PROFILE_TOP_N,
+        SEARCH_MODES,
+        SEMANTIC_DIMENSIONS,
+        SEMANTIC_MIN_SCORE,
+        SEMANTIC_ANN_MIN_SIZE,
+        SEMANTIC_ANN_N_PROBE,
+        FUZZY_MAX_DISTANCE,
+        PARALLEL_SEARCH_MIN_MEMORIES,
+        PARALLEL_SEARCH_MIN_PARTITIONS,
+        PARALLEL_SEARCH_WORKERS,
+        RESULT_CACHE_SIZE,
+        JOURNEY_ORDERS,
+        VERBOSITY_LEVELS,
+        DEDUPE_MODES,
+        DEDUPE_MIN_SIMILARITY,
+        WRITE_BEHIND_INTERVAL,
+        WRITE_BEHIND_MAX_PENDING,
+        RECALL_EMA_ALPHA,
+        RECALL_FAST_SECONDS,
+        RECALL_SLOW_SECONDS,
+        RECALL_MAX_BATCH,
+        RECALL_STALE_DAYS_CAP,
+        RETENTION_BASE_DAYS,
+        RETENTION_GROWTH,
+        LEADERBOARD_MAX_TOP,
+        CHALLENGE_EXPIRY_HOURS,
+        CHALLENGE_HISTORY_DAYS,
+        CHALLENGE_SWEEP_INTERVAL,
+        CHALLENGE_RECALL_THRESHOLD,
+        CHALLENGE_PASS_RATIO,
+        CHALLENGE_MAX_ANSWERS,
+        ACTIVITY_SEGMENT_BYTES,
+        ACTIVITY_MAX_SEGMENTS,
+        ACTIVITY_HOURLY_DAYS,
+        ACTIVITY_DAILY_DAYS,
+        ACTIVITY_FLUSH_INTERVAL,
+        ACTIVITY_MAX_MEMORY_IDS
     )
+    from tracing import StorageTraceHook, JsonlSpanExporter
+    from profiling import ToolProfiler, ProfilingMiddleware
+    from catalog import Catalog, DEFAULT_CATALOG, render_personality_message, thaw
+    from semantic import SemanticIndex
+    from fuzzy import FuzzyIndex
+    from cache import ResultCache
+    from room_graph import RoomGraph
+    from route import shortest_walk
+    from responses import shape_response
+    from ids import new_id
+    from dedup import DuplicateIndex
+    from write_behind import WriteBehindBuffer
+    from recall import record_recall, room_mastery, practice_weight
+    from sampler import RecallSampler
+    from retention import RetentionModel
+    from leaderboard import Leaderboard
+    from challenges import ChallengeStore, score_answers
+    from activity import ActivityLog, note_activity
+    from partition_search import PartitionSearch, rank_exact
 except ImportError:
     # Use package import when running from project root
     from src.const import (
@@ -39,8 +106,66 @@ except ImportError:
         DEFAULT_ROOM_DESCRIPTION,
         DEFAULT_VISUAL_ANCHOR,
         PERSONALITY_TYPES,
-        DEFAULT_IDEA_SUGGESTIONS
+        DEFAULT_IDEA_SUGGESTIONS,
+        PROFILE_SAMPLE_RATE,
+        PROFILE_WINDOW_SECONDS,
+        PROFILE_TOP_N,
+        SEARCH_MODES,
+        SEMANTIC_DIMENSIONS,
+        SEMANTIC_MIN_SCORE,
+        SEMANTIC_ANN_MIN_SIZE,
+        SEMANTIC_ANN_N_PROBE,
+        FUZZY_MAX_DISTANCE,
+        PARALLEL_SEARCH_MIN_MEMORIES,
+        PARALLEL_SEARCH_MIN_PARTITIONS,
+        PARALLEL_SEARCH_WORKERS,
+        RESULT_CACHE_SIZE,
+        JOURNEY_ORDERS,
+        VERBOSITY_LEVELS,
+        DEDUPE_MODES,
+        DEDUPE_MIN_SIMILARITY,
+        WRITE_BEHIND_INTERVAL,
+        WRITE_BEHIND_MAX_PENDING,
+        RECALL_EMA_ALPHA,
+        RECALL_FAST_SECONDS,
+        RECALL_SLOW_SECONDS,
+        RECALL_MAX_BATCH,
+        RECALL_STALE_DAYS_CAP,
+        RETENTION_BASE_DAYS,
+        RETENTION_GROWTH,
+        LEADERBOARD_MAX_TOP,
+        CHALLENGE_EXPIRY_HOURS,
+        CHALLENGE_HISTORY_DAYS,
+        CHALLENGE_SWEEP_INTERVAL,
+        CHALLENGE_RECALL_THRESHOLD,
+        CHALLENGE_PASS_RATIO,
+        CHALLENGE_MAX_ANSWERS,
+        ACTIVITY_SEGMENT_BYTES,
+        ACTIVITY_MAX_SEGMENTS,
+        ACTIVITY_HOURLY_DAYS,
+        ACTIVITY_DAILY_DAYS,
+        ACTIVITY_FLUSH_INTERVAL,
+        ACTIVITY_MAX_MEMORY_IDS
     )
+    from src.tracing import StorageTraceHook, JsonlSpanExporter
+    from src.profiling import ToolProfiler, ProfilingMiddleware
+    from src.catalog import Catalog, DEFAULT_CATALOG, render_personality_message, thaw
+    from src.semantic import SemanticIndex
+    from src.fuzzy import FuzzyIndex
+    from src.cache import ResultCache
+    from src.room_graph import RoomGraph
+    from src.route import shortest_walk
+    from src.responses import shape_response
+    from src.ids import new_id
+    from src.dedup import DuplicateIndex
+    from src.write_behind import WriteBehindBuffer
+    from src.recall import record_recall, room_mastery, practice_weight
+    from src.sampler import RecallSampler
+    from src.retention import RetentionModel
+    from src.leaderboard import Leaderboard
+    from src.challenges import ChallengeStore, score_answers
+    from src.activity import ActivityLog, note_activity
+    from src.partition_search import PartitionSearch, rank_exact
 
 # Initialize the Memory Palace MCP Server
 mcp = FastMCP("Memory Palace MCP Server")
@@ -55,6 +180,7 @@ class Achievement:
     unlocked: bool = False
     unlocked_at: Optional[str] = None
     xp_reward: int = 50
+    version: int = 0  # Palace version at which this was last changed
     
 @dataclass
 class MemoryChallenge:
@@ -67,6 +193,24 @@ class MemoryChallenge:
     completed: bool = False
     completed_at: Optional[str] = None
     xp_reward: int = 0
+    user_id: str = "default"
+    status: str = "offered"  # "offered", then "active" once started, then "completed" or "expired"
+    started_at: Optional[str] = None
+    expires_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    score: Optional[float] = None  # 0-100, how much of the target memories the answers recalled
+
+def location_partition_file(room: str) -> str:
+    """File name of a room's location partition (room names can hold any character)"""
+    return f"room-{hashlib.blake2b(room.encode(), digest_size=8).hexdigest()}.json"
+
+def lifetime_xp(level: int, xp: int) -> int:
+    """Total XP earned by a user at `level` with `xp` towards the next one, on add_xp's level curve"""
+    total, needed = xp, 100
+    for _ in range(level - 1):
+        total += needed
+        needed = int(needed * 1.5)
+    return total
 
 @dataclass
 class UserProfile:
@@ -84,12 +228,24 @@ class UserProfile:
     total_memories: int = 0
     total_rooms: int = 0
     challenges_completed: int = 0
-    active_challenges: List[str] = field(default_factory=list)
+    active_challenges: List[str] = field(default_factory=list)  # Filled in from the challenge store on load
     learning_paths: Dict[str, int] = field(default_factory=dict)  # Path name -> progress (0-100%)
+    verbosity: str = "full"  # Default response verbosity: full, compact or ids-only
+    total_xp: Optional[int] = None  # XP earned over all levels; derived from level and xp for older profiles
+    
+    def __post_init__(self):
+        if self.total_xp is None:
+            self.total_xp = lifetime_xp(self.level, self.xp)
     
     def add_xp(self, amount: int) -> Dict[str, Any]:
         """Add XP and handle level ups"""
+        note_activity(xp=amount)
+        return self.gain_xp(amount)
+    
+    def gain_xp(self, amount: int) -> Dict[str, Any]:
+        """add_xp without counting the XP towards the current tool call (for XP queued by an earlier one)"""
         self.xp += amount
+        self.total_xp += amount
         result = {"xp_gained": amount, "level_up": False, "new_level": self.level}
         
         while self.xp >= self.xp_to_next_level:
@@ -101,6 +257,10 @@ class UserProfile:
             
         return result
     
+    def streak_due(self) -> bool:
+        """Whether update_streak has a new day to count"""
+        return (datetime.now().date() - datetime.fromisoformat(self.streak_last_updated).date()).days > 0
+    
     def update_streak(self) -> Dict[str, Any]:
         """Update the user's daily streak"""
         last_date = datetime.fromisoformat(self.streak_last_updated)
@@ -149,6 +309,7 @@ class MemoryLocation:
     recall_count: int = 0
     recall_success_rate: float = 100.0  # Percentage of successful recalls
     difficulty_rating: int = 1  # 1-10 scale of recall difficulty
+    version: int = 0  # Palace version at which this was last changed
     
 @dataclass
 class MemoryRoom:
@@ -161,102 +322,645 @@ class MemoryRoom:
     mastery_level: int = 0  # 0-100% mastery of this room's content
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
     last_visited: str = field(default_factory=lambda: datetime.now().isoformat())
+    version: int = 0  # Palace version at which this was last changed
 
 class MemoryPalaceStorage:
     """Enhanced file-based storage for memory palace data with gamification"""
     
     def __init__(self, storage_dir: str = "memory_palace_data"):
+        # Construction is side-effect free: the directory is only created on
+        # the first write and catalogue defaults are served from const.py
         self.storage_dir = storage_dir
-        os.makedirs(storage_dir, exist_ok=True)
-        self.locations_file = os.path.join(storage_dir, "locations.json")
+        self._storage_dir_ready = False
+        # Locations are partitioned by room: one file per room plus a manifest of them
+        self.locations_dir = os.path.join(storage_dir, "locations")
+        self.manifest_file = os.path.join(self.locations_dir, "manifest.json")
+        self.locations_file = os.path.join(storage_dir, "locations.json")  # before partitioning; migrated on first use
         self.rooms_file = os.path.join(storage_dir, "rooms.json")
         self.users_file = os.path.join(storage_dir, "users.json")
         self.challenges_file = os.path.join(storage_dir, "challenges.json")
+        self.user_challenges_file = os.path.join(storage_dir, "user_challenges.json")
         self.achievements_file = os.path.join(storage_dir, "achievements.json")
         self.learning_paths_file = os.path.join(storage_dir, "learning_paths.json")
+        # Shared with other worker processes: per-file write generations and the palace version
+        self.state_file = os.path.join(storage_dir, "palace_state.json")
+        self.lock_file = os.path.join(storage_dir, ".lock")
+        self._lock = threading.RLock()
+        self._lock_fd: Optional[int] = None
+        self._transaction_depth = 0
+        self._state: Dict[str, Any] = {}
+        self._changed_files: set = set()
+        self._version_claimed = False  # a version was handed out that other workers haven't seen
+        self._changed_users: Dict[str, List[Any]] = {}  # user id -> [total_xp, username, level] saved
+        self.trace_hooks: List[StorageTraceHook] = []
+        self._catalog: Optional[Catalog] = None
+        self._semantic_index: Optional[SemanticIndex] = None
+        self._fuzzy_index: Optional[FuzzyIndex] = None
+        self._room_graph: Optional[RoomGraph] = None
+        self._duplicate_index: Optional[DuplicateIndex] = None
+        self._recall_sampler: Optional[RecallSampler] = None
+        self._retention_model: Optional[RetentionModel] = None
+        self._leaderboard: Optional[Leaderboard] = None
+        self._challenge_store: Optional[ChallengeStore] = None
+        self._location_rooms: Optional[Dict[str, str]] = None
+        self.partition_search = PartitionSearch(
+            PARALLEL_SEARCH_WORKERS, PARALLEL_SEARCH_MIN_MEMORIES, PARALLEL_SEARCH_MIN_PARTITIONS,
+            int(os.environ.get("MEMORY_PALACE_WORKERS") or 1)
+        )
+        self._next_challenge_sweep = 0.0
+        self.activity = ActivityLog(
+            os.path.join(storage_dir, "activity"), ACTIVITY_SEGMENT_BYTES, ACTIVITY_MAX_SEGMENTS,
+            ACTIVITY_HOURLY_DAYS, ACTIVITY_DAILY_DAYS, ACTIVITY_FLUSH_INTERVAL, ACTIVITY_MAX_MEMORY_IDS,
+            lock=self.transaction
+        )
+        self._palace_version: Optional[int] = None
+        # Room name -> (location ids the route was computed for, ids in walking order)
+        self._walk_routes: Dict[str, Tuple[Tuple[str, ...], List[str]]] = {}
+        # Bumped by tools that change what a search can return (new memories, rooms)
+        self.content_generation = 0
+        # Bumped on every location or room write
+        self.palace_generation = 0
+        self.result_cache = ResultCache(RESULT_CACHE_SIZE)
+        # Access times, recall counts and room mastery, persisted in the background
+        self.soft_updates = WriteBehindBuffer(
+            self._flush_soft_updates, WRITE_BEHIND_INTERVAL, WRITE_BEHIND_MAX_PENDING
+        )
         
-        # Initialize default achievements if they don't exist
-        self._init_default_achievements()
-        self._init_default_challenges()
-        self._init_default_learning_paths()
+    def add_trace_hook(self, hook: StorageTraceHook):
+        """Register a hook that receives a span for every storage read/write"""
+        if not isinstance(hook, StorageTraceHook):
+            raise TypeError(f"Trace hooks must subclass StorageTraceHook, got {type(hook).__name__}")
+        self.trace_hooks.append(hook)
         
-    def _init_default_achievements(self):
-        """Initialize default achievements if they don't exist"""
-        if os.path.exists(self.achievements_file):
-            return
-            
-        # Convert dictionary definitions to Achievement objects
-        default_achievements = {
-            achievement_id: Achievement(**achievement_data)
-            for achievement_id, achievement_data in DEFAULT_ACHIEVEMENTS.items()
-        }
+    def _emit_span(self, span: Dict[str, Any]):
+        """Hand a finished span to every registered hook"""
+        for hook in self.trace_hooks:
+            try:
+                hook.on_span(span)
+            except Exception:
+                # A broken exporter must never break the storage layer
+                pass
+        
+    def _read_json(self, path: str, span_name: str) -> Any:
+        """Read and parse a JSON file, tracing the read when hooks are registered"""
+        if not self.trace_hooks:
+            with open(path, 'r') as f:
+                return json.load(f)
         
-        with open(self.achievements_file, 'w') as f:
-            json.dump({k: asdict(v) for k, v in default_achievements.items()}, f, indent=2)
+        timestamp = time.time()
+        started = time.perf_counter()
+        with open(path, 'rb') as f:
+            raw = f.read()
+        read_done = time.perf_counter()
+        data = json.loads(raw)
+        parsed = time.perf_counter()
+        
+        self._emit_span({
+            "span": span_name,
+            "phase": "read",
+            "file": path,
+            "bytes": len(raw),
+            "records": len(data) if isinstance(data, (dict, list)) else 1,
+            "io_ms": round((read_done - started) * 1000, 3),
+            "parse_ms": round((parsed - read_done) * 1000, 3),
+            "duration_ms": round((parsed - started) * 1000, 3),
+            "timestamp": timestamp
+        })
+        return data
     
-    def _init_default_challenges(self):
-        """Initialize default challenges if they don't exist"""
-        if os.path.exists(self.challenges_file):
-            return
-            
-        # Use challenges from const.py
-        with open(self.challenges_file, 'w') as f:
-            json.dump(DEFAULT_CHALLENGES, f, indent=2)
+    def _ensure_storage_dir(self):
+        if not self._storage_dir_ready:
+            os.makedirs(self.storage_dir, exist_ok=True)
+            self._storage_dir_ready = True
     
-    def _init_default_learning_paths(self):
-        """Initialize default learning paths if they don't exist"""
-        if os.path.exists(self.learning_paths_file):
+    @contextmanager
+    def transaction(self):
+        """Hold the palace write lock, shared by threads and worker processes.
+        
+        Wrap every load-modify-save in a transaction so concurrent tool calls
+        can't overwrite each other's changes. Entering picks up writes made
+        by other processes; leaving publishes this one's. Re-entrant.
+        """
+        with self._lock:
+            if self._transaction_depth == 0:
+                self._ensure_storage_dir()
+                if fcntl is not None:
+                    if self._lock_fd is None:
+                        self._lock_fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+                self.refresh()
+            self._transaction_depth += 1
+            try:
+                yield self
+            finally:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    try:
+                        if self._changed_files or self._version_claimed:
+                            self._publish_state()
+                    finally:
+                        if fcntl is not None:
+                            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+    
+    def _read_state(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _publish_state(self):
+        """Record which files this transaction wrote, for other workers to notice"""
+        generations = dict(self._state.get("generations", {}))
+        for name in self._changed_files:
+            generations[name] = generations.get(name, 0) + 1
+        state = {"generations": generations}
+        if self._palace_version is not None:
+            state["version"] = self._palace_version
+        if self._changed_users:
+            # Lets other workers move these users on their leaderboards instead of rebuilding them
+            state["users"] = self._changed_users
+        self._replace_file(self.state_file, json.dumps(state).encode())
+        self._state = state
+        self._changed_files = set()
+        self._changed_users = {}
+        self._version_claimed = False
+    
+    def refresh(self):
+        """Drop in-memory indexes and cached results made stale by another worker's writes"""
+        with self._lock:
+            self._apply_state(self._read_state())
+    
+    def _apply_state(self, state: Dict[str, Any]):
+        if state == self._state:
             return
+        seen = self._state.get("generations", {})
+        changed = {
+            name for name, generation in state.get("generations", {}).items() if seen.get(name) != generation
+        }
+        if "rooms.json" in changed or any(name.startswith("locations/") for name in changed):
+            self._semantic_index = None
+            self._fuzzy_index = None
+            self._duplicate_index = None
+            self._recall_sampler = None
+            self._retention_model = None
+            self._location_rooms = None
+            self.result_cache.clear()
+            self.bump_content_generation()
+            self.palace_generation += 1
+        elif "soft_updates" in changed:
+            # Only bookkeeping fields changed: search indexes stay valid, access-based models don't
+            self._retention_model = None
+            self.palace_generation += 1
+        if "rooms.json" in changed:
+            self._room_graph = None
+        if "users.json" in changed and self._leaderboard is not None:
+            missed = state["generations"]["users.json"] - seen.get("users.json", 0) != 1
+            if missed or "users" not in state:
+                self._leaderboard = None  # saves from other transactions were missed: rebuild on next use
+            else:
+                for user_id, (total_xp, username, level) in state["users"].items():
+                    self._leaderboard.set(user_id, total_xp, username, level)
+        if "user_challenges.json" in changed:
+            self._challenge_store = None
+        if changed & {"achievements.json", "challenges.json", "learning_paths.json"}:
+            self._catalog = None
+        if "version" in state:
+            self._palace_version = max(state["version"], self._palace_version or 0)
+        self._state = state
+    
+    def _replace_file(self, path: str, raw: bytes):
+        """Write via a temporary file and an atomic rename, so readers never see a partial file"""
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(raw)
+        os.replace(temp_path, path)
+    
+    def _write_json(self, path: str, data: Any, span_name: str, change: Optional[str] = None):
+        """Serialize and write a JSON file, tracing the write when hooks are registered
+        
+        `change` is what other workers are told was written (the file name by default).
+        """
+        with self.transaction():
+            self._changed_files.add(change or os.path.basename(path))
+            if not self.trace_hooks:
+                self._replace_file(path, json.dumps(data, indent=2).encode())
+                return
             
-        # Use learning paths from const.py
-        with open(self.learning_paths_file, 'w') as f:
-            json.dump(DEFAULT_LEARNING_PATHS, f, indent=2)
+            timestamp = time.time()
+            started = time.perf_counter()
+            raw = json.dumps(data, indent=2).encode()
+            serialized = time.perf_counter()
+            self._replace_file(path, raw)
+            written = time.perf_counter()
         
-    def load_locations(self) -> Dict[str, MemoryLocation]:
-        """Load all memory locations"""
-        if not os.path.exists(self.locations_file):
+        self._emit_span({
+            "span": span_name,
+            "phase": "write",
+            "file": path,
+            "bytes": len(raw),
+            "records": len(data) if isinstance(data, (dict, list)) else 1,
+            "io_ms": round((written - serialized) * 1000, 3),
+            "serialize_ms": round((serialized - started) * 1000, 3),
+            "duration_ms": round((written - started) * 1000, 3),
+            "timestamp": timestamp
+        })
+        
+    def location_partitions(self) -> Dict[str, Dict[str, Any]]:
+        """The partition manifest: room name -> {"file": partition file, "memories": count}"""
+        if not os.path.exists(self.manifest_file) and os.path.exists(self.locations_file):
+            self._migrate_locations()
+        return self._read_manifest()
+    
+    def _read_manifest(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.manifest_file):
             return {}
+        return self._read_json(self.manifest_file, "load_location_manifest")["partitions"]
+    
+    def _migrate_locations(self):
+        """Split a single locations.json from before partitioning into room partitions"""
+        with self.transaction():
+            if os.path.exists(self.manifest_file) or not os.path.exists(self.locations_file):
+                return  # another worker got here first
+            data = self._read_json(self.locations_file, "load_locations")
+            self.save_locations({loc_id: MemoryLocation(**loc_data) for loc_id, loc_data in data.items()})
+            os.remove(self.locations_file)
+    
+    def _save_manifest(self, partitions: Mapping[str, Mapping[str, Any]], soft: bool = False):
+        self._write_json(self.manifest_file, {"partitions": partitions}, "save_location_manifest",
+                         "soft_updates" if soft else "locations/manifest.json")
+    
+    def location_count(self) -> int:
+        """Number of stored memories, from the manifest"""
+        return sum(entry["memories"] for entry in self.location_partitions().values())
+    
+    def load_locations(self, rooms: Optional[Iterable[str]] = None) -> Dict[str, MemoryLocation]:
+        """Load all memory locations, or only those of the given rooms (reading just their partitions)"""
+        partitions = self.location_partitions()
+        names = partitions.keys() if rooms is None else [name for name in dict.fromkeys(rooms) if name in partitions]
         
-        with open(self.locations_file, 'r') as f:
-            data = json.load(f)
-            
-        return {
-            loc_id: MemoryLocation(**loc_data) 
-            for loc_id, loc_data in data.items()
-        }
+        locations = {}
+        for name in names:
+            data = self._read_json(os.path.join(self.locations_dir, partitions[name]["file"]), "load_locations")
+            for loc_id, loc_data in data.items():
+                locations[loc_id] = MemoryLocation(**loc_data)
+        self.soft_updates.overlay("locations", locations)
+        return locations
+    
+    def save_locations(self, locations: Dict[str, MemoryLocation], soft: bool = False):
+        """Save all memory locations, rewriting every room partition
+        
+        `soft` marks a save that only changed bookkeeping fields, so other
+        workers keep their search indexes.
+        """
+        by_room: Dict[str, Dict[str, Any]] = {}
+        for loc_id, location in locations.items():
+            by_room.setdefault(location.room, {})[loc_id] = asdict(location)
+        
+        with self.transaction():
+            os.makedirs(self.locations_dir, exist_ok=True)
+            old_files = {entry["file"] for entry in self._read_manifest().values()}
+            partitions = {}
+            for name, data in by_room.items():
+                partitions[name] = {"file": location_partition_file(name), "memories": len(data)}
+                self._write_json(
+                    os.path.join(self.locations_dir, partitions[name]["file"]), data, "save_locations",
+                    "soft_updates" if soft else f"locations/{partitions[name]['file']}"
+                )
+            self._save_manifest(partitions, soft)
+            self.consume_queued(locations.values())
+            for name in old_files - {entry["file"] for entry in partitions.values()}:
+                os.remove(os.path.join(self.locations_dir, name))
+            self._location_rooms = None
+        self.palace_generation += 1
+    
+    def save_room_locations(self, room: str, room_locations: Mapping[str, MemoryLocation]):
+        """Save one room's memory locations, rewriting only its partition"""
+        with self.transaction():
+            os.makedirs(self.locations_dir, exist_ok=True)
+            partitions = self.location_partitions()
+            entry = {"file": location_partition_file(room), "memories": len(room_locations)}
+            self._write_json(
+                os.path.join(self.locations_dir, entry["file"]),
+                {loc_id: asdict(location) for loc_id, location in room_locations.items()},
+                "save_locations", f"locations/{entry['file']}"
+            )
+            self.consume_queued(room_locations.values())
+            if partitions.get(room) != entry:
+                partitions[room] = entry
+                self._save_manifest(partitions)
+        self.palace_generation += 1
+    
+    def search_partitions(self, query_lower: str, limit: Optional[int] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """How many memories contain the query, and the top exact search results, across every room
+        partition (scanned in parallel on large palaces when the pool is on)"""
+        partitions = self.location_partitions()
+        return self.partition_search.search(
+            [os.path.join(self.locations_dir, entry["file"]) for entry in partitions.values()],
+            query_lower,
+            sum(entry["memories"] for entry in partitions.values()),
+            limit
+        )
     
-    def save_locations(self, locations: Dict[str, MemoryLocation]):
-        """Save all memory locations"""
-        data = {
-            loc_id: asdict(location) 
-            for loc_id, location in locations.items()
-        }
+    def location_rooms(self) -> Dict[str, str]:
+        """Location id -> room name, from the saved rooms on first use and kept up to date"""
+        if self._location_rooms is None:
+            self._location_rooms = {
+                loc_id: name for name, room in self.load_rooms().items() for loc_id in room.locations
+            }
+        return self._location_rooms
+    
+    def rooms_of(self, location_ids: Iterable[str]) -> List[str]:
+        """Rooms holding any of these locations, to load just their partitions"""
+        location_rooms = self.location_rooms()
+        return sorted({location_rooms[loc_id] for loc_id in location_ids if loc_id in location_rooms})
+    
+    def semantic_index(self) -> SemanticIndex:
+        """Vector index over all memories, loaded from disk and caught up on first use"""
+        if self._semantic_index is None:
+            # Catching up appends to the shared vector files, so it runs under the lock
+            with self.transaction():
+                index = SemanticIndex(
+                    self.storage_dir,
+                    SEMANTIC_DIMENSIONS,
+                    ann_min_size=SEMANTIC_ANN_MIN_SIZE,
+                    n_probe=SEMANTIC_ANN_N_PROBE
+                )
+                index.sync(self.load_locations())
+                self._semantic_index = index
+        return self._semantic_index
+    
+    def fuzzy_index(self) -> FuzzyIndex:
+        """Trigram index over memory tokens, built in memory on first use"""
+        if self._fuzzy_index is None:
+            index = FuzzyIndex()
+            index.add_many(self.load_locations().values())
+            self._fuzzy_index = index
+        return self._fuzzy_index
+    
+    def palace_version(self) -> int:
+        """Highest version stamp in the palace; every change to a memory, room or achievement raises it"""
+        if self._palace_version is None:
+            versions = [loc.version for loc in self.load_locations().values()]
+            versions += [room.version for room in self.load_rooms().values()]
+            if os.path.exists(self.users_file):
+                for user_data in self._read_json(self.users_file, "load_users").values():
+                    versions += [a.get("version", 0) for a in user_data.get("achievements", [])]
+            self._palace_version = max(versions, default=0)
+        return self._palace_version
+    
+    def next_version(self) -> int:
+        """Claim the next palace version for a change
         
-        with open(self.locations_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        Call inside a transaction: it is published when the transaction ends,
+        so two workers never hand out the same version.
+        """
+        with self._lock:
+            self._palace_version = self.palace_version() + 1
+            self._version_claimed = True
+            return self._palace_version
+    
+    def stamp(self, record) -> int:
+        """Mark a memory, room or achievement as changed at the next palace version"""
+        record.version = self.next_version()
+        return record.version
+    
+    def duplicate_index(self) -> DuplicateIndex:
+        """Exact and near-duplicate index over memory contents, built on first use"""
+        if self._duplicate_index is None:
+            index = DuplicateIndex(DEDUPE_MIN_SIMILARITY)
+            index.add_many(self.load_locations().values())
+            self._duplicate_index = index
+        return self._duplicate_index
+    
+    def recall_sampler(self) -> RecallSampler:
+        """Per-room practice weights for practice_recall, built on first use and kept up to date"""
+        if self._recall_sampler is None:
+            sampler = RecallSampler(functools.partial(practice_weight, stale_days_cap=RECALL_STALE_DAYS_CAP))
+            sampler.add_many(self.load_locations().values())
+            self._recall_sampler = sampler
+        return self._recall_sampler
+    
+    def retention_model(self) -> RetentionModel:
+        """Forgetting-curve inputs per room, built on first use and kept up to date"""
+        if self._retention_model is None:
+            model = RetentionModel(RETENTION_BASE_DAYS, RETENTION_GROWTH)
+            model.add_many(self.load_locations().values())
+            self._retention_model = model
+        return self._retention_model
+    
+    def leaderboard(self) -> Leaderboard:
+        """Users ranked by total XP, built from the saved profiles on first use and moved as profiles
+        are saved, by this worker or (through the published state) by others"""
+        if self._leaderboard is None:
+            self.refresh()  # so later published saves are applied on top of the generation read here
+            leaderboard = Leaderboard()
+            if os.path.exists(self.users_file):
+                for user_id, user_data in self._read_json(self.users_file, "load_users").items():
+                    total_xp = user_data.get("total_xp")
+                    if total_xp is None:
+                        total_xp = lifetime_xp(user_data.get("level", 1), user_data.get("xp", 0))
+                    leaderboard.set(user_id, total_xp, user_data["username"], user_data.get("level", 1))
+            self._leaderboard = leaderboard
+        return self._leaderboard
+    
+    def challenge_store(self) -> ChallengeStore:
+        """Started challenges, loaded on first use"""
+        if self._challenge_store is None:
+            records = {}
+            if os.path.exists(self.user_challenges_file):
+                records = self._read_json(self.user_challenges_file, "load_user_challenges")
+            self._challenge_store = ChallengeStore(CHALLENGE_HISTORY_DAYS * 86400, records)
+        return self._challenge_store
+    
+    def save_challenge_store(self):
+        self._write_json(self.user_challenges_file, self.challenge_store().to_json(), "save_user_challenges")
+    
+    def sweep_challenges(self) -> List[str]:
+        """Expire overdue challenges, at most once per CHALLENGE_SWEEP_INTERVAL; returns the expired ids"""
+        if time.time() < self._next_challenge_sweep:
+            return []
+        self._next_challenge_sweep = time.time() + CHALLENGE_SWEEP_INTERVAL
+        self.refresh()
+        if not self.challenge_store().due(datetime.now()):
+            return []  # nothing to expire or purge, so no need for the lock
+        with self.transaction():
+            expired, purged = self.challenge_store().sweep(datetime.now())
+            if expired or purged:
+                self.save_challenge_store()
+        return expired
+    
+    def bump_content_generation(self):
+        """Invalidate cached results that depend on memory or room contents"""
+        self.content_generation += 1
+    
+    def index_location(self, location: MemoryLocation):
+        """Keep derived indexes in step with a newly stored location"""
+        if self._semantic_index is not None:
+            self._semantic_index.add(location)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.add(location)
+        if self._duplicate_index is not None:
+            self._duplicate_index.add(location)
+        if self._recall_sampler is not None:
+            self._recall_sampler.add(location)
+        if self._retention_model is not None:
+            self._retention_model.add(location)
+        if self._location_rooms is not None:
+            self._location_rooms[location.id] = location.room
+    
+    def room_graph(self) -> RoomGraph:
+        """Adjacency index over room connections, built from the saved rooms on first use"""
+        if self._room_graph is None:
+            graph = RoomGraph()
+            graph.add_rooms(self.load_rooms())
+            self._room_graph = graph
+        return self._room_graph
+    
+    def index_room(self, room: MemoryRoom) -> List[str]:
+        """Add a newly created room to the room graph; returns connections to rooms that don't exist yet"""
+        return self.room_graph().add_room(room.name, room.connections)
+    
+    def walk_route(self, room: str, room_locations: List[MemoryLocation]) -> List[MemoryLocation]:
+        """A room's memories in shortest-walk order, cached until the room's memories change"""
+        key = tuple(loc.id for loc in room_locations)
+        cached = self._walk_routes.get(room)
+        if cached is None or cached[0] != key:
+            order = shortest_walk([
+                (loc.position["x"], loc.position["y"], loc.position["z"]) for loc in room_locations
+            ])
+            cached = (key, [key[i] for i in order])
+            self._walk_routes[room] = cached
+        by_id = {loc.id: loc for loc in room_locations}
+        return [by_id[loc_id] for loc_id in cached[1]]
     
     def load_rooms(self) -> Dict[str, MemoryRoom]:
         """Load all rooms"""
         if not os.path.exists(self.rooms_file):
             return {}
             
-        with open(self.rooms_file, 'r') as f:
-            data = json.load(f)
+        data = self._read_json(self.rooms_file, "load_rooms")
             
-        return {
+        rooms = {
             room_name: MemoryRoom(**room_data)
             for room_name, room_data in data.items()
         }
+        self.soft_updates.overlay("rooms", rooms)
+        return rooms
     
-    def save_rooms(self, rooms: Dict[str, MemoryRoom]):
-        """Save all rooms"""
+    def save_rooms(self, rooms: Dict[str, MemoryRoom], soft: bool = False):
+        """Save all rooms (`soft` as in save_locations)"""
         data = {
             room_name: asdict(room)
             for room_name, room in rooms.items()
         }
         
-        with open(self.rooms_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        self._write_json(self.rooms_file, data, "save_rooms", "soft_updates" if soft else None)
+        self.palace_generation += 1
+    
+    def update_locations(self, changes: Mapping[str, Mapping[str, Any]], soft: bool = False,
+                         amounts: Optional[Mapping[str, Mapping[str, float]]] = None):
+        """Write changed fields of some locations, and add `amounts` to others (recall counts),
+        rewriting only the partitions of their rooms"""
+        by_room: Dict[str, Dict[str, Mapping[str, Any]]] = {}
+        amounts_by_room: Dict[str, Dict[str, Mapping[str, float]]] = {}
+        location_rooms = self.location_rooms()
+        for location_id, fields in changes.items():
+            if location_id in location_rooms:
+                by_room.setdefault(location_rooms[location_id], {})[location_id] = fields
+        for location_id, added in (amounts or {}).items():
+            if location_id in location_rooms:
+                amounts_by_room.setdefault(location_rooms[location_id], {})[location_id] = added
+        with self.transaction():
+            partitions = self.location_partitions()
+            for name in {**by_room, **amounts_by_room}:
+                if name in partitions:
+                    self._update_records(
+                        os.path.join(self.locations_dir, partitions[name]["file"]), "update_locations",
+                        by_room.get(name, {}), soft, f"locations/{partitions[name]['file']}",
+                        amounts_by_room.get(name)
+                    )
+        if not soft:
+            for model in (self._recall_sampler, self._retention_model):
+                if model is not None:
+                    for location_id, fields in changes.items():
+                        model.update(location_id, **fields)
+    
+    def update_rooms(self, changes: Mapping[str, Mapping[str, Any]], soft: bool = False):
+        """Write changed fields of some rooms (as update_locations)"""
+        self._update_records(self.rooms_file, "update_rooms", changes, soft)
+    
+    def _update_records(self, path: str, span_name: str, changes: Mapping[str, Mapping[str, Any]], soft: bool,
+                        change: Optional[str] = None, amounts: Optional[Mapping[str, Mapping[str, float]]] = None):
+        with self.transaction():
+            if not os.path.exists(path):
+                return
+            data = self._read_json(path, span_name)
+            for key, fields in changes.items():
+                if key in data:
+                    data[key].update(fields)
+            for key, added in (amounts or {}).items():
+                if key in data:
+                    for name, amount in added.items():
+                        data[key][name] = data[key].get(name, 0) + amount
+            self._write_json(path, data, span_name, "soft_updates" if soft else change)
+            self.palace_generation += 1
+    
+    def soft_update(self, kind: str, key: str, **fields):
+        """Queue bookkeeping fields of a location or room ("locations" / "rooms") for the background flusher"""
+        self.soft_updates.update(kind, key, **fields)
+        self.palace_generation += 1
+        if kind == "locations":
+            for model in (self._recall_sampler, self._retention_model):
+                if model is not None:
+                    model.update(key, **fields)
+    
+    def soft_add(self, kind: str, key: str, **amounts: float):
+        """Queue amounts to add to a location's fields (recall counts) for the background flusher"""
+        self.soft_updates.add(kind, key, **amounts)
+        self.palace_generation += 1
+        if kind == "locations" and self._retention_model is not None:
+            record = self._retention_model.records.get(key)
+            if record is not None:
+                self._retention_model.update(key, **{
+                    name: record[name] + amount for name, amount in amounts.items() if name in record
+                })
+    
+    def consume_queued(self, locations: Iterable[MemoryLocation]):
+        """Take the queued amounts loaded into these locations off the queue once they are saved
+        
+        Call under the lock, in the transaction that wrote them.
+        """
+        for location in locations:
+            queued = getattr(location, "_queued", None)
+            if queued:
+                self.soft_updates.consume("locations", location.id, **queued)
+                location._queued = {}
+    
+    def _flush_soft_updates(self, updates):
+        """Write queued soft updates onto the current files
+        
+        Their versions are claimed here, under the lock that writes and
+        publishes them: a version handed out earlier would reach other
+        workers before the changes it covers.
+        """
+        with self.transaction():
+            amounts = self.soft_updates.all_amounts("locations")
+            queued = updates.get("locations", {})
+            location_changes = {key: dict(queued.get(key, {})) for key in {**queued, **amounts}}
+            room_changes = {key: dict(fields) for key, fields in updates.get("rooms", {}).items()}
+            for changes in (location_changes, room_changes):
+                for key in sorted(changes):
+                    changes[key]["version"] = self.next_version()
+            if location_changes:
+                self.update_locations(location_changes, soft=True, amounts=amounts)
+            if room_changes:
+                self.update_rooms(room_changes, soft=True)
+            for key, added in amounts.items():
+                self.soft_updates.consume("locations", key, **added)
+            for user_id in self.soft_updates.amount_keys("users"):
+                # Loading adds the queued XP; saving writes it and takes it off the queue
+                self.save_user_profile(self.load_user_profile(user_id))
             
     def load_user_profile(self, user_id: str = "default") -> UserProfile:
         """Load a user profile, or create a default one if it doesn't exist"""
@@ -268,10 +972,9 @@ class MemoryPalaceStorage:
                 personality=random.choice(list(PERSONALITIES.keys()))
             )
             self.save_user_profile(default_user)
-            return default_user
+            return self._add_queued_xp(default_user)
             
-        with open(self.users_file, 'r') as f:
-            data = json.load(f)
+        data = self._read_json(self.users_file, "load_user_profile")
         
         if user_id not in data:
             # Create new user
@@ -281,7 +984,7 @@ class MemoryPalaceStorage:
                 personality=random.choice(list(PERSONALITIES.keys()))
             )
             self.save_user_profile(new_user)
-            return new_user
+            return self._add_queued_xp(new_user)
             
         # Load achievements as proper objects
         user_data = data[user_id]
@@ -289,113 +992,132 @@ class MemoryPalaceStorage:
             user_data["achievements"] = [
                 Achievement(**achievement) for achievement in user_data["achievements"]
             ]
+        user_data["active_challenges"] = self.challenge_store().active_ids(user_id)
             
-        return UserProfile(**user_data)
+        return self._add_queued_xp(UserProfile(**user_data))
+    
+    def _add_queued_xp(self, user: UserProfile) -> UserProfile:
+        """Add XP queued by soft_add_xp, remembering how much so saving the profile can take it off the queue"""
+        queued = self.soft_updates.amounts("users", user.id).get("xp", 0)
+        if queued:
+            user.gain_xp(queued)
+        user._queued_xp = queued  # not a dataclass field, so never saved
+        return user
+    
+    def soft_add_xp(self, user_id: str, amount: int):
+        """Award XP without rewriting users.json now; the background flusher saves it"""
+        note_activity(xp=amount)
+        self.soft_updates.add("users", user_id, xp=amount)
     
     def save_user_profile(self, user: UserProfile):
         """Save a user profile"""
-        if not os.path.exists(self.users_file):
-            data = {}
-        else:
-            with open(self.users_file, 'r') as f:
-                data = json.load(f)
-                
-        data[user.id] = asdict(user)
-        
-        with open(self.users_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        with self.transaction():
+            if not os.path.exists(self.users_file):
+                data = {}
+            else:
+                data = self._read_json(self.users_file, "save_user_profile")
             
-    def load_achievements(self) -> Dict[str, Achievement]:
-        """Load all achievements"""
-        if not os.path.exists(self.achievements_file):
-            self._init_default_achievements()
+            data[user.id] = asdict(user)
             
-        with open(self.achievements_file, 'r') as f:
-            data = json.load(f)
+            self._write_json(self.users_file, data, "save_user_profile")
+            self._changed_users[user.id] = [user.total_xp, user.username, user.level]
+            queued = getattr(user, "_queued_xp", 0)
+            if queued:
+                # Written now, so no longer queued
+                self.soft_updates.consume("users", user.id, xp=queued)
+                user._queued_xp = 0
+        if self._leaderboard is not None:
+            self._leaderboard.set(user.id, user.total_xp, user.username, user.level)
             
+    def catalog(self) -> Catalog:
+        """Frozen achievements, challenges and learning paths.
+        
+        Built once per storage instance: the defaults from const.py are used
+        unless an override file exists on disk, so catalogue lookups never
+        touch the filesystem after the first call.
+        """
+        if self._catalog is None:
+            overrides = {}
+            if os.path.exists(self.achievements_file):
+                overrides["achievements"] = self._read_json(self.achievements_file, "load_achievements")
+            if os.path.exists(self.challenges_file):
+                overrides["challenges"] = self._read_json(self.challenges_file, "load_challenges")
+            if os.path.exists(self.learning_paths_file):
+                overrides["learning_paths"] = self._read_json(self.learning_paths_file, "load_learning_paths")
+            self._catalog = DEFAULT_CATALOG.replace(**overrides) if overrides else DEFAULT_CATALOG
+        return self._catalog
+        
+    def load_achievements(self) -> Dict[str, Achievement]:
+        """Load all achievements as fresh, mutable Achievement objects"""
         return {
             ach_id: Achievement(**ach_data)
-            for ach_id, ach_data in data.items()
+            for ach_id, ach_data in self.catalog().achievements.items()
         }
         
-    def load_challenges(self) -> Dict:
-        """Load challenge templates"""
-        if not os.path.exists(self.challenges_file):
-            self._init_default_challenges()
+    def load_challenges(self) -> Mapping[str, Mapping]:
+        """Load challenge templates (read-only)"""
+        return self.catalog().challenges
             
-        with open(self.challenges_file, 'r') as f:
-            return json.load(f)
-            
-    def load_learning_paths(self) -> Dict:
-        """Load learning paths"""
-        if not os.path.exists(self.learning_paths_file):
-            self._init_default_learning_paths()
-            
-        with open(self.learning_paths_file, 'r') as f:
-            return json.load(f)
+    def load_learning_paths(self) -> Mapping[str, Mapping]:
+        """Load learning paths (read-only)"""
+        return self.catalog().learning_paths
+    
+    def save_achievements(self, achievements: Dict[str, Achievement]):
+        """Override the achievement catalogue; the const.py defaults stay untouched"""
+        data = {ach_id: asdict(achievement) for ach_id, achievement in achievements.items()}
+        self._write_json(self.achievements_file, data, "save_achievements")
+        self._catalog = self.catalog().replace(achievements=data)
+        
+    def save_challenges(self, challenges: Mapping[str, Mapping]):
+        """Override the challenge templates; the const.py defaults stay untouched"""
+        data = thaw(challenges)
+        self._write_json(self.challenges_file, data, "save_challenges")
+        self._catalog = self.catalog().replace(challenges=data)
+        
+    def save_learning_paths(self, learning_paths: Mapping[str, Mapping]):
+        """Override the learning paths; the const.py defaults stay untouched"""
+        data = thaw(learning_paths)
+        self._write_json(self.learning_paths_file, data, "save_learning_paths")
+        self._catalog = self.catalog().replace(learning_paths=data)
             
-    def check_and_award_achievements(self, user_id: str = "default") -> List[Dict]:
-        """Check for new achievements and award them if earned"""
-        user = self.load_user_profile(user_id)
-        rooms = self.load_rooms()
-        locations = self.load_locations()
-        achievements = self.load_achievements()
+    def earned_achievements(self, user: UserProfile) -> List[str]:
+        """Ids of achievements the user has earned but not unlocked yet"""
+        unlocked_ids = {a.id for a in user.achievements if a.unlocked}
+        room_count = len(self.load_rooms())
+        memory_count = self.location_count()
+        earned = {
+            "first_room": room_count >= 1,
+            "first_memory": memory_count >= 1,
+            "three_rooms": room_count >= 3,
+            "ten_memories": memory_count >= 10,
+            "three_day_streak": user.streak_days >= 3,
+            "seven_day_streak": user.streak_days >= 7
+        }
+        return [achievement_id for achievement_id, done in earned.items() if done and achievement_id not in unlocked_ids]
+    
+    def check_and_award_achievements(self, user_id: str = "default", user: Optional[UserProfile] = None) -> List[Dict]:
+        """Check for new achievements and award them if earned
         
-        # Get already unlocked achievement IDs
-        unlocked_ids = [a.id for a in user.achievements if a.unlocked]
+        Pass the caller's loaded profile as `user` to unlock on it and leave
+        saving to the caller; otherwise the profile is loaded and saved here.
+        """
+        caller_saves = user is not None
+        if user is None:
+            user = self.load_user_profile(user_id)
+        achievements = self.catalog().achievements
         newly_unlocked = []
         
-        # Check for achievements
-        if "first_room" not in unlocked_ids and len(rooms) >= 1:
-            achievement = achievements["first_room"]
-            achievement.unlocked = True
-            achievement.unlocked_at = datetime.now().isoformat()
-            user.achievements.append(achievement)
-            user.add_xp(achievement.xp_reward)
-            newly_unlocked.append(asdict(achievement))
-            
-        if "first_memory" not in unlocked_ids and len(locations) >= 1:
-            achievement = achievements["first_memory"]
-            achievement.unlocked = True
-            achievement.unlocked_at = datetime.now().isoformat()
-            user.achievements.append(achievement)
-            user.add_xp(achievement.xp_reward)
-            newly_unlocked.append(asdict(achievement))
-            
-        if "three_rooms" not in unlocked_ids and len(rooms) >= 3:
-            achievement = achievements["three_rooms"]
-            achievement.unlocked = True
-            achievement.unlocked_at = datetime.now().isoformat()
-            user.achievements.append(achievement)
-            user.add_xp(achievement.xp_reward)
-            newly_unlocked.append(asdict(achievement))
-            
-        if "ten_memories" not in unlocked_ids and len(locations) >= 10:
-            achievement = achievements["ten_memories"]
-            achievement.unlocked = True
-            achievement.unlocked_at = datetime.now().isoformat()
-            user.achievements.append(achievement)
-            user.add_xp(achievement.xp_reward)
-            newly_unlocked.append(asdict(achievement))
-            
-        if "three_day_streak" not in unlocked_ids and user.streak_days >= 3:
-            achievement = achievements["three_day_streak"]
-            achievement.unlocked = True
-            achievement.unlocked_at = datetime.now().isoformat()
-            user.achievements.append(achievement)
-            user.add_xp(achievement.xp_reward)
-            newly_unlocked.append(asdict(achievement))
-            
-        if "seven_day_streak" not in unlocked_ids and user.streak_days >= 7:
-            achievement = achievements["seven_day_streak"]
+        for achievement_id in self.earned_achievements(user):
+            achievement = Achievement(**achievements[achievement_id])
             achievement.unlocked = True
             achievement.unlocked_at = datetime.now().isoformat()
+            self.stamp(achievement)
             user.achievements.append(achievement)
             user.add_xp(achievement.xp_reward)
             newly_unlocked.append(asdict(achievement))
             
         # Save user with new achievements
-        if newly_unlocked:
+        if newly_unlocked and not caller_saves:
             self.save_user_profile(user)
             
         return newly_unlocked
@@ -404,23 +1126,24 @@ class MemoryPalaceStorage:
         """Generate a personalized challenge based on user's palace"""
         user = self.load_user_profile(user_id)
         rooms = self.load_rooms()
-        locations = self.load_locations()
-        challenge_templates = self.load_challenges()
+        partitions = self.location_partitions()
+        catalog = self.catalog()
+        challenge_templates = catalog.challenges
         
-        if not rooms or not locations:
+        if not rooms or not partitions:
             return None  # Can't create challenges without content
             
         # Pick a random challenge type
-        challenge_type = random.choice(list(challenge_templates.keys()))
+        challenge_type = random.choice(catalog.challenge_types)
         template = challenge_templates[challenge_type]
         
         # Pick a random room that has memories
-        valid_rooms = [r for r in rooms.keys() if any(loc.room == r for loc in locations.values())]
+        valid_rooms = [r for r in rooms.keys() if partitions.get(r, {}).get("memories")]
         if not valid_rooms:
             return None
             
         room = random.choice(valid_rooms)
-        room_locations = [loc for loc in locations.values() if loc.room == room]
+        room_locations = list(self.load_locations([room]).values())
         
         # Create a challenge based on template type
         if challenge_type == "quick_recall":
@@ -440,12 +1163,13 @@ class MemoryPalaceStorage:
             xp_reward = template["difficulty_levels"][difficulty]["xp_reward"]
             
             challenge = MemoryChallenge(
-                id=f"challenge_{int(time.time())}",
+                id=f"challenge_{new_id()}",
                 name=template["name"],
                 description=template["description"].format(count=count, room=room),
                 target_memories=target_memories,
                 difficulty=difficulty,
-                xp_reward=xp_reward
+                xp_reward=xp_reward,
+                user_id=user_id
             )
             
             return asdict(challenge)
@@ -455,12 +1179,13 @@ class MemoryPalaceStorage:
                 return None
                 
             challenge = MemoryChallenge(
-                id=f"challenge_{int(time.time())}",
+                id=f"challenge_{new_id()}",
                 name=template["name"],
                 description=template["description"].format(room=room),
                 target_memories=[loc.id for loc in room_locations],
                 difficulty="medium" if len(room_locations) < 7 else "hard",
-                xp_reward=template["xp_reward"]
+                xp_reward=template["xp_reward"],
+                user_id=user_id
             )
             
             return asdict(challenge)
@@ -471,33 +1196,72 @@ class MemoryPalaceStorage:
 # Global storage instance
 storage = MemoryPalaceStorage()
 
-def generate_location_id(content: str, room: str) -> str:
-    """Generate a unique ID for a memory location"""
-    return hashlib.md5(f"{room}:{content}:{datetime.now()}".encode()).hexdigest()[:12]
+# Opt-in local span exporter for storage tracing
+if os.environ.get("MEMORY_PALACE_TRACE_FILE"):
+    storage.add_trace_hook(JsonlSpanExporter(os.environ["MEMORY_PALACE_TRACE_FILE"]))
+
+def transactional(tool):
+    """Run a tool inside a storage transaction, so its load-modify-save can't interleave with another call's"""
+    @functools.wraps(tool)
+    def wrapper(*args, **kwargs):
+        with storage.transaction():
+            return tool(*args, **kwargs)
+    return wrapper
+
+def log_activity(tool):
+    """Record each call of a tool (latency, rooms, memories, XP) in the activity log"""
+    @functools.wraps(tool)
+    def wrapper(*args, **kwargs):
+        with storage.activity.event(tool.__name__) as event:
+            result = tool(*args, **kwargs)
+            if isinstance(result, dict) and "error" in result:
+                event["ok"] = False
+            return result
+    return wrapper
+
+def generate_location_id() -> str:
+    """Generate a unique, time-ordered ID for a memory location"""
+    return new_id()
 
 def generate_message(message_type: str, user_id: str = "default") -> str:
     """Generate a personality-specific message"""
     user = storage.load_user_profile(user_id)
-    personality = user.get_personality()
-    
-    message = personality["messages"].get(message_type, "")
     
-    # Format any placeholders
-    if "{streak}" in message:
-        message = message.format(streak=user.streak_days)
-        
-    # Add personality emoji
-    return f"{personality['emoji']} {message}"
+    # Templates are pre-split around {streak} and already carry the emoji
+    return render_personality_message(user.personality, message_type, user.streak_days)
     
 def check_user_progress(user_id: str = "default") -> Dict[str, Any]:
-    """Update user progress and check for achievements/leveling"""
-    user = storage.load_user_profile(user_id)
-    
-    # Update streak
-    streak_result = user.update_streak()
+    """Update user progress and check for achievements/leveling
     
-    # Check for new achievements
-    new_achievements = storage.check_and_award_achievements(user_id)
+    Takes the palace lock only when there is something to save (a new streak
+    day or an earned achievement), so read-only tools calling it stay lock-free.
+    """
+    storage.sweep_challenges()
+    user = storage.load_user_profile(user_id)
+    streak_result: Dict[str, Any] = {"streak_updated": False}
+    new_achievements: List[Dict] = []
+    level_up_message = None
+    
+    if user.streak_due() or storage.earned_achievements(user):
+        with storage.transaction():
+            # Reloaded under the lock, so a save made meanwhile isn't overwritten
+            user = storage.load_user_profile(user_id)
+            
+            # Update streak
+            streak_result = user.update_streak()
+            
+            # Check for new achievements (unlocked on this profile, saved below)
+            new_achievements = storage.check_and_award_achievements(user_id, user)
+            
+            # Award XP for streak continuation
+            if streak_result.get("streak_updated", False) and streak_result.get("streak_bonus", 0) > 0:
+                xp_result = user.add_xp(streak_result["streak_bonus"])
+                if xp_result["level_up"]:
+                    level_up_message = f"🎉 Level Up! You've reached level {xp_result['new_level']}!"
+            
+            # Save user progress, unless this call changed nothing
+            if streak_result.get("streak_updated", False) or new_achievements:
+                storage.save_user_profile(user)
     
     # Generate a random tip occasionally
     should_give_tip = random.random() < 0.3  # 30% chance
@@ -507,19 +1271,6 @@ def check_user_progress(user_id: str = "default") -> Dict[str, Any]:
     should_give_challenge = random.random() < 0.2 and user.level >= 2  # 20% chance after level 2
     challenge = storage.generate_challenge(user_id) if should_give_challenge else None
     
-    # Award XP for streak continuation
-    if streak_result.get("streak_updated", False) and streak_result.get("streak_bonus", 0) > 0:
-        xp_result = user.add_xp(streak_result["streak_bonus"])
-        if xp_result["level_up"]:
-            level_up_message = f"🎉 Level Up! You've reached level {xp_result['new_level']}!"
-        else:
-            level_up_message = None
-    else:
-        level_up_message = None
-    
-    # Save user progress
-    storage.save_user_profile(user)
-    
     result = {
         "user": {
             "level": user.level,
@@ -538,6 +1289,8 @@ def check_user_progress(user_id: str = "default") -> Dict[str, Any]:
     return result
 
 @mcp.tool(description="Create a new room in your memory palace - like making a special place to store your memories")
+@log_activity
+@transactional
 def create_room(name: str, description: str, theme: str = "default", connections: Optional[List[str]] = None) -> dict:
     """Create a new room in the memory palace with gamification elements"""
     rooms = storage.load_rooms()
@@ -556,8 +1309,13 @@ def create_room(name: str, description: str, theme: str = "default", connections
         last_visited=datetime.now().isoformat()
     )
     
+    storage.stamp(new_room)
     rooms[name] = new_room
     storage.save_rooms(rooms)
+    storage.bump_content_generation()
+    unresolved_connections = storage.index_room(new_room)
+    
+    note_activity(rooms=[name])
     
     # Update user stats and check progress
     user = storage.load_user_profile(user_id)
@@ -578,6 +1336,7 @@ def create_room(name: str, description: str, theme: str = "default", connections
         "room": asdict(new_room),
         "xp_gained": xp_reward,
         "welcome_message": welcome_message,
+        "connected_rooms": storage.room_graph().neighbours(name),
         "next_steps": [
             f"Add a memory in '{name}' by saying: Save a memory in '{name}'.",
             f"Take a walk through '{name}' by saying: Walk through '{name}'.",
@@ -585,6 +1344,13 @@ def create_room(name: str, description: str, theme: str = "default", connections
         ]
     }
     
+    if unresolved_connections:
+        result["pending_connections"] = unresolved_connections
+        result["pending_connections_message"] = (
+            f"These rooms don't exist yet, so they'll be connected once you create them: "
+            f"{', '.join(unresolved_connections)}"
+        )
+    
     # Add any progress-based messages
     if progress["new_achievements"]:
         achievement = progress["new_achievements"][0]
@@ -603,6 +1369,8 @@ def create_room(name: str, description: str, theme: str = "default", connections
     return result
 
 @mcp.tool(description="Put a memory in your memory palace - like putting a picture on the wall to help you remember something")
+@log_activity
+@transactional
 def store_memory(
     room: str, 
     content: str, 
@@ -610,18 +1378,55 @@ def store_memory(
     x: float = 0.0, 
     y: float = 0.0, 
     z: float = 0.0,
-    keywords: Optional[List[str]] = None
+    keywords: Optional[List[str]] = None,
+    verbosity: Optional[str] = None,
+    dedupe: str = "exact"
 ) -> dict:
-    """Store a memory at a specific location in the memory palace with gamification"""
+    """Store a memory at a specific location in the memory palace with gamification
+    
+    `dedupe` "exact" (the default) stores nothing when the room already holds
+    the same content, and returns the existing memory's id as `duplicate_of`;
+    "near" also catches lightly reworded content (as long as it mentions the
+    same numbers) and "off" always stores.
+    `verbosity` ("full", "compact" or "ids-only") overrides the default set with set_verbosity.
+    """
+    
+    if verbosity is not None and verbosity not in VERBOSITY_LEVELS:
+        return {"error": f"Unknown verbosity '{verbosity}'. Available levels: {', '.join(VERBOSITY_LEVELS)}"}
+    
+    if dedupe not in DEDUPE_MODES:
+        return {"error": f"Unknown dedupe mode '{dedupe}'. Available modes: {', '.join(DEDUPE_MODES)}"}
     
     rooms = storage.load_rooms()
-    locations = storage.load_locations()
+    locations = storage.load_locations([room])
     user_id = "default"  # For now, we use a default user
     
     if room not in rooms:
         return {"error": f"Room '{room}' doesn't exist. Create it first."}
     
-    location_id = generate_location_id(content, room)
+    if dedupe != "off":
+        match = storage.duplicate_index().find(room, content, near=dedupe == "near")
+        if match is not None and match[0] in locations:
+            existing = locations[match[0]]
+            note_activity(rooms=[room], memory_ids=[existing.id])
+            user = storage.load_user_profile(user_id)
+            result = {
+                "success": False,
+                "duplicate": True,
+                "duplicate_of": existing.id,
+                "match": match[1],
+                "similarity": round(match[2], 3),
+                "message": f"Nothing was stored: this memory is already in '{room}' as {existing.id}",
+                "location": asdict(existing),
+                "xp_gained": 0,
+                "next_steps": [
+                    f"Find it by saying: Find '{existing.content[:20]}'.",
+                    "Store it anyway by calling store_memory with dedupe='off'."
+                ]
+            }
+            return shape_response("store_memory", result, verbosity or user.verbosity)
+    
+    location_id = generate_location_id()
     now = datetime.now().isoformat()
     
     new_location = MemoryLocation(
@@ -641,9 +1446,15 @@ def store_memory(
     locations[location_id] = new_location
     rooms[room].locations.append(location_id)
     rooms[room].last_visited = now
+    storage.stamp(new_location)
+    storage.stamp(rooms[room])
     
-    storage.save_locations(locations)
+    storage.save_room_locations(room, locations)
     storage.save_rooms(rooms)
+    storage.index_location(new_location)
+    storage.bump_content_generation()
+    
+    note_activity(rooms=[room], memory_ids=[location_id])
     
     # Update user stats and check progress
     user = storage.load_user_profile(user_id)
@@ -707,34 +1518,35 @@ def store_memory(
             f"{progress['challenge']['description']}. Complete for +{progress['challenge']['xp_reward']} XP!"
         )
     
-    return result
+    return shape_response("store_memory", result, verbosity or user.verbosity)
 
-@mcp.tool(description="Take a walk through your memory palace to see all the memories you've saved")
-def memory_journey(room: str, include_connections: bool = False) -> dict:
-    """Take a journey through memories in a room with gamification elements"""
+def walk_room(room: MemoryRoom, locations: Dict[str, MemoryLocation], order: str = "position") -> List[Dict[str, Any]]:
+    """Visit a room's memories, counting each as a recall and updating the
+    room's last visit and mastery (queued as soft updates); returns the journey path.
     
-    rooms = storage.load_rooms()
-    locations = storage.load_locations()
-    user_id = "default"
-    
-    if room not in rooms:
-        return {"error": f"Room '{room}' doesn't exist"}
-    
-    current_room = rooms[room]
+    order "position" sorts memories by (x, y, z); "shortest" follows the
+    shortest walk between their positions.
+    """
     journey_path = []
     
-    # Sort locations by position for a natural journey
     room_locations = [
-        locations[loc_id] for loc_id in current_room.locations 
+        locations[loc_id] for loc_id in room.locations 
         if loc_id in locations
     ]
     
-    room_locations.sort(key=lambda loc: (loc.position["x"], loc.position["y"], loc.position["z"]))
+    if order == "shortest":
+        room_locations = storage.walk_route(room.name, room_locations)
+    else:
+        # Sort locations by position for a natural journey
+        room_locations.sort(key=lambda loc: (loc.position["x"], loc.position["y"], loc.position["z"]))
     
     for location in room_locations:
-        # Update last accessed time
+        # Update last accessed time. The recall is queued as an increment, so journeys
+        # in other workers or recall results written meanwhile aren't overwritten
         location.last_accessed = datetime.now().isoformat()
         location.recall_count += 1
+        storage.soft_update("locations", location.id, last_accessed=location.last_accessed)
+        storage.soft_add("locations", location.id, recall_count=1)
         
         journey_path.append({
             "location_id": location.id,
@@ -746,22 +1558,59 @@ def memory_journey(room: str, include_connections: bool = False) -> dict:
         })
     
     # Update room last visited
-    current_room.last_visited = datetime.now().isoformat()
+    room.last_visited = datetime.now().isoformat()
     
-    # Calculate room mastery level based on recall counts
+    # Calculate room mastery level based on recall counts and success rates
     if room_locations:
-        avg_recall = sum(loc.recall_count for loc in room_locations) / len(room_locations)
-        # Scale mastery: 5 recalls = 50%, 10 recalls = 100%
-        mastery_level = min(100, int(avg_recall * 10))
-        current_room.mastery_level = mastery_level
+        room.mastery_level = room_mastery(room_locations)
+    storage.soft_update("rooms", room.name, last_visited=room.last_visited, mastery_level=room.mastery_level)
     
-    # Save updated state
-    storage.save_locations(locations)
-    storage.save_rooms(rooms)
+    return journey_path
+
+@mcp.tool(description="Take a walk through your memory palace to see all the memories you've saved")
+@log_activity
+@transactional
+def memory_journey(room: str, include_connections: bool = False, order: str = "position",
+                   since: Optional[int] = None, verbosity: Optional[str] = None) -> dict:
+    """Take a journey through memories in a room with gamification elements
+    
+    order "position" visits memories sorted by (x, y, z); "shortest" follows
+    the shortest walk through the room. With `since` (the `version` of an
+    earlier response) only memories changed after that version are returned in
+    full; `journey_order` still lists every memory id in walking order.
+    `verbosity` ("full", "compact" or "ids-only") overrides the default set with set_verbosity.
+    """
+    
+    if verbosity is not None and verbosity not in VERBOSITY_LEVELS:
+        return {"error": f"Unknown verbosity '{verbosity}'. Available levels: {', '.join(VERBOSITY_LEVELS)}"}
+    
+    if order not in JOURNEY_ORDERS:
+        return {"error": f"Unknown journey order '{order}'. Available orders: {', '.join(JOURNEY_ORDERS)}"}
+    
+    rooms = storage.load_rooms()
+    locations = storage.load_locations([room])
+    user_id = "default"
+    
+    if room not in rooms:
+        return {"error": f"Room '{room}' doesn't exist"}
+    
+    current_room = rooms[room]
+    
+    # Decided before the walk, which stamps every memory it visits
+    if since is not None:
+        changed_ids = {
+            loc_id for loc_id in current_room.locations
+            if loc_id in locations and locations[loc_id].version > since
+        }
+    
+    journey_path = walk_room(current_room, locations, order)
+    storage.bump_content_generation()
+    version = storage.palace_version()
+    note_activity(rooms=[room], memory_ids=[stop["location_id"] for stop in journey_path])
     
     # Award XP based on journey
     user = storage.load_user_profile(user_id)
-    xp_reward = 10 + (5 * len(room_locations))  # Base + per memory
+    xp_reward = 10 + (5 * len(journey_path))  # Base + per memory
     xp_result = user.add_xp(xp_reward)
     storage.save_user_profile(user)
     
@@ -769,10 +1618,12 @@ def memory_journey(room: str, include_connections: bool = False) -> dict:
     progress = check_user_progress(user_id)
     
     result = {
+        "version": version,
         "room": room,
         "description": current_room.description,
         "theme": current_room.theme,
         "mastery_level": current_room.mastery_level,
+        "order": order,
         "journey_path": journey_path,
         "total_memories": len(journey_path),
         "xp_gained": xp_reward,
@@ -784,8 +1635,15 @@ def memory_journey(room: str, include_connections: bool = False) -> dict:
         ]
     }
     
-    if include_connections and current_room.connections:
-        result["connected_rooms"] = current_room.connections
+    if since is not None:
+        result["since"] = since
+        result["journey_order"] = [stop["location_id"] for stop in journey_path]
+        result["journey_path"] = [stop for stop in journey_path if stop["location_id"] in changed_ids]
+    
+    if include_connections:
+        connected_rooms = storage.room_graph().neighbours(room)
+        if connected_rooms:
+            result["connected_rooms"] = connected_rooms
     
     # Add progress messages
     if progress["new_achievements"]:
@@ -801,34 +1659,134 @@ def memory_journey(room: str, include_connections: bool = False) -> dict:
     if progress["streak_updated"] and not progress["streak_broken"]:
         result["streak_message"] = generate_message("streak", user_id)
     
-    return result
+    return shape_response("memory_journey", result, verbosity or user.verbosity)
 
-@mcp.tool(description="Find memories in your memory palace by telling me what you're looking for")
-def search_memories(query: str, room: Optional[str] = None) -> dict:
-    """Search for memories using keywords or content with gamification elements"""
+@mcp.tool(description="Walk through several connected rooms in a row, following the doors between them")
+@log_activity
+@transactional
+def palace_journey(start_room: str, end_room: Optional[str] = None, max_rooms: int = 5,
+                   order: str = "position") -> dict:
+    """Journey across connected rooms, memories listed room by room
+    
+    With end_room the journey follows the shortest route of connected rooms
+    between the two; otherwise it tours up to `max_rooms` rooms reachable
+    from start_room, nearest first. `order` is applied within each room as
+    in memory_journey.
+    """
+    
+    if order not in JOURNEY_ORDERS:
+        return {"error": f"Unknown journey order '{order}'. Available orders: {', '.join(JOURNEY_ORDERS)}"}
     
-    locations = storage.load_locations()
+    rooms = storage.load_rooms()
     user_id = "default"
-    results = []
     
-    query_lower = query.lower()
+    for name in (start_room, end_room):
+        if name is not None and name not in rooms:
+            return {"error": f"Room '{name}' doesn't exist"}
     
-    for location in locations.values():
-        # Skip if room filter is specified and doesn't match
-        if room and location.room != room:
-            continue
-            
-        # Check if query matches content, keywords, or visual anchor
-        matches = (
-            query_lower in location.content.lower() or
-            query_lower in location.visual_anchor.lower() or
-            any(query_lower in keyword.lower() for keyword in location.keywords)
+    if max_rooms < 1:
+        return {"error": "max_rooms must be at least 1"}
+    
+    graph = storage.room_graph()
+    if end_room is not None:
+        route = graph.shortest_path(start_room, end_room)
+        if route is None:
+            return {"error": f"There's no path of connected rooms from '{start_room}' to '{end_room}'"}
+    else:
+        route = graph.walk(start_room, max_rooms) or [start_room]
+    
+    locations = storage.load_locations(route)
+    legs = []
+    for step, name in enumerate(route):
+        current_room = rooms[name]
+        journey_path = walk_room(current_room, locations, order)
+        legs.append({
+            "step": step + 1,
+            "room": name,
+            "description": current_room.description,
+            "theme": current_room.theme,
+            "mastery_level": current_room.mastery_level,
+            "journey_path": journey_path,
+            "total_memories": len(journey_path),
+            "next_room": route[step + 1] if step + 1 < len(route) else None
+        })
+    
+    storage.bump_content_generation()
+    note_activity(
+        rooms=route, memory_ids=[stop["location_id"] for leg in legs for stop in leg["journey_path"]]
+    )
+    
+    # Award XP like a memory_journey through each room
+    user = storage.load_user_profile(user_id)
+    xp_reward = sum(10 + (5 * leg["total_memories"]) for leg in legs)
+    xp_result = user.add_xp(xp_reward)
+    storage.save_user_profile(user)
+    
+    # Check for achievements
+    progress = check_user_progress(user_id)
+    
+    last_room = route[-1]
+    result = {
+        "start_room": start_room,
+        "end_room": end_room,
+        "route": route,
+        "legs": legs,
+        "total_rooms": len(legs),
+        "total_memories": sum(leg["total_memories"] for leg in legs),
+        "xp_gained": xp_reward,
+        "journey_message": generate_message("challenge", user_id),
+        "next_steps": [
+            f"Practice recall by saying: Quiz me in '{last_room}'.",
+            f"Walk back by saying: Walk from '{last_room}' to '{start_room}'."
+        ] if len(route) > 1 else [
+            f"Connect '{start_room}' to another room by creating one with connections=['{start_room}'].",
+            f"Practice recall by saying: Quiz me in '{start_room}'."
+        ]
+    }
+    
+    # Add progress messages
+    if progress["new_achievements"]:
+        achievement = progress["new_achievements"][0]
+        result["achievement_message"] = (
+            f"🏆 Achievement Unlocked: {achievement['name']}! "
+            f"{achievement['description']}. +{achievement['xp_reward']} XP!"
         )
         
-        if matches:
-            # Update last accessed
-            location.last_accessed = datetime.now().isoformat()
-            
+    if progress["level_up"]:
+        result["level_up_message"] = progress["level_up"]
+        
+    if progress["streak_updated"] and not progress["streak_broken"]:
+        result["streak_message"] = generate_message("streak", user_id)
+    
+    return result
+
+def rank_memories(
+    locations: Dict[str, MemoryLocation],
+    query: str,
+    room: Optional[str],
+    mode: str,
+    limit: int,
+    max_distance: Optional[int]
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """How many memories match, and the best `limit` of them for search_memories, best first"""
+    results = []
+    query_lower = query.lower()
+    
+    if mode in ("semantic", "fuzzy"):
+        if mode == "semantic":
+            # Only the best `limit` are looked up, so they are all the matches there are
+            ranked = storage.semantic_index().search(
+                query, top_k=limit, room=room, min_score=SEMANTIC_MIN_SCORE
+            )
+            total = len(ranked)
+        else:
+            ranked = storage.fuzzy_index().search(query, max_distance=max_distance, room=room)
+            total = len(ranked)
+            ranked = ranked[:limit]
+        for location_id, score in ranked:
+            location = locations.get(location_id)
+            if location is None:
+                continue
             results.append({
                 "location_id": location.id,
                 "room": location.room,
@@ -836,29 +1794,82 @@ def search_memories(query: str, room: Optional[str] = None) -> dict:
                 "visual_anchor": location.visual_anchor,
                 "content": location.content,
                 "keywords": location.keywords,
-                "relevance_score": len([
-                    match for match in [
-                        query_lower in location.content.lower(),
-                        query_lower in location.visual_anchor.lower(),
-                        any(query_lower in kw.lower() for kw in location.keywords)
-                    ] if match
-                ])
+                "relevance_score": round(score, 3)
             })
+    else:
+        # Matches the query against content, keywords and visual anchor (skipping other rooms if filtered)
+        total, results = rank_exact(
+            (vars(location) for location in locations.values() if not room or location.room == room),
+            query_lower, limit
+        )
     
     # Sort by relevance score
     results.sort(key=lambda x: x["relevance_score"], reverse=True)
     
-    # Save updated access times
-    storage.save_locations(locations)
+    return total, results
+
+@mcp.tool(description="Find memories in your memory palace by telling me what you're looking for")
+@log_activity
+def search_memories(query: str, room: Optional[str] = None, mode: str = "exact", limit: int = 10,
+                    max_distance: Optional[int] = None, verbosity: Optional[str] = None) -> dict:
+    """Search for memories using keywords or content with gamification elements
+    
+    mode "exact" matches the query as a substring of content, keywords or visual
+    anchor; mode "semantic" ranks memories by meaning; mode "fuzzy" tolerates typos,
+    matching every query word within `max_distance` edits (by default scaled to
+    word length, at most FUZZY_MAX_DISTANCE). Every mode returns only the best
+    `limit` matches (10 by default): `results_count` is how many were returned
+    and `total_matches` how many there were (semantic search only ranks the
+    best `limit`, so there the two are equal).
+    `verbosity` ("full", "compact" or "ids-only") overrides the default set with set_verbosity.
+    """
+    
+    if verbosity is not None and verbosity not in VERBOSITY_LEVELS:
+        return {"error": f"Unknown verbosity '{verbosity}'. Available levels: {', '.join(VERBOSITY_LEVELS)}"}
+    
+    if mode not in SEARCH_MODES:
+        return {"error": f"Unknown search mode '{mode}'. Available modes: {', '.join(SEARCH_MODES)}"}
+    
+    storage.refresh()
+    user_id = "default"
+    
+    limit = max(1, limit)
+    if mode == "fuzzy" and max_distance is not None:
+        max_distance = max(0, min(max_distance, FUZZY_MAX_DISTANCE))
+    
+    # Matches only depend on memory contents, so repeat queries are served from
+    # the cache until a tool changes what a search could return
+    cache_key = (
+        user_id, "search_memories", mode, query.lower(), room, limit,
+        max_distance if mode == "fuzzy" else None
+    )
+    cached = storage.result_cache.get(cache_key, storage.content_generation)
+    if cached is None:
+        if mode == "exact" and room is None:
+            # Every room partition is scanned, in parallel on large palaces
+            cached = storage.search_partitions(query.lower(), limit)
+        else:
+            locations = storage.load_locations(None if room is None else [room])
+            cached = rank_memories(locations, query, room, mode, limit, max_distance)
+        storage.result_cache.put(cache_key, storage.content_generation, cached)
+    total_matches, results = cached
+    results = [dict(match) for match in results]
+    note_activity(rooms=[room] if room else [], memory_ids=[match["location_id"] for match in results])
+    
+    # Update last accessed (written, and given a version, by the background flusher)
+    now = datetime.now().isoformat()
+    for match in results:
+        storage.soft_update("locations", match["location_id"], last_accessed=now)
     
     # Award XP for successful search
-    user = storage.load_user_profile(user_id)
     xp_reward = 5 if results else 0  # Only reward successful searches
     if len(results) > 0:
         xp_reward += min(15, len(results) * 3)  # More results = more XP (up to 15)
     
-    xp_result = user.add_xp(xp_reward)
-    storage.save_user_profile(user)
+    # Queued for the background flusher, so searching doesn't rewrite users.json or wait on the lock
+    if xp_reward:
+        storage.soft_add_xp(user_id, xp_reward)
+    user = storage.load_user_profile(user_id)
     
     # Check for achievements
     progress = check_user_progress(user_id)
@@ -867,6 +1878,7 @@ def search_memories(query: str, room: Optional[str] = None) -> dict:
         "query": query,
         "room_filter": room,
         "results_count": len(results),
+        "total_matches": total_matches,
         "results": results,
         "xp_gained": xp_reward if results else 0,
         "next_steps": (
@@ -894,17 +1906,10 @@ def search_memories(query: str, room: Optional[str] = None) -> dict:
     if progress["level_up"]:
         result["level_up_message"] = progress["level_up"]
     
-    return result
+    return shape_response("search_memories", result, verbosity or user.verbosity)
 
-@mcp.tool(description="See everything in your memory palace - like a map of all your memory rooms")
-def get_palace_overview() -> dict:
-    """Get an overview of the entire memory palace with gamification elements"""
-    
-    rooms = storage.load_rooms()
-    locations = storage.load_locations()
-    user_id = "default"
-    user = storage.load_user_profile(user_id)
-    
+def summarize_palace(rooms: Dict[str, MemoryRoom], locations: Dict[str, MemoryLocation]) -> Dict[str, Any]:
+    """Room statistics, recent activity and mastery for get_palace_overview"""
     room_stats = {}
     total_memories = len(locations)
     
@@ -920,7 +1925,8 @@ def get_palace_overview() -> dict:
             "memory_count": room_location_count,
             "connections": room.connections,
             "mastery_level": room.mastery_level,
-            "last_visited": room.last_visited
+            "last_visited": room.last_visited,
+            "version": room.version
         }
     
     # Recent activity
@@ -935,7 +1941,8 @@ def get_palace_overview() -> dict:
             "location_id": loc.id,
             "room": loc.room,
             "visual_anchor": loc.visual_anchor,
-            "last_accessed": loc.last_accessed
+            "last_accessed": loc.last_accessed,
+            "version": loc.version
         }
         for loc in recent_locations
     ]
@@ -946,6 +1953,54 @@ def get_palace_overview() -> dict:
     else:
         overall_mastery = 0
     
+    return {
+        "total_rooms": len(rooms),
+        "total_memories": total_memories,
+        "overall_mastery": overall_mastery,
+        "room_stats": room_stats,
+        "recent_activity": recent_activity,
+        "palace_health": "excellent" if total_memories > 0 else "empty",
+        "next_steps": (
+            [
+                "Make your first room by saying: Make a room called 'Study Hall'."
+            ] if len(rooms) == 0 else [
+                f"Add a memory by saying: Save a memory in '{list(rooms.keys())[0]}'.",
+                f"Walk through a room by saying: Walk through '{list(rooms.keys())[0]}'."
+            ]
+        )
+    }
+
+@mcp.tool(description="See everything in your memory palace - like a map of all your memory rooms")
+@log_activity
+def get_palace_overview(since: Optional[int] = None, room: Optional[str] = None,
+                        verbosity: Optional[str] = None) -> dict:
+    """Get an overview of the entire memory palace with gamification elements
+    
+    With `since` (the `version` of an earlier overview) room stats, recent
+    activity and achievements only include entries changed after that version.
+    With `room` that room's stats also list each memory's retention.
+    `verbosity` ("full", "compact" or "ids-only") overrides the default set with set_verbosity.
+    """
+    
+    if verbosity is not None and verbosity not in VERBOSITY_LEVELS:
+        return {"error": f"Unknown verbosity '{verbosity}'. Available levels: {', '.join(VERBOSITY_LEVELS)}"}
+    
+    user_id = "default"
+    storage.refresh()
+    user = storage.load_user_profile(user_id)
+    if room is not None and room not in storage.load_rooms():
+        return {"error": f"Room '{room}' doesn't exist"}
+    
+    # The palace half of the overview only changes when locations or rooms are written
+    cache_key = (user_id, "get_palace_overview")
+    palace = storage.result_cache.get(cache_key, storage.palace_generation)
+    if palace is None:
+        palace = summarize_palace(storage.load_rooms(), storage.load_locations())
+        storage.result_cache.put(cache_key, storage.palace_generation, palace)
+    
+    # Taken before check_user_progress so achievements it unlocks show up in the next delta
+    version = storage.palace_version()
+    
     # Update user profile
     progress = check_user_progress(user_id)
     
@@ -954,13 +2009,33 @@ def get_palace_overview() -> dict:
         asdict(achievement) for achievement in user.achievements if achievement.unlocked
     ]
     
-    return {
-        "total_rooms": len(rooms),
-        "total_memories": total_memories,
-        "overall_mastery": overall_mastery,
+    room_stats = palace["room_stats"]
+    recent_activity = palace["recent_activity"]
+    if since is not None:
+        room_stats = {name: stats for name, stats in room_stats.items() if stats["version"] > since}
+        recent_activity = [activity for activity in recent_activity if activity["version"] > since]
+        changed_achievements = [a for a in unlocked_achievements if a["version"] > since]
+    
+    # Retention decays with time, so it is evaluated on every call from the cached per-room
+    # model, and only for the rooms in the response
+    model = storage.retention_model()
+    now = time.time()
+    retention = model.summary(list(room_stats), now)
+    if room in room_stats:
+        retention.update(model.summary([room], now, per_memory=True))
+    room_stats = {
+        name: {**stats, **retention.get(name, {"retention": None})} for name, stats in room_stats.items()
+    }
+    
+    result = {
+        "version": version,
+        "total_rooms": palace["total_rooms"],
+        "total_memories": palace["total_memories"],
+        "overall_mastery": palace["overall_mastery"],
+        "overall_retention": model.overall(now),
         "room_stats": room_stats,
         "recent_activity": recent_activity,
-        "palace_health": "excellent" if total_memories > 0 else "empty",
+        "palace_health": palace["palace_health"],
         "user": {
             "level": user.level,
             "xp": user.xp,
@@ -970,19 +2045,18 @@ def get_palace_overview() -> dict:
             "personality_name": user.get_personality()["name"],
             "total_achievements": len(unlocked_achievements)
         },
-        "unlocked_achievements": unlocked_achievements,
+        "unlocked_achievements": changed_achievements if since is not None else unlocked_achievements,
         "streak_message": generate_message("streak", user_id) if user.streak_days > 0 else None,
-        "next_steps": (
-            [
-                "Make your first room by saying: Make a room called 'Study Hall'."
-            ] if len(rooms) == 0 else [
-                f"Add a memory by saying: Save a memory in '{list(rooms.keys())[0]}'.",
-                f"Walk through a room by saying: Walk through '{list(rooms.keys())[0]}'."
-            ]
-        )
+        "next_steps": palace["next_steps"]
     }
+    
+    if since is not None:
+        result["since"] = since
+    
+    return shape_response("get_palace_overview", result, verbosity or user.verbosity)
 
 @mcp.tool(description="See your player card with all the cool badges you've earned")
+@log_activity
 def get_user_profile() -> dict:
     """Get detailed information about the user's profile and progress"""
     user_id = "default"
@@ -1013,6 +2087,7 @@ def get_user_profile() -> dict:
             "level": user.level,
             "xp": user.xp,
             "xp_to_next_level": user.xp_to_next_level,
+            "total_xp": user.total_xp,
             "streak_days": user.streak_days,
             "total_memories": user.total_memories,
             "total_rooms": user.total_rooms,
@@ -1033,7 +2108,92 @@ def get_user_profile() -> dict:
         "progress_message": generate_message("streak", user_id) if user.streak_days > 0 else generate_message("welcome", user_id)
     }
 
+@mcp.tool(description="See who has earned the most XP and where you rank")
+@log_activity
+def get_leaderboard(top: int = 10, user_id: str = "default") -> dict:
+    """Top users by total XP (earned over all levels) and `user_id`'s rank
+    
+    Users with equal XP share a rank. Rankings are kept up to date as XP is
+    earned, so this never re-reads or sorts every profile.
+    """
+    if not 1 <= top <= LEADERBOARD_MAX_TOP:
+        return {"error": f"top must be between 1 and {LEADERBOARD_MAX_TOP}"}
+    
+    storage.refresh()
+    leaderboard = storage.leaderboard()
+    rank = leaderboard.rank(user_id)
+    you = None
+    if rank is not None:
+        you = {"user_id": user_id, "rank": rank, **leaderboard.entries[user_id]}
+    
+    return {
+        "leaderboard": leaderboard.top(top),
+        "total_users": len(leaderboard),
+        "you": you,
+        "next_steps": [
+            "Earn XP by saying: Save a memory in 'Study Hall'.",
+            "Practice to climb the board by saying: Quiz me in 'Study Hall' with 3 questions."
+        ]
+    }
+
+@mcp.tool(description="See what you've been up to: activity, XP and favourite rooms day by day")
+@log_activity
+def get_activity_analytics(days: int = 7, top_rooms: int = 5) -> dict:
+    """Activity and XP for each of the last `days` days, the most visited rooms and the last 24 hours by hour
+    
+    Everything comes from hourly and daily rollups kept up to date as tools
+    are used; the raw activity log is never scanned.
+    """
+    if not 1 <= days <= ACTIVITY_DAILY_DAYS:
+        return {"error": f"days must be between 1 and {ACTIVITY_DAILY_DAYS}"}
+    
+    if top_rooms < 1:
+        return {"error": "top_rooms must be at least 1"}
+    
+    rollups = storage.activity.rollups()
+    now = datetime.now()
+    
+    per_day = []
+    visits: Dict[str, int] = {}
+    for offset in reversed(range(days)):
+        day = (now.date() - timedelta(days=offset)).isoformat()
+        bucket = rollups["daily"].get(day, {})
+        events = bucket.get("events", 0)
+        per_day.append({
+            "date": day,
+            "events": events,
+            "errors": bucket.get("errors", 0),
+            "xp_earned": bucket.get("xp", 0),
+            "memories_touched": bucket.get("memories", 0),
+            "avg_latency_ms": round(bucket["latency_ms"] / events, 3) if events else None,
+            "tools": bucket.get("tools", {})
+        })
+        for room, count in bucket.get("rooms", {}).items():
+            visits[room] = visits.get(room, 0) + count
+    
+    last_24_hours = []
+    for offset in reversed(range(24)):
+        hour = (now - timedelta(hours=offset)).isoformat()[:13]
+        bucket = rollups["hourly"].get(hour, {})
+        last_24_hours.append({"hour": hour, "events": bucket.get("events", 0), "xp_earned": bucket.get("xp", 0)})
+    
+    most_visited = sorted(visits.items(), key=lambda item: (-item[1], item[0]))[:top_rooms]
+    
+    return {
+        "days": per_day,
+        "total_events": sum(day["events"] for day in per_day),
+        "total_xp_earned": sum(day["xp_earned"] for day in per_day),
+        "most_visited_rooms": [{"room": room, "visits": count} for room, count in most_visited],
+        "last_24_hours": last_24_hours,
+        "next_steps": (
+            [f"Visit your favourite room again by saying: Walk through '{most_visited[0][0]}'."]
+            if most_visited else ["Get started by saying: Make a room called 'Study Hall'."]
+        )
+    }
+
 @mcp.tool(description="Choose a different friendly guide to help you with your memory palace")
+@log_activity
+@transactional
 def change_personality(personality_type: str) -> dict:
     """Change the user's guide personality"""
     user_id = "default"
@@ -1066,10 +2226,38 @@ def change_personality(personality_type: str) -> dict:
         ]
     }
 
+@mcp.tool(description="Choose how much detail tool responses include: full, compact or ids-only")
+@log_activity
+@transactional
+def set_verbosity(verbosity: str) -> dict:
+    """Set the default verbosity of store_memory, search_memories, memory_journey
+    and get_palace_overview responses for this user"""
+    user_id = "default"
+    
+    if verbosity not in VERBOSITY_LEVELS:
+        return {"error": f"Unknown verbosity '{verbosity}'. Available levels: {', '.join(VERBOSITY_LEVELS)}"}
+    
+    user = storage.load_user_profile(user_id)
+    user.verbosity = verbosity
+    storage.save_user_profile(user)
+    
+    return {
+        "success": True,
+        "verbosity": verbosity,
+        "message": f"Responses will now be {verbosity}"
+    }
+
 @mcp.tool(description="Play a fun memory game to see what you remember and win prizes")
+@log_activity
+@transactional
 def start_challenge() -> dict:
-    """Generate and start a memory challenge"""
+    """Generate and start a memory challenge
+    
+    The challenge is kept in the challenge store until it is completed with
+    complete_challenge or expires CHALLENGE_EXPIRY_HOURS after starting.
+    """
     user_id = "default"
+    storage.sweep_challenges()
     user = storage.load_user_profile(user_id)
     
     # Generate a challenge
@@ -1081,9 +2269,14 @@ def start_challenge() -> dict:
             "guidance": "Try creating at least one room with 3-5 memories before attempting challenges."
         }
     
-    # Add the challenge to user's active challenges
-    user.active_challenges.append(challenge["id"])
-    storage.save_user_profile(user)
+    started = datetime.now()
+    challenge.update(
+        status="active",
+        started_at=started.isoformat(),
+        expires_at=(started + timedelta(hours=CHALLENGE_EXPIRY_HOURS)).isoformat()
+    )
+    storage.challenge_store().add(challenge)
+    storage.save_challenge_store()
     
     # Add personality flavor
     personality = user.get_personality()
@@ -1094,32 +2287,154 @@ def start_challenge() -> dict:
         "challenge": challenge,
         "challenge_message": f"{personality['emoji']} {personality['messages']['challenge']}",
         "guidance": (
-            "To complete this challenge, recall the content of the targeted memories. "
+            "To complete this challenge, recall the content of the targeted memories and send what you "
+            f"remember with complete_challenge within {CHALLENGE_EXPIRY_HOURS} hours. "
             "The more accurately you recall, the higher your score!"
         ),
         "next_steps": [
+            f"Finish it by saying: Complete challenge {challenge['id']}: first thing I remember; second thing.",
             "Take a walk through your room to review.",
             "Add a new memory to make it more fun!"
         ]
     }
 
+@mcp.tool(description="Finish a memory game by telling me everything you remember")
+@log_activity
+@transactional
+def complete_challenge(challenge_id: str, answers: List[str]) -> dict:
+    """Score what you recalled for a started challenge and award its XP
+    
+    `answers` are the things you remember, in any order; each is matched to
+    at most one of the challenge's target memories. A target counts as
+    recalled when the answer contains enough of its words, the XP reward is
+    shared out by targets recalled, and the challenge counts as won when
+    enough of them were.
+    """
+    if not answers:
+        return {"error": "Send at least one answer: what you remember from the challenge"}
+    
+    if len(answers) > CHALLENGE_MAX_ANSWERS:
+        return {"error": f"Send at most {CHALLENGE_MAX_ANSWERS} answers"}
+    
+    if not all(isinstance(answer, str) for answer in answers):
+        return {"error": "Each answer should be text, e.g. 'The sun is a star'"}
+    
+    user_id = "default"
+    storage.sweep_challenges()
+    store = storage.challenge_store()
+    challenge = store.get(challenge_id)
+    if challenge is None or challenge["user_id"] != user_id:
+        return {
+            "error": f"No challenge '{challenge_id}' found",
+            "guidance": f"Finished challenges are kept for {CHALLENGE_HISTORY_DAYS} days. Start a new one with start_challenge."
+        }
+    
+    now = datetime.now()
+    if challenge["status"] == "active" and now >= datetime.fromisoformat(challenge["expires_at"]):
+        store.finish(challenge_id, "expired", now.isoformat())
+        storage.save_challenge_store()
+    if challenge["status"] != "active":
+        return {
+            "error": f"Challenge '{challenge_id}' is already {challenge['status']}",
+            "challenge": challenge,
+            "guidance": "Start a new one with start_challenge."
+        }
+    
+    targets = challenge["target_memories"]
+    locations = storage.load_locations(storage.rooms_of(targets))
+    note_activity(
+        rooms=sorted({locations[location_id].room for location_id in targets if location_id in locations}),
+        memory_ids=targets
+    )
+    scores = score_answers(
+        {location_id: locations[location_id].content for location_id in targets if location_id in locations},
+        answers
+    )
+    results = []
+    for location_id in targets:
+        score, answer_index = scores.get(location_id, (0.0, None))
+        results.append({
+            "location_id": location_id,
+            "score": round(score * 100, 1),
+            "recalled": score >= CHALLENGE_RECALL_THRESHOLD,
+            "answer_index": answer_index
+        })
+    recalled = sum(result["recalled"] for result in results)
+    won = recalled >= CHALLENGE_PASS_RATIO * len(targets)
+    total_score = round(sum(result["score"] for result in results) / len(results), 1) if results else 0.0
+    
+    user = storage.load_user_profile(user_id)
+    xp_reward = round(challenge["xp_reward"] * recalled / len(targets)) if targets else 0
+    user.add_xp(xp_reward)
+    if won:
+        user.challenges_completed += 1
+    storage.save_user_profile(user)
+    
+    store.finish(
+        challenge_id, "completed", now.isoformat(),
+        completed=True, completed_at=now.isoformat(), score=total_score
+    )
+    storage.save_challenge_store()
+    
+    progress = check_user_progress(user_id)
+    personality = user.get_personality()
+    
+    result = {
+        "success": True,
+        "challenge_id": challenge_id,
+        "won": won,
+        "score": total_score,
+        "recalled": recalled,
+        "total_targets": len(targets),
+        "results": results,
+        "unmatched_answers": sorted(set(range(len(answers))) - {r["answer_index"] for r in results}),
+        "xp_gained": xp_reward,
+        "message": (
+            f"{personality['emoji']} You remembered {recalled} of {len(targets)}"
+            + (" - challenge won!" if won else ". So close - try again with a new challenge!")
+        ),
+        "next_steps": [
+            "Review what you missed by taking a memory journey.",
+            "Start another challenge by saying: Play a memory game."
+        ]
+    }
+    
+    if progress["new_achievements"]:
+        achievement = progress["new_achievements"][0]
+        result["achievement_message"] = (
+            f"🏆 Achievement Unlocked: {achievement['name']}! "
+            f"{achievement['description']}. +{achievement['xp_reward']} XP!"
+        )
+    
+    if progress["level_up"]:
+        result["level_up_message"] = progress["level_up"]
+    
+    return result
+
 @mcp.tool(description="Find out all the cool things your memory palace can do")
+@log_activity
 def get_server_info() -> dict:
     """Get information about the Memory Palace MCP server"""
     info = SERVER_INFO.copy()
     info.update({
         "personalities": [p["name"] for p in PERSONALITIES.values()],
         "environment": os.environ.get("ENVIRONMENT", "development"),
-        "python_version": os.sys.version.split()[0]
+        "python_version": os.sys.version.split()[0],
+        "result_cache": storage.result_cache.stats(),
+        "write_behind": storage.soft_updates.stats(),
+        "activity_log": storage.activity.disk_usage()
     })
     return info
 
 @mcp.tool(description="Start a memory adventure with fun missions to complete")
+@log_activity
+@transactional
 def start_learning_path(path_id: str) -> dict:
     """Start or continue a guided learning path"""
     user_id = "default"
     user = storage.load_user_profile(user_id)
-    all_paths = storage.load_learning_paths()
+    catalog = storage.catalog()
+    all_paths = catalog.learning_paths
     
     if path_id not in all_paths:
         available = ", ".join(all_paths.keys())
@@ -1133,7 +2448,7 @@ def start_learning_path(path_id: str) -> dict:
     current_progress = user.learning_paths.get(path_id, 0)
     
     # Determine current stage (0-based index)
-    current_stage_idx = min(int(current_progress / 20), len(path["stages"]) - 1)
+    current_stage_idx = catalog.stage_index(path_id, current_progress)
     current_stage = path["stages"][current_stage_idx]
     
     # Prepare next goals based on current stage
@@ -1166,11 +2481,14 @@ def start_learning_path(path_id: str) -> dict:
     }
 
 @mcp.tool(description="Tell me when you finish a memory mission to get your reward")
+@log_activity
+@transactional
 def update_learning_progress(path_id: str, completed_task: str) -> dict:
     """Update progress on a learning path after completing a task"""
     user_id = "default"
     user = storage.load_user_profile(user_id)
-    all_paths = storage.load_learning_paths()
+    catalog = storage.catalog()
+    all_paths = catalog.learning_paths
     
     if path_id not in all_paths:
         return {"error": f"Learning path '{path_id}' not found."}
@@ -1182,7 +2500,7 @@ def update_learning_progress(path_id: str, completed_task: str) -> dict:
         return {"error": f"You haven't started the '{path['name']}' learning path yet."}
     
     current_progress = user.learning_paths[path_id]
-    current_stage_idx = min(int(current_progress / 20), len(path["stages"]) - 1)
+    current_stage_idx = catalog.stage_index(path_id, current_progress)
     current_stage = path["stages"][current_stage_idx]
     
     # Check if the task is in the current stage
@@ -1258,16 +2576,17 @@ def update_learning_progress(path_id: str, completed_task: str) -> dict:
     return result
 
 @mcp.tool(description="See all the fun memory adventures you can go on")
+@log_activity
 def get_learning_paths() -> dict:
     """Get information about all learning paths and user progress"""
     user_id = "default"
     user = storage.load_user_profile(user_id)
-    all_paths = storage.load_learning_paths()
+    catalog = storage.catalog()
     
     user_paths = []
-    for path_id, path in all_paths.items():
+    for path_id, path in catalog.learning_paths.items():
         progress = user.learning_paths.get(path_id, 0)
-        current_stage_idx = min(int(progress / 20), len(path["stages"]) - 1)
+        current_stage_idx = catalog.stage_index(path_id, progress)
         
         user_paths.append({
             "id": path_id,
@@ -1292,6 +2611,8 @@ def get_learning_paths() -> dict:
     }
 
 @mcp.tool(description="Get friendly reminders to practice your memories so you won't forget them")
+@log_activity
+@transactional
 def setup_spaced_repetition(room: str, interval_days: int = 1, message_time: str = "morning") -> dict:
     """Setup spaced repetition reminders for a room"""
     rooms = storage.load_rooms()
@@ -1317,6 +2638,8 @@ def setup_spaced_repetition(room: str, interval_days: int = 1, message_time: str
             "repetition_number": i + 1
         })
     
+    note_activity(rooms=[room])
+    
     # Add some XP for setting up spaced repetition
     xp_reward = 20
     user.add_xp(xp_reward)
@@ -1341,10 +2664,15 @@ def setup_spaced_repetition(room: str, interval_days: int = 1, message_time: str
     }
 
 @mcp.tool(description="Play a quick memory game to practice what you've learned")
+@log_activity
+@transactional
 def practice_recall(room: str, count: int = 3) -> dict:
     """Test your memory with a quick recall practice session"""
+    if count < 1:
+        return {"error": "count must be at least 1, e.g. 3"}
+    
     rooms = storage.load_rooms()
-    locations = storage.load_locations()
+    locations = storage.load_locations([room])
     user_id = "default"
     
     if room not in rooms:
@@ -1359,9 +2687,14 @@ def practice_recall(room: str, count: int = 3) -> dict:
     if not room_locations:
         return {"error": f"No memories found in room '{room}'"}
     
-    # Select random memories to test (or all if count > available)
+    # Favour weak, hard and long-unpractised memories (all of them if count > available)
     count = min(count, len(room_locations))
-    test_locations = random.sample(room_locations, count)
+    by_id = {loc.id: loc for loc in room_locations}
+    test_locations = [
+        by_id[loc_id] for loc_id in storage.recall_sampler().sample(room, count) if loc_id in by_id
+    ]
+    
+    note_activity(rooms=[room], memory_ids=[loc.id for loc in test_locations])
     
     # Format the test questions
     questions = []
@@ -1397,12 +2730,139 @@ def practice_recall(room: str, count: int = 3) -> dict:
             "The more accurately you can recall, the stronger your memory palace becomes!"
         ),
         "next_steps": [
+            "Tell me how it went with submit_recall_results (location_id, correct, response_time for each question).",
             f"Walk through '{room}' by saying: Walk through '{room}'.",
             f"Add a new memory by saying: Save a memory in '{room}'."
         ]
     }
 
+@mcp.tool(description="Tell me how your memory practice went so your palace knows what you remember well")
+@log_activity
+@transactional
+def submit_recall_results(results: List[Dict[str, Any]]) -> dict:
+    """Record a batch of recall outcomes in one save
+    
+    Each result is {"location_id": ..., "correct": true/false, "response_time": seconds (optional)}.
+    A memory's recall_success_rate and difficulty_rating move towards each
+    outcome by an exponential moving average, and the mastery of every room
+    involved is recalculated; no other memories are touched.
+    """
+    if not results:
+        return {"error": "Send at least one result"}
+    
+    if len(results) > RECALL_MAX_BATCH:
+        return {"error": f"Send at most {RECALL_MAX_BATCH} results at a time"}
+    
+    for number, result in enumerate(results, start=1):
+        if not isinstance(result, dict) or not isinstance(result.get("location_id"), str) \
+                or not isinstance(result.get("correct"), bool):
+            return {"error": f"Result {number} needs a location_id and whether it was correct (true/false)"}
+        response_time = result.get("response_time")
+        if response_time is not None and (isinstance(response_time, bool)
+                                          or not isinstance(response_time, (int, float)) or response_time < 0):
+            return {"error": f"Result {number} has an invalid response_time; use seconds, e.g. 4.5"}
+    
+    rooms = storage.load_rooms()
+    locations = storage.load_locations(storage.rooms_of(result["location_id"] for result in results))
+    user_id = "default"
+    
+    recorded: Dict[str, MemoryLocation] = {}
+    unknown_location_ids = []
+    correct_answers = 0
+    for result in results:
+        location = locations.get(result["location_id"])
+        if location is None:
+            unknown_location_ids.append(result["location_id"])
+            continue
+        record_recall(
+            location, result["correct"], result.get("response_time"),
+            RECALL_EMA_ALPHA, RECALL_FAST_SECONDS, RECALL_SLOW_SECONDS
+        )
+        recorded[location.id] = location
+        correct_answers += result["correct"]
+    
+    if not recorded:
+        return {"error": "None of those memories exist", "unknown_location_ids": unknown_location_ids}
+    
+    location_changes = {}
+    for location in recorded.values():
+        storage.stamp(location)
+        location_changes[location.id] = {
+            "recall_count": location.recall_count,
+            "recall_success_rate": location.recall_success_rate,
+            "difficulty_rating": location.difficulty_rating,
+            "version": location.version
+        }
+    
+    note_activity(rooms=sorted({location.room for location in recorded.values()}), memory_ids=list(recorded))
+    
+    mastery = {}
+    for name in sorted({location.room for location in recorded.values()}):
+        room = rooms.get(name)
+        if room is None:
+            continue
+        room.mastery_level = room_mastery(locations[loc_id] for loc_id in room.locations if loc_id in locations)
+        storage.stamp(room)
+        # Queued too, so a pending journey update can't replay an older mastery over this one
+        storage.soft_update("rooms", name, mastery_level=room.mastery_level)
+        mastery[name] = room.mastery_level
+    
+    # Only the answered memories and their rooms are rewritten. The recall counts
+    # written include journeys still queued, which come off the queue with them
+    storage.update_locations(location_changes)
+    storage.consume_queued(recorded.values())
+    storage.update_rooms({name: {"mastery_level": level, "version": rooms[name].version} for name, level in mastery.items()})
+    
+    # Award XP: every answer counts, correct ones count more
+    attempts = sum(1 for result in results if result["location_id"] in recorded)
+    xp_reward = attempts + 5 * correct_answers
+    user = storage.load_user_profile(user_id)
+    xp_result = user.add_xp(xp_reward)
+    storage.save_user_profile(user)
+    
+    progress = check_user_progress(user_id)
+    personality = user.get_personality()
+    
+    weakest = min(recorded.values(), key=lambda loc: (loc.recall_success_rate, -loc.difficulty_rating))
+    result = {
+        "success": True,
+        "recorded": attempts,
+        "correct": correct_answers,
+        "accuracy": round(100 * correct_answers / attempts, 1),
+        "memories": [
+            {
+                "location_id": location.id,
+                "room": location.room,
+                "recall_success_rate": location.recall_success_rate,
+                "difficulty_rating": location.difficulty_rating,
+                "recall_count": location.recall_count
+            }
+            for location in recorded.values()
+        ],
+        "room_mastery": mastery,
+        "unknown_location_ids": unknown_location_ids,
+        "xp_gained": xp_reward,
+        "message": f"{personality['emoji']} Practice recorded: {correct_answers} of {attempts} remembered!",
+        "next_steps": [
+            f"Practice again by saying: Quiz me in '{weakest.room}'.",
+            f"Walk through '{weakest.room}' by saying: Walk through '{weakest.room}'."
+        ]
+    }
+    
+    if progress["new_achievements"]:
+        achievement = progress["new_achievements"][0]
+        result["achievement_message"] = (
+            f"🏆 Achievement Unlocked: {achievement['name']}! "
+            f"{achievement['description']}. +{achievement['xp_reward']} XP!"
+        )
+    
+    if progress["level_up"]:
+        result["level_up_message"] = progress["level_up"]
+    
+    return result
+
 @mcp.tool(description="Talk to your memory palace in simple words; I'll figure out what to do")
+@log_activity
 def ask(prompt: str) -> dict:
     """Understand simple natural language and do the right thing.
 
@@ -1410,11 +2870,13 @@ def ask(prompt: str) -> dict:
     - "make a room called Study Hall"
     - "save a memory in Study Hall: the sun is a star"
     - "walk through Study Hall"
+    - "walk from 'Study Hall' to 'Library'"
     - "find photosynthesis in Study Hall"
     - "quiz me in Study Hall with 3 questions"
     - "remind me to practice Study Hall"
     - "be my wizard"
     - "start memory palace adventure"
+    - "complete challenge challenge_01J...: the sun is a star; water boils at 100C"
     """
 
     text = prompt.strip().lower()
@@ -1444,6 +2906,13 @@ def ask(prompt: str) -> dict:
         result = change_personality.fn(personality_type=persona_match)
         return {"action": "change_personality", "result": result}
 
+    # Complete challenge: answers follow a colon, separated by semicolons
+    complete_match = re.search(r"\bcomplete\s+challenge\s+(challenge_\w+)\s*:\s*(.+)$", prompt, re.IGNORECASE | re.DOTALL)
+    if complete_match:
+        answers = [a.strip() for a in re.split(r"[;\n]", complete_match.group(2)) if a.strip()]
+        result = complete_challenge.fn(challenge_id=complete_match.group(1), answers=answers)
+        return {"action": "complete_challenge", "result": result}
+
     # Store memory
     if re.search(r"\b(remember|save|store)\b.*\b(memory|this)\b", text):
         # Capture room: prefer the explicit "in <room>" (supports curly quotes)
@@ -1488,6 +2957,15 @@ def ask(prompt: str) -> dict:
         result = store_memory.fn(room=room_name, content=content, visual_anchor=visual_anchor, x=x_val, y=y_val, z=z_val, keywords=keywords)
         return {"action": "store_memory", "result": result}
 
+    # Journey across connected rooms
+    route_match = re.search(
+        r"\bfrom\s+[\"'“”‘’]?([A-Za-z0-9 _\-]+?)[\"'“”‘’]?\s+to\s+[\"'“”‘’]?([A-Za-z0-9 _\-]+?)[\"'“”‘’]?\s*[.!?]?$",
+        prompt, re.IGNORECASE
+    )
+    if route_match and re.search(r"\b(journey|walk|tour|go|travel)\b", text):
+        result = palace_journey.fn(start_room=route_match.group(1).strip(), end_room=route_match.group(2).strip())
+        return {"action": "palace_journey", "result": result}
+
     # Journey
     if re.search(r"\b(journey|walk|tour|show)\b.*\b(room|memories|through)\b", text):
         room = extract_quoted(prompt)
@@ -1600,17 +3078,87 @@ def ask(prompt: str) -> dict:
         "suggestions": ideas
     }
 
+def enable_profiling() -> ToolProfiler:
+    """Profile live tool calls and serve the aggregated report at /debug/profile"""
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse
+    
+    profiler = ToolProfiler(
+        sample_rate=float(os.environ.get("MEMORY_PALACE_PROFILE_SAMPLE_RATE", PROFILE_SAMPLE_RATE)),
+        window_seconds=float(os.environ.get("MEMORY_PALACE_PROFILE_WINDOW", PROFILE_WINDOW_SECONDS))
+    )
+    mcp.add_middleware(ProfilingMiddleware(profiler))
+    
+    @mcp.custom_route("/debug/profile", methods=["GET"])
+    async def profile_report(request: Request) -> JSONResponse:
+        """Top-N hottest functions across the sampled tool calls"""
+        params = request.query_params
+        try:
+            top_n = int(params.get("top", PROFILE_TOP_N))
+        except ValueError:
+            top_n = -1
+        if top_n < 1:
+            return JSONResponse({"error": "top must be a whole number of at least 1, e.g. ?top=20"}, status_code=400)
+        return JSONResponse(profiler.report(
+            top_n=top_n,
+            sort_by=params.get("sort", "cumulative"),
+            tool=params.get("tool")
+        ))
+    
+    return profiler
+
+def create_app():
+    """ASGI app for each uvicorn worker process when MEMORY_PALACE_WORKERS is set.
+    
+    Stateless HTTP, since consecutive requests from one client can reach different workers.
+    Worker processes exit without running atexit hooks, so queued soft updates and
+    activity rollups are flushed when the app shuts down.
+    """
+    if os.environ.get("MEMORY_PALACE_PROFILE", "").lower() in ("1", "true", "yes"):
+        enable_profiling()
+    app = mcp.http_app(stateless_http=True)
+    serve = app.router.lifespan_context
+    
+    @asynccontextmanager
+    async def lifespan(app):
+        async with serve(app):
+            yield
+        storage.soft_updates.close()
+        storage.activity.flush()
+    
+    app.router.lifespan_context = lifespan
+    return app
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
     host = "0.0.0.0"
+    workers = os.environ.get("MEMORY_PALACE_WORKERS")
     
     print(f"Starting FastMCP server on {host}:{port}")
     
-    # Create default user if it doesn't exist
-    default_user = storage.load_user_profile("default")
-    
-    mcp.run(
-        transport="http",
-        host=host,
-        port=port
-    )
+    if workers:
+        # Each worker imports its own server module; writes are serialised
+        # through the storage lock and workers pick up each other's changes
+        import uvicorn
+        workers = int(workers)
+        print(f"Serving with {workers} worker processes")
+        uvicorn.run(
+            "server:create_app",
+            factory=True,
+            host=host,
+            port=port,
+            workers=workers,
+            app_dir=os.path.dirname(os.path.abspath(__file__))
+        )
+    else:
+        if os.environ.get("MEMORY_PALACE_PROFILE", "").lower() in ("1", "true", "yes"):
+            enable_profiling()
+            print(f"Profiling enabled: report at http://{host}:{port}/debug/profile")
+        
+        # Storage is initialised lazily by the first tool call, so nothing is
+        # read from or written to disk before the server starts accepting requests
+        mcp.run(
+            transport="http",
+            host=host,
+            port=port
+        )
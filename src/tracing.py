@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Storage tracing hooks for the Memory Palace MCP Server
+"""
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict
+
+
+class StorageTraceHook(ABC):
+    """Receives one structured span per storage file read or write.
+
+    Subclass this, implement ``on_span`` and register an instance with
+    ``MemoryPalaceStorage.add_trace_hook``.
+    A span is a plain dict with these keys:
+
+    - ``span``: storage method that did the I/O (e.g. ``load_locations``)
+    - ``phase``: ``"read"`` or ``"write"``
+    - ``file``: path of the JSON file
+    - ``bytes``: size of the file contents read or written
+    - ``records``: number of top-level records in the JSON document
+    - ``io_ms``: time spent reading or writing the file
+    - ``parse_ms`` / ``serialize_ms``: time spent in json decoding / encoding
+    - ``duration_ms``: total time of the operation
+    - ``timestamp``: wall-clock start time (seconds since the epoch)
+    """
+
+    @abstractmethod
+    def on_span(self, span: Dict[str, Any]) -> None:
+        """Handle one finished span"""
+
+
+class JsonlSpanExporter(StorageTraceHook):
+    """Append every span as one JSON line to a local file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def on_span(self, span: Dict[str, Any]) -> None:
+        line = json.dumps(span, separators=(",", ":"))
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line + "\n")
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Write-behind buffer for soft updates
+
+Bookkeeping that doesn't need to be durable the moment a tool answers (last
+access and visit times, recall counts, room mastery) is queued here instead
+of rewriting whole files in the request path. A background thread flushes
+the queue every ``interval`` seconds, or as soon as ``max_pending`` records
+are waiting, and ``close`` (registered with atexit) flushes what is left on
+shutdown.
+
+Updates are absolute field values and stay queued until a flush has written
+them, so readers overlaying the queue onto freshly loaded records always see
+the latest values, and writing one twice is harmless.
+
+Amounts (XP earned, recall counts) are added up instead, so several workers
+can count into the same record without losing each other's increments.
+Writing one twice would count it twice, so whoever writes an amount into a
+record removes exactly that much from the queue with ``consume``, under the
+same lock as the write.
+"""
+import atexit
+import copy
+import threading
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+# kind ("locations", "rooms") -> record key -> field -> value
+Updates = Dict[str, Dict[str, Dict[str, Any]]]
+# kind ("users", "locations") -> record key -> field -> amount to add
+Amounts = Dict[str, Dict[str, Dict[str, float]]]
+
+
+class WriteBehindBuffer:
+    """Queue of soft updates with a lazily started background flusher"""
+
+    def __init__(self, flush: Callable[[Updates], None], interval: float = 2.0, max_pending: int = 1000):
+        self._flush = flush
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending: Updates = {}
+        self._amounts: Amounts = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.flushes = 0
+        self.flushed_records = 0
+        self.failed_flushes = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count(self._pending) + self._count(self._amounts)
+
+    @staticmethod
+    def _count(updates: Updates) -> int:
+        return sum(len(records) for records in updates.values())
+
+    def update(self, kind: str, key: str, **fields):
+        """Queue new values for some of a record's fields"""
+        with self._lock:
+            self._pending.setdefault(kind, {}).setdefault(key, {}).update(fields)
+            self._queued()
+    
+    def add(self, kind: str, key: str, **amounts: float):
+        """Queue amounts to add to some of a record's fields"""
+        with self._lock:
+            queued = self._amounts.setdefault(kind, {}).setdefault(key, {})
+            for name, amount in amounts.items():
+                queued[name] = queued.get(name, 0) + amount
+            self._queued()
+    
+    def _queued(self):
+        """Start the flusher on first use and wake it early when the queue is full (holding the lock)"""
+        if self._thread is None and not self._closed.is_set():
+            self._start()
+        if self._count(self._pending) + self._count(self._amounts) >= self.max_pending:
+            self._wake.set()
+    
+    def amounts(self, kind: str, key: str) -> Dict[str, float]:
+        """Amounts queued for one record"""
+        with self._lock:
+            return dict(self._amounts.get(kind, {}).get(key, {}))
+    
+    def all_amounts(self, kind: str) -> Dict[str, Dict[str, float]]:
+        """Amounts queued for every record of a kind"""
+        with self._lock:
+            return copy.deepcopy(self._amounts.get(kind, {}))
+    
+    def amount_keys(self, kind: str) -> List[str]:
+        """Records with amounts queued"""
+        with self._lock:
+            return list(self._amounts.get(kind, {}))
+    
+    def consume(self, kind: str, key: str, **amounts: float):
+        """Remove amounts that have been written from the queue"""
+        with self._lock:
+            records = self._amounts.get(kind, {})
+            queued = records.get(key, {})
+            for name, amount in amounts.items():
+                remaining = queued.get(name, 0) - amount
+                if remaining > 0:
+                    queued[name] = remaining
+                else:
+                    queued.pop(name, None)
+            if not queued:
+                records.pop(key, None)
+
+    def overlay(self, kind: str, records: Mapping[str, Any]) -> Mapping[str, Any]:
+        """Apply queued updates and amounts to freshly loaded records in place
+        
+        The amounts added to a record are kept on it as ``_queued``, for
+        whoever saves the record to ``consume``.
+        """
+        with self._lock:
+            for key, fields in self._pending.get(kind, {}).items():
+                record = records.get(key)
+                if record is not None:
+                    for name, value in fields.items():
+                        setattr(record, name, value)
+            for key, amounts in self._amounts.get(kind, {}).items():
+                record = records.get(key)
+                if record is not None:
+                    for name, amount in amounts.items():
+                        setattr(record, name, getattr(record, name) + amount)
+                    record._queued = dict(amounts)
+        return records
+
+    def flush(self):
+        """Write everything queued so far; updates made meanwhile stay queued"""
+        with self._lock:
+            updates = copy.deepcopy(self._pending)
+            has_amounts = any(self._amounts.values())
+        if not updates and not has_amounts:
+            return
+        self._flush(updates)
+        with self._lock:
+            for kind, records in updates.items():
+                pending = self._pending.get(kind, {})
+                for key, fields in records.items():
+                    if pending.get(key) == fields:
+                        del pending[key]
+            self.flushes += 1
+            self.flushed_records += self._count(updates)
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while not self._closed.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Still queued; the next round retries
+                self.failed_flushes += 1
+
+    def close(self):
+        """Stop the background thread and flush the remaining updates"""
+        self._closed.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval + 5)
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = self._count(self._pending)
+            amounts = self._count(self._amounts)
+        return {
+            "pending": pending,
+            "pending_amounts": amounts,
+            "flushes": self.flushes,
+            "flushed_records": self.flushed_records,
+            "failed_flushes": self.failed_flushes,
+            "interval_seconds": self.interval,
+            "max_pending": self.max_pending
+        }